@@ -1,20 +1,51 @@
-from flask import Flask, render_template, jsonify, request
-import firebase_admin
-from firebase_admin import credentials, db, firestore
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, Response, g, render_template, jsonify, request, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 from datetime import datetime, timedelta
 import pickle
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
 import logging
 import atexit
 import json
+import threading
+import click
+from forest_engine import CompiledForest
+from model_registry import ModelRegistry, file_sha256
+import training
+import compaction
+from lookup_grid import LookupGrid
+from batch_io import parse_batch, BatchFormatError, UnsupportedBatchFormat
+import watering_rules
+from timestamps import parse_datetime_string, parse_datetime_column
+from caching import ReadThroughCache, LRUCache
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry, PhaseTimer, server_timing_header
+from structured_logging import configure_logging
+from live_stream import BroadcastHub, FirebaseListenerSource, LiveFeed
+from local_backend import LocalDatabase, LocalListenerSource, seed_sensor_history
+from sensor_store import SensorStore
+from downsampling import parse_bucket, bucket_aggregate, lttb_indices
+from rollups import RollupStore, granularity_for_bucket
+from sensor_export import EXPORT_FORMATS, export_stream, iter_chunks
+from write_behind import WriteBehindQueue
+from zones import parse_zones, fetch_latest_readings
+from pagination import InvalidCursor, decode_cursor, encode_cursor
+from parallel_reads import ParallelReader
+from startup import READY, StartupReport, LazyResource, LazyProxy, is_ready, warm_up
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa leader lock antar-proses
+    fcntl = None
 
 app = Flask(__name__)
 
+@app.before_request
+def record_first_request():
+    startup_report.mark_first_request()
+
 @app.route('/jalankan-prediksi-rahasia')
 def jalankan_prediksi_terjadwal():
     try:
@@ -29,113 +60,365 @@ def jalankan_prediksi_terjadwal():
         print(f"Error saat menjalankan prediksi terjadwal: {e}")
         return "Gagal menjalankan prediksi.", 500
     
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Setup logging: LOG_FORMAT 'text' atau 'json', LOG_SAMPLE membatasi setiap
+# template pesan ke '<rate>/<detik>' ('off' untuk menulis semua), dan
+# LOG_DEBUG_CHANNELS mengaktifkan log per dokumen ('documents') atau isi
+# payload ('payloads') tanpa menurunkan level seluruh aplikasi
 logger = logging.getLogger(__name__)
+configure_logging(
+    level=os.getenv('LOG_LEVEL', 'INFO'),
+    log_format=os.getenv('LOG_FORMAT', 'text').lower(),
+    sample=os.getenv('LOG_SAMPLE', '20/60'),
+    debug_channels=[c.strip() for c in os.getenv('LOG_DEBUG_CHANNELS', '').split(',') if c.strip()],
+    channel_prefix=logger.name
+)
+document_log = logger.getChild('documents')
+payload_log = logger.getChild('payloads')
+
+# Sumber data: 'firebase' (default) atau 'local' (SQLite pengganti Firebase
+# untuk pengembangan dan uji beban tanpa kredensial, lihat local_backend.py)
+DATA_BACKEND = os.environ.get('DATA_BACKEND', 'firebase')
+if DATA_BACKEND not in ('firebase', 'local'):
+    raise ValueError(f"DATA_BACKEND tidak dikenal: {DATA_BACKEND} (pilih 'firebase' atau 'local')")
+
+# Database backend lokal (':memory:' atau path file) dan jumlah pembacaan
+# sintetis yang diisi saat database masih kosong
+LOCAL_DATA_PATH = os.environ.get('LOCAL_DATA_PATH', ':memory:')
+LOCAL_SEED_ROWS = int(os.environ.get('LOCAL_SEED_ROWS', '0'))
 
 # Inisialisasi Firebase dari Environment Variable
 cred_json_str = os.environ.get('GOOGLE_CREDENTIALS_JSON')
 
-if not cred_json_str:
+if DATA_BACKEND == 'firebase' and not cred_json_str:
     # Ini akan membuat aplikasi crash jika variabel tidak ditemukan,
     # yang bagus untuk mengetahui error lebih awal.
     raise ValueError("Variabel GOOGLE_CREDENTIALS_JSON tidak diatur di Render.")
 
-cred_info = json.loads(cred_json_str)
-cred = credentials.Certificate(cred_info)
+cred_info = json.loads(cred_json_str) if cred_json_str else None
+local_database = None
 
-# Cek apakah aplikasi Firebase sudah diinisialisasi atau belum
-# Ini untuk mencegah error jika kode ini terpanggil lebih dari sekali
-if not firebase_admin._apps:
-    firebase_admin.initialize_app(cred, {
-        'databaseURL': 'https://anggur-dataset-default-rtdb.asia-southeast1.firebasedatabase.app/'
-    })
+# Firebase, model, dan scheduler dimuat saat pertama dipakai atau oleh thread
+# warm-up (lihat startup.py), sehingga worker bisa langsung melayani '/'
+startup_report = StartupReport(started=_IMPORT_STARTED)
+
+# Sama dengan firestore.Query.DESCENDING, tanpa import google.cloud.firestore saat startup
+QUERY_DESCENDING = 'DESCENDING'
+
+# Metrik Prometheus (/metrics): durasi request, fase hot path (fetch,
+# normalize, sort, trim, serialize, predict, firestore_write) dan job
+# scheduler. Dengan SERVER_TIMING=1 setiap respons membawa header
+# Server-Timing berisi durasi fase request tersebut.
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '0') == '1'
+metrics_registry = MetricsRegistry()
+request_seconds = metrics_registry.histogram(
+    'http_request_duration_seconds', 'Durasi request per endpoint.', ('method', 'endpoint', 'status')
+)
+phase_timer = PhaseTimer(metrics_registry.histogram(
+    'app_phase_seconds', 'Durasi fase hot path per jenis fase.', ('phase',)
+))
+scheduler_job_seconds = metrics_registry.histogram(
+    'scheduler_job_duration_seconds', 'Durasi job scheduler.', ('job', 'status')
+)
+
+@app.before_request
+def start_request_timing():
+    g.request_started = time.perf_counter()
+    if SERVER_TIMING:
+        g.server_timings = phase_timer.collect()
+
+@app.after_request
+def record_request_timing(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        seconds = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_seconds.observe(seconds, method=request.method, endpoint=endpoint, status=response.status_code)
+        timings = g.pop('server_timings', None)
+        if timings is not None:
+            response.headers['Server-Timing'] = server_timing_header(timings, seconds)
+    return response
+
+@app.teardown_request
+def stop_request_timing(_error=None):
+    if SERVER_TIMING:
+        phase_timer.stop()
+
+def init_local_database():
+    """Fungsi untuk membuka backend lokal dan mengisinya dengan data sintetis jika masih kosong."""
+    global local_database
+    local_database = LocalDatabase(LOCAL_DATA_PATH)
+    if LOCAL_SEED_ROWS and local_database.count('sensor_history') == 0:
+        seed_sensor_history(local_database, LOCAL_SEED_ROWS)
+    logger.info("Backend data lokal aktif: %s", LOCAL_DATA_PATH)
+    return local_database.firestore
+
+def init_firebase():
+    """Fungsi untuk inisialisasi Firebase Admin dan client Firestore (fase startup 'firebase')."""
+    if DATA_BACKEND == 'local':
+        return init_local_database()
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    cred = credentials.Certificate(cred_info)
+
+    # Cek apakah aplikasi Firebase sudah diinisialisasi atau belum
+    # Ini untuk mencegah error jika kode ini terpanggil lebih dari sekali
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(cred, {
+            'databaseURL': 'https://anggur-dataset-default-rtdb.asia-southeast1.firebasedatabase.app/'
+        })
+
+    # Inisialisasi Firestore
+    return firestore.client()
+
+def init_realtime_database():
+    """Fungsi untuk menyiapkan modul Realtime Database (fase startup 'rtdb')."""
+    firebase_resource.get()
+    if DATA_BACKEND == 'local':
+        return local_database.rtdb
+    from firebase_admin import db
+    return db
+
+firebase_resource = LazyResource('firebase', init_firebase, startup_report)
+rtdb_resource = LazyResource('rtdb', init_realtime_database, startup_report)
+firestore_client = LazyProxy(firebase_resource)
+rtdb = LazyProxy(rtdb_resource)
+
+# Thread pool bersama untuk pembacaan backend yang independen (0 = berurutan)
+parallel_reader = ParallelReader(int(os.environ.get('PARALLEL_READ_WORKERS', '16')))
 
-# Inisialisasi Firestore
-firestore_client = firestore.client()
+def fetch_realtime_snapshot():
+    """Fungsi untuk mengambil data terbaru /DHT dan /SoilMoisture dari Realtime Database (bersamaan)."""
+    with phase_timer.span('fetch_rtdb'):
+        dht_data, soil_data = parallel_reader.gather(
+            rtdb.reference('/DHT').get,
+            rtdb.reference('/SoilMoisture').get
+        )
+    return dht_data, soil_data
+
+# Cache bersama untuk snapshot Realtime Database, agar beban Firebase tidak
+# bertambah seiring jumlah tab dashboard yang melakukan polling
+RTDB_CACHE_TTL = float(os.environ.get('RTDB_CACHE_TTL', '10'))
+rtdb_snapshot_cache = ReadThroughCache(fetch_realtime_snapshot, ttl=RTDB_CACHE_TTL)
+
+# Store lokal (SQLite) untuk sensor_history; aktif jika SENSOR_STORE_PATH diatur
+SENSOR_STORE_PATH = os.environ.get('SENSOR_STORE_PATH')
+sensor_store = None
+rollup_store = None
+if SENSOR_STORE_PATH:
+    sensor_store = SensorStore(
+        SENSOR_STORE_PATH,
+        sync_interval=float(os.environ.get('SENSOR_STORE_SYNC_INTERVAL', '30'))
+    )
+
+    # Rollup per jam/hari dipelihara di database yang sama setiap kali store menerima data baru
+    rollup_store = RollupStore(sensor_store)
 
 # Load model Random Forest
 model_path = os.path.join(os.path.dirname(__file__), 'model_rf')
-try:
+
+# Artefak hasil kompilasi model yang dibuka dengan mmap; dibagi bersama semua worker lewat page cache
+MODEL_ARTIFACT_PATH = os.environ.get('MODEL_ARTIFACT_PATH', model_path + '.forest')
+
+def export_model_artifact():
+    """
+    Fungsi untuk unpickle model sklearn, mengompilasinya, dan menyimpan artefak
+    mmap. Return model yang dibuka ulang dari artefak itu (atau hasil kompilasi
+    di memori jika artefak tidak dapat ditulis).
+    """
     with open(model_path, 'rb') as f:
         rf_model = pickle.load(f)
-    print("Model Random Forest berhasil dimuat")
-except Exception as e:
-    print(f"Error loading model: {e}")
-    rf_model = None
+    # Kompilasi pohon sklearn menjadi array datar agar inferensi satu baris tidak
+    # melewati dispatch per pohon
+    rf_forest = CompiledForest.from_sklearn(rf_model)
+    try:
+        rf_forest.save(MODEL_ARTIFACT_PATH, metadata={'source_sha256': file_sha256(model_path)})
+    except OSError as e:
+        logger.warning("Artefak model tidak dapat ditulis ke %s: %s", MODEL_ARTIFACT_PATH, e)
+        return rf_forest
+    # Pakai halaman mmap artefak (dibagi dengan worker lain lewat page cache),
+    # bukan salinan array pribadi hasil kompilasi
+    return CompiledForest.load(MODEL_ARTIFACT_PATH)
+
+def load_random_forest():
+    """
+    Fungsi untuk memuat model Random Forest (fase startup 'model'). Artefak
+    mmap dipakai jika masih sesuai dengan pickle model_rf; jika belum ada
+    atau usang, pickle dimuat (mengimport sklearn) dan artefak dibuat ulang.
+    """
+    source_sha256 = file_sha256(model_path)
+    try:
+        rf_forest = CompiledForest.load(MODEL_ARTIFACT_PATH)
+        if source_sha256 is None or rf_forest.metadata.get('source_sha256') == source_sha256:
+            logger.info("Model Random Forest berhasil dimuat dari artefak mmap (%d pohon, %d node)",
+                        rf_forest.n_trees, rf_forest.n_nodes)
+            return rf_forest
+        logger.info("Artefak model usang, kompilasi ulang dari model_rf")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Artefak model tidak dapat dibaca (%s), kompilasi ulang dari model_rf", e)
+
+    rf_forest = export_model_artifact()
+    logger.info("Model Random Forest berhasil dimuat (%d pohon, %d node)", rf_forest.n_trees, rf_forest.n_nodes)
+    return rf_forest
+
+# Registry model berversi: versi baru yang dipublikasikan ke direktori ini
+# dimuat dan ditukar di latar belakang tanpa restart worker
+MODEL_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', os.path.join(os.path.dirname(__file__), 'models'))
+# Mode prediksi: 'forest' menelusuri pohon, 'grid' memakai tabel lookup
+# hasil hitung di muka (nilai di luar grid tetap dijawab oleh hutan)
+PREDICTION_MODE = os.environ.get('PREDICTION_MODE', 'forest')
+LOOKUP_GRID_DIR = os.environ.get('LOOKUP_GRID_DIR', MODEL_REGISTRY_DIR)
+
+def prepare_predictor(version, rf_forest):
+    """
+    Fungsi untuk menyiapkan prediktor versi model sebelum ditukar. Dalam
+    mode 'grid' tabel lookup dibuka dari cache mmap, atau dibangun dan disimpan.
+    """
+    if PREDICTION_MODE != 'grid':
+        return rf_forest
+    grid_path = os.path.join(LOOKUP_GRID_DIR, f'{version}.grid')
+    try:
+        grid = LookupGrid.load(grid_path, rf_forest)
+        if grid.metadata.get('model_version') == version and grid.metadata.get('nodes') == rf_forest.n_nodes:
+            return grid
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Tabel lookup %s tidak dapat dibaca (%s), dibangun ulang", grid_path, e)
+
+    started = time.perf_counter()
+    grid = LookupGrid.build(rf_forest, metadata={'model_version': version, 'nodes': rf_forest.n_nodes})
+    logger.info("Tabel lookup versi %s dibangun dalam %.1fs (%.0f KB)",
+                version, time.perf_counter() - started, grid.nbytes / 1024)
+    try:
+        os.makedirs(LOOKUP_GRID_DIR, exist_ok=True)
+        grid.save(grid_path)
+    except OSError as e:
+        logger.warning("Tabel lookup tidak dapat ditulis ke %s: %s", grid_path, e)
+    return grid
+
+model_registry = ModelRegistry(
+    MODEL_REGISTRY_DIR,
+    poll_interval=float(os.environ.get('MODEL_RELOAD_INTERVAL', '30')),
+    prepare=prepare_predictor
+)
+
+def load_active_model():
+    """
+    Fungsi untuk memuat model yang dilayani (fase startup 'model'): versi
+    aktif di registry, atau model_rf lama jika registry belum punya versi atau
+    versi aktifnya gagal divalidasi. Watcher registry selalu dijalankan, agar
+    versi perbaikan yang dipublikasikan kemudian tetap dimuat.
+    """
+    try:
+        active = model_registry.load_initial()
+        if active is None:
+            rf_forest = load_random_forest()
+            source_sha256 = file_sha256(model_path)
+            version = f"model_rf-{source_sha256[:12]}" if source_sha256 else 'model_rf'
+            active = model_registry.set_active(version, rf_forest, source_sha256)
+    finally:
+        model_registry.start_watching()
+    logger.info("Model Random Forest versi %s aktif", active.version)
+    return active
+
+model_resource = LazyResource('model', load_active_model, startup_report, required=False)
+
+def get_active_model():
+    """
+    Fungsi untuk mendapatkan model yang sedang dilayani (ModelVersion), atau
+    None jika model gagal dimuat. Pemanggil cukup membaca sekali per request
+    agar versi dan model yang dipakai selalu konsisten walaupun terjadi hot-reload.
+    """
+    try:
+        model_resource.get()
+    except Exception:
+        # Model awal gagal dimuat; watcher registry mungkin sudah memasang versi baru
+        return model_registry.active()
+    return model_registry.active()
+
+def get_rf_forest():
+    """Fungsi untuk mendapatkan model terkompilasi, atau None jika model gagal dimuat."""
+    active = get_active_model()
+    return active.forest if active is not None else None
 
 def check_watering_conditions(temperature, humidity, soil_moisture):
     """
-    Fungsi untuk menentukan keputusan penyiraman berdasarkan ambang batas:
+    Fungsi untuk menentukan keputusan penyiraman berdasarkan ambang batas
+    di watering_rules.WATERING_THRESHOLDS:
     - Suhu udara: 20°C-31°C
     - Kelembapan udara: 75-80%
     - Kelembapan tanah: 60-75%
     
     Return 1 untuk "siram", 0 untuk "jangan siram"
     """
-    # Cek apakah parameter berada di luar rentang optimal
-    temp_out_of_range = temperature < 20 or temperature > 31
-    humidity_out_of_range = humidity < 75 or humidity > 80
-    soil_out_of_range = soil_moisture < 60 or soil_moisture > 75
-    
-    # Jika salah satu parameter di luar rentang, maka siram (return 1)
-    if temp_out_of_range or humidity_out_of_range or soil_out_of_range:
-        return 1  # Siram
-    else:
-        return 0  # Jangan siram
+    decision, _ = watering_rules.evaluate(temperature, humidity, soil_moisture)
+    return int(decision)
 
-def parse_datetime_string(datetime_str):
+def evaluate_watering_decision(temperature, humidity, soil_moisture):
     """
-    Fungsi untuk mengparse string DateTime menjadi timestamp Unix.
-    Mendukung berbagai format DateTime dengan penanganan yang lebih baik.
+    Fungsi untuk menentukan keputusan penyiraman beserta teks keputusan dan alasannya.
+    Return (keputusan, teks_keputusan, teks_alasan)
     """
-    try:
-        if not datetime_str or datetime_str == '':
-            logger.warning("Empty datetime string provided")
-            return None
-            
-        # Bersihkan string dari whitespace
-        datetime_str = str(datetime_str).strip()
-        
-        # Format yang mungkin ada di Firestore
-        formats = [
-            "%Y-%m-%d %H:%M:%S",      # 2025-06-04 21:15:15
-            "%Y-%m-%dT%H:%M:%S",      # 2025-06-04T21:15:15
-            "%Y-%m-%d %H:%M:%S.%f",   # 2025-06-04 21:15:15.123456
-            "%Y-%m-%dT%H:%M:%S.%f",   # 2025-06-04T21:15:15.123456
-            "%Y-%m-%dT%H:%M:%S.%fZ",  # 2025-06-04T21:15:15.123456Z
-            "%Y-%m-%dT%H:%M:%SZ",     # 2025-06-04T21:15:15Z
-            "%d/%m/%Y %H:%M:%S",      # 04/06/2025 21:15:15
-            "%d-%m-%Y %H:%M:%S",      # 04-06-2025 21:15:15
-        ]
-        
-        for fmt in formats:
-            try:
-                dt = datetime.strptime(datetime_str, fmt)
-                timestamp = dt.timestamp()
-                logger.info(f"Successfully parsed '{datetime_str}' with format '{fmt}' -> timestamp: {timestamp}")
-                return timestamp
-            except ValueError:
-                continue
-                
-        # Jika semua format gagal, coba parsing ISO format
-        try:
-            # Handle Z timezone
-            if datetime_str.endswith('Z'):
-                datetime_str = datetime_str[:-1] + '+00:00'
-            dt = datetime.fromisoformat(datetime_str)
-            timestamp = dt.timestamp()
-            logger.info(f"Successfully parsed '{datetime_str}' with ISO format -> timestamp: {timestamp}")
-            return timestamp
-        except ValueError:
-            pass
-            
-        logger.error(f"Could not parse datetime string: '{datetime_str}'")
-        return None
-        
-    except Exception as e:
-        logger.error(f"Error parsing datetime string '{datetime_str}': {e}")
-        return None
+    decision, reason_code = watering_rules.evaluate(temperature, humidity, soil_moisture)
+    watering_decision = int(decision)
+    decision_text = "siram" if watering_decision == 1 else "jangan siram"
+    reason_text = watering_rules.reason_text(reason_code, temperature, humidity, soil_moisture)
+    return watering_decision, decision_text, reason_text
+
+# Memo hasil prediksi per (versi model, jam, suhu, kelembapan, kelembapan tanah)
+# yang dibulatkan ke resolusi sensor; polling dashboard dan jadwal sering
+# menanyakan pembacaan yang sama
+PREDICTION_CACHE_DECIMALS = 1
+prediction_cache = LRUCache(int(os.environ.get('PREDICTION_CACHE_SIZE', '4096')))
+
+def predict_random_forest_rows(rows):
+    """
+    Fungsi untuk prediksi Random Forest dari list tuple (jam, suhu,
+    kelembapan, kelembapan tanah). Nilai sensor dibulatkan ke resolusi
+    sensor; baris yang sudah ada di prediction_cache tidak diprediksi ulang,
+    sisanya diprediksi dengan satu kali penelusuran hutan. Return list dict
+    field rf_* per baris, termasuk versi model yang dipakai.
+    """
+    active = get_active_model()
+    keys = [
+        (active.version, hour, round(temperature, PREDICTION_CACHE_DECIMALS),
+         round(humidity, PREDICTION_CACHE_DECIMALS), round(soil_moisture, PREDICTION_CACHE_DECIMALS))
+        for hour, temperature, humidity, soil_moisture in rows
+    ]
+    results = [prediction_cache.get(key) for key in keys]
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        values = np.array([keys[i][1:] for i in missing], dtype=np.float64)
+        with phase_timer.span('predict'):
+            features = active.predictor.build_features(values[:, 1], values[:, 2], values[:, 3], hour=values[:, 0])
+            rf_prediction, rf_probability = active.predictor.predict_with_proba(features)
+        for i, prediction, probability in zip(missing, rf_prediction.tolist(), rf_probability.tolist()):
+            results[i] = {
+                'rf_prediction': int(prediction),
+                'rf_confidence': float(max(probability) * 100),
+                'rf_probability_no_water': float(probability[0]),
+                'rf_probability_water': float(probability[1]),
+                'rf_model_version': active.version
+            }
+            prediction_cache.put(keys[i], results[i])
+
+    return [dict(result) for result in results]
+
+def predict_random_forest_batch(temperature, humidity, soil_moisture, hour):
+    """Fungsi untuk prediksi Random Forest banyak baris data sensor (array)."""
+    columns = np.broadcast_arrays(*(
+        np.atleast_1d(np.asarray(value, dtype=np.float64)) for value in (hour, temperature, humidity, soil_moisture)
+    ))
+    return predict_random_forest_rows(list(zip(*(column.tolist() for column in columns))))
+
+def predict_random_forest(temperature, humidity, soil_moisture, hour):
+    """Fungsi untuk prediksi Random Forest satu baris data sensor."""
+    return predict_random_forest_rows([(float(hour), float(temperature), float(humidity), float(soil_moisture))])[0]
 
 def normalize_timestamp(timestamp_value):
     """
@@ -152,15 +435,15 @@ def normalize_timestamp(timestamp_value):
             # Timestamp untuk 1 Jan 2020 = 1577836800
             # Timestamp untuk 1 Jan 2030 = 1893456000
             if 1577836800 <= timestamp_value <= 1893456000:
-                logger.info(f"Valid timestamp in seconds: {timestamp_value}")
+                document_log.debug("Valid timestamp in seconds: %s", timestamp_value)
                 return float(timestamp_value)
             elif 1577836800000 <= timestamp_value <= 1893456000000:
                 # Timestamp dalam milliseconds
                 result = timestamp_value / 1000
-                logger.info(f"Converted milliseconds timestamp {timestamp_value} to seconds: {result}")
+                document_log.debug("Converted milliseconds timestamp %s to seconds: %s", timestamp_value, result)
                 return result
             else:
-                logger.warning(f"Timestamp {timestamp_value} is out of valid range, using current time")
+                logger.warning("Timestamp %s is out of valid range, using current time", timestamp_value)
                 return datetime.now().timestamp()
         
         # Jika berupa string
@@ -176,32 +459,310 @@ def normalize_timestamp(timestamp_value):
                     return parsed_timestamp
         
         # Fallback ke timestamp sekarang
-        logger.warning(f"Using current timestamp as fallback for: {timestamp_value}")
+        logger.warning("Using current timestamp as fallback for: %s", timestamp_value)
         return datetime.now().timestamp()
         
     except Exception as e:
-        logger.error(f"Error normalizing timestamp {timestamp_value}: {e}")
+        logger.error("Error normalizing timestamp %s: %s", timestamp_value, e)
         return datetime.now().timestamp()
 
-def get_detailed_sort_key(item):
+# Penanda bahwa field DateTime belum di-parse oleh pemanggil
+_UNPARSED = object()
+
+def normalize_sensor_document(doc_id, data, parsed_datetime=_UNPARSED):
     """
-    Fungsi untuk membuat sort key yang detail berdasarkan:
-    1. Tahun
-    2. Bulan  
-    3. Tanggal
-    4. Jam
-    5. Menit
-    6. Detik
+    Fungsi untuk normalisasi satu dokumen sensor_history menjadi record data sensor.
+    `parsed_datetime` dapat diisi hasil parse field DateTime yang sudah dihitung
+    (mode batch). Return None jika timestamp dokumen di luar rentang yang masuk akal.
     """
+    # Ekstrak data sensor
+    humidity_firestore = data.get('humidity', 0)
+    temperature_firestore = data.get('temperature', 0)
+    soil_moisture_firestore = data.get('soil_moisture', 0)
+    
+    # Ekstrak timestamp - PRIORITASKAN DateTime field karena lebih akurat
+    datetime_firestore = data.get('DateTime')
+    timestamp_firestore = data.get('timestamp')
+    
+    # Normalisasi timestamp dengan prioritas DateTime field
+    normalized_timestamp = None
+    
+    if datetime_firestore:
+        document_log.debug("Processing DateTime field: %s", datetime_firestore)
+        if parsed_datetime is _UNPARSED:
+            parsed_datetime = parse_datetime_string(datetime_firestore)
+        normalized_timestamp = parsed_datetime
+        if normalized_timestamp:
+            document_log.debug("Successfully parsed DateTime: %s -> %s", datetime_firestore, normalized_timestamp)
+        else:
+            logger.warning("Failed to parse DateTime: %s", datetime_firestore)
+    
+    # Jika DateTime gagal atau tidak ada, coba timestamp field
+    if not normalized_timestamp and timestamp_firestore:
+        document_log.debug("Fallback to timestamp field: %s", timestamp_firestore)
+        normalized_timestamp = normalize_timestamp(timestamp_firestore)
+    
+    # Jika kedua field gagal, gunakan waktu sekarang
+    if not normalized_timestamp:
+        logger.warning("No valid timestamp found in document %s, using current time", doc_id)
+        normalized_timestamp = datetime.now().timestamp()
+    
+    # Validasi timestamp final (harus dalam rentang yang masuk akal)
+    current_time = datetime.now().timestamp()
+    if normalized_timestamp < 1577836800:  # Sebelum 1 Januari 2020
+        logger.warning("Timestamp too old (%s), skipping document %s", normalized_timestamp, doc_id)
+        return None
+    elif normalized_timestamp > current_time + 86400:  # Lebih dari 1 hari ke depan
+        logger.warning("Timestamp too far in future (%s), skipping document %s", normalized_timestamp, doc_id)
+        return None
+
+    return {
+        'timestamp': normalized_timestamp,
+        'humidity': float(humidity_firestore) if humidity_firestore else 0,
+        'temperature': float(temperature_firestore) if temperature_firestore else 0,
+        'soil_moisture': float(soil_moisture_firestore) if soil_moisture_firestore else 0,
+        'source': 'firestore',
+        'original_datetime': datetime_firestore,
+        'original_timestamp': timestamp_firestore,
+        'doc_id': doc_id
+    }
+
+def normalize_sensor_documents(items):
+    """
+    Fungsi untuk normalisasi banyak dokumen sensor_history sekaligus.
+    `items` berisi pasangan (doc_id, data); field DateTime di-parse per kolom.
+    Dokumen dengan timestamp tidak valid dilewati.
+    """
+    items = list(items)
+    parsed_datetimes = parse_datetime_column([data.get('DateTime') for _, data in items])
+
+    records = []
+    for (doc_id, data), parsed_datetime in zip(items, parsed_datetimes.tolist()):
+        record = normalize_sensor_document(doc_id, data, None if np.isnan(parsed_datetime) else parsed_datetime)
+        if record is not None:
+            records.append(record)
+    return records
+
+def sync_sensor_store(force=False):
+    """Fungsi untuk sinkronisasi inkremental sensor_history ke store lokal."""
     try:
-        timestamp = item.get('timestamp', 0)
-        dt = datetime.fromtimestamp(timestamp)
-        # Return tuple untuk sorting: (tahun, bulan, tanggal, jam, menit, detik)
-        return (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
+        return sensor_store.sync(firestore_client.collection('sensor_history'), normalize_sensor_documents, force=force)
     except Exception as e:
-        logger.error(f"Error creating sort key for timestamp {timestamp}: {e}")
-        # Fallback ke timestamp asli jika ada error
-        return (1970, 1, 1, 0, 0, 0)
+        # Jika Firestore tidak terjangkau, tetap layani data yang sudah ada di store
+        logger.error("Error syncing sensor store: %s", e)
+        return 0
+
+_sensor_backfill_lock = threading.Lock()
+_sensor_backfill_thread = None
+
+def use_sensor_store():
+    """
+    True jika request dilayani dari store lokal. Selama store belum pernah
+    tersinkron penuh, backfill pertama dijalankan di thread latar belakang
+    (atau lewat `flask rollup-backfill`) dan request tetap dibaca langsung
+    dari Firestore, sehingga tidak ada request yang menunggu seluruh koleksi.
+    """
+    global _sensor_backfill_thread
+    if sensor_store is None:
+        return False
+    if sensor_store.initialized:
+        return True
+    with _sensor_backfill_lock:
+        if _sensor_backfill_thread is None or not _sensor_backfill_thread.is_alive():
+            _sensor_backfill_thread = threading.Thread(
+                target=sync_sensor_store, kwargs={'force': True}, name='sensor-store-backfill', daemon=True
+            )
+            _sensor_backfill_thread.start()
+    return False
+
+SENSOR_COLUMNS = ('temperature', 'humidity', 'soil_moisture')
+
+# Batas jumlah titik mentah yang dibaca untuk satu request agregasi/downsampling
+# dari store lokal, dan batas (lebih kecil) untuk pembacaan langsung dari
+# Firestore, di mana setiap titik adalah satu dokumen yang ditagih
+DOWNSAMPLE_MAX_RAW_POINTS = int(os.environ.get('DOWNSAMPLE_MAX_RAW_POINTS', '200000'))
+DOWNSAMPLE_MAX_FIRESTORE_POINTS = int(os.environ.get('DOWNSAMPLE_MAX_FIRESTORE_POINTS', '2000'))
+
+def load_sensor_arrays(start, end, limit=None):
+    """
+    Fungsi untuk mengambil data mentah sensor_history dalam rentang waktu
+    sebagai kolom NumPy (urut naik), maksimal sejumlah titik terbaru: dari
+    store lokal DOWNSAMPLE_MAX_RAW_POINTS, dari Firestore `limit` (jika ada)
+    dan tidak lebih dari DOWNSAMPLE_MAX_FIRESTORE_POINTS.
+    """
+    if use_sensor_store():
+        with phase_timer.span('fetch'):
+            sync_sensor_store()
+            return sensor_store.query_arrays(start, end, limit=DOWNSAMPLE_MAX_RAW_POINTS)
+
+    max_points = min(limit, DOWNSAMPLE_MAX_FIRESTORE_POINTS) if limit else DOWNSAMPLE_MAX_FIRESTORE_POINTS
+
+    collection_ref = firestore_client.collection('sensor_history')
+    query = collection_ref
+    if start and end:
+        query = query.where('timestamp', '>=', start).where('timestamp', '<=', end)
+    with phase_timer.span('fetch'):
+        docs = list(query.order_by('timestamp', direction=QUERY_DESCENDING).limit(max_points).stream())
+
+    with phase_timer.span('normalize'):
+        records = normalize_sensor_documents((doc.id, doc.to_dict()) for doc in docs)
+        if start and end:
+            records = [record for record in records if start <= record['timestamp'] <= end]
+    with phase_timer.span('sort'):
+        records.sort(key=lambda x: x['timestamp'])
+
+    return {
+        key: np.array([record[key] for record in records], dtype=np.float64)
+        for key in ('timestamp',) + SENSOR_COLUMNS
+    }
+
+def get_downsampled_sensor_data(start, end, bucket_seconds, resolution, limit=None):
+    """
+    Fungsi untuk menyusun data grafik teragregasi: min/mean/max per bucket waktu
+    (jika bucket diberikan), lalu LTTB ke `resolution` titik (jika diberikan).
+    `limit` membatasi titik mentah yang dibaca langsung dari Firestore.
+    """
+    granularity = granularity_for_bucket(bucket_seconds)
+    if rollup_store is not None and granularity is not None and use_sensor_store():
+        # Bucket jam/hari dibaca langsung dari rollup yang sudah dihitung
+        sync_sensor_store()
+        arrays = series = rollup_store.query(granularity, start, end)
+        source = 'rollup'
+    else:
+        arrays = load_sensor_arrays(start, end, limit)
+        series = arrays
+        source = 'firestore'
+        if bucket_seconds:
+            series = bucket_aggregate(arrays['timestamp'], {key: arrays[key] for key in SENSOR_COLUMNS}, bucket_seconds)
+            source = 'aggregate'
+
+    if resolution and len(series['timestamp']) > resolution:
+        indices = lttb_indices(series['timestamp'], np.column_stack([series[key] for key in SENSOR_COLUMNS]), resolution)
+        series = {key: values[indices] for key, values in series.items()}
+
+    logger.info("Downsampled %d %s points to %d (bucket=%s, resolution=%s)",
+                len(arrays['timestamp']), source, len(series['timestamp']), bucket_seconds, resolution)
+
+    keys = list(series.keys())
+    return [dict(zip(keys, values), source=source) for values in zip(*(series[key].tolist() for key in keys))]
+
+# Jumlah record per potongan saat ekspor streaming (format=ndjson/csv)
+EXPORT_BUFFER_ROWS = int(os.environ.get('EXPORT_BUFFER_ROWS', '500'))
+
+def iter_firestore_sensor_records(start, end, limit=None):
+    """
+    Generator record sensor_history (urut naik berdasarkan field timestamp)
+    langsung dari generator `stream()` Firestore, dinormalisasi per potongan.
+    """
+    query = firestore_client.collection('sensor_history')
+    if start and end:
+        query = query.where('timestamp', '>=', start).where('timestamp', '<=', end)
+    query = query.order_by('timestamp')
+    if limit:
+        query = query.limit(limit)
+
+    for docs in iter_chunks(query.stream(), EXPORT_BUFFER_ROWS):
+        for record in normalize_sensor_documents((doc.id, doc.to_dict()) for doc in docs):
+            if start and end and (record['timestamp'] < start or record['timestamp'] > end):
+                continue
+            yield record
+
+def export_sensor_data(start, end, limit, export_format):
+    """
+    Fungsi untuk ekspor data sensor secara streaming (NDJSON/CSV) dengan
+    memori konstan. Data diurutkan naik dari awal rentang; `limit` (opsional)
+    membatasi jumlah record. Data Realtime Database tidak disertakan.
+    """
+    if use_sensor_store():
+        sync_sensor_store()
+        records = sensor_store.iter_records(start, end, limit, batch_size=EXPORT_BUFFER_ROWS)
+    else:
+        records = iter_firestore_sensor_records(start, end, limit)
+
+    logger.info("Streaming sensor-data export format=%s, start=%s, end=%s, limit=%s", export_format, start, end, limit)
+    headers = {'X-Accel-Buffering': 'no'}
+    if export_format == 'csv':
+        headers['Content-Disposition'] = 'attachment; filename=sensor-data.csv'
+    return Response(
+        stream_with_context(export_stream(records, export_format, EXPORT_BUFFER_ROWS)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers=headers
+    )
+
+def start_after_position(query, collection_ref, position):
+    """
+    Lanjutkan query Firestore (diurutkan berdasarkan timestamp) setelah
+    dokumen `position` (timestamp, doc_id). Snapshot dokumen dipakai agar
+    dokumen lain dengan timestamp sama tidak terlewat; jika dokumen sudah
+    dihapus, lanjutkan dari nilai timestamp saja.
+    """
+    timestamp, doc_id = position
+    snapshot = collection_ref.document(doc_id).get()
+    if snapshot.exists:
+        return query.start_after(snapshot)
+    return query.start_after({'timestamp': timestamp})
+
+def cursor_timestamp(value):
+    """Timestamp untuk cursor: field timestamp mentah jika berupa angka, selain itu hasil normalisasinya."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value):
+        return value
+    return normalize_timestamp(value)
+
+def sensor_cursor_scope(start, end, from_store):
+    """Scope cursor /api/sensor-data: posisi store lokal (ts ternormalisasi) dan Firestore (field timestamp) berbeda."""
+    return ['sensor-data', 'store' if from_store else 'firestore', start, end]
+
+def sensor_record_position(record, from_store):
+    """Posisi cursor (timestamp, doc_id) untuk satu record sensor_history."""
+    timestamp = record['timestamp'] if from_store else cursor_timestamp(record['original_timestamp'])
+    return timestamp, record['doc_id']
+
+def query_sensor_records(start, end, limit, after=None, from_store=False):
+    """
+    Fungsi untuk mengambil satu halaman record sensor_history (belum tentu
+    terurut): `limit` record terbaru, atau yang lebih lama dari posisi
+    `after` (timestamp, doc_id), dari store lokal (`from_store`, lihat
+    use_sensor_store) atau langsung dari Firestore. Return (records, posisi
+    record terakhir yang dibaca), posisi None jika halaman tidak penuh (tidak
+    ada halaman berikutnya).
+    """
+    if from_store:
+        # Layani dari store lokal; sinkronkan dokumen baru dari Firestore terlebih dahulu
+        with phase_timer.span('fetch'):
+            sync_sensor_store()
+            records = sensor_store.query(start, end, limit, before=after)
+        return records, sensor_record_position(records[0], True) if records and len(records) >= limit else None
+
+    # Ambil data dari Firestore, terbaru lebih dulu
+    collection_ref = firestore_client.collection('sensor_history')
+    query = collection_ref
+
+    # Jika ada parameter start dan end, filter berdasarkan timestamp
+    if start and end:
+        logger.info("Filtering data from %s to %s", datetime.fromtimestamp(start), datetime.fromtimestamp(end))
+        query = query.where('timestamp', '>=', start).where('timestamp', '<=', end)
+    else:
+        logger.info("Getting latest %d records", limit)
+    query = query.order_by('timestamp', direction=QUERY_DESCENDING)
+    with phase_timer.span('fetch'):
+        if after is not None:
+            query = start_after_position(query, collection_ref, after)
+        docs = list(query.limit(limit).stream())
+
+    # Kumpulkan data dari Firestore (DateTime di-parse per kolom)
+    with phase_timer.span('normalize'):
+        firestore_data = normalize_sensor_documents((doc.id, doc.to_dict()) for doc in docs)
+
+        # Filter berdasarkan timestamp jika parameter diberikan
+        if start and end:
+            firestore_data = [
+                record for record in firestore_data
+                if start <= record['timestamp'] <= end
+            ]
+    # Posisi diambil dari dokumen terakhir yang dibaca, bukan record yang lolos
+    # normalisasi, agar dokumen tidak valid tidak dibaca ulang di halaman berikutnya
+    position = (cursor_timestamp(docs[-1].get('timestamp')), docs[-1].id) if docs and len(docs) >= limit else None
+    return firestore_data, position
 
 @app.route('/api/sensor-data')
 def get_sensor_data():
@@ -216,89 +777,58 @@ def get_sensor_data():
         limit_param = request.args.get('limit', default=100, type=int)
         sort_method = request.args.get('sort', default='datetime', type=str)
         
-        logger.info(f"API sensor-data called with start={start_param}, end={end_param}, limit={limit_param}, sort={sort_method}")
-        
-        # Ambil data dari Firestore
-        collection_ref = firestore_client.collection('sensor_history')
+        logger.info("API sensor-data called with start=%s, end=%s, limit=%s, sort=%s", start_param, end_param, limit_param, sort_method)
         
-        # Jika ada parameter start dan end, filter berdasarkan timestamp
-        if start_param and end_param:
-            logger.info(f"Filtering data from {datetime.fromtimestamp(start_param).strftime('%Y-%m-%d %H:%M:%S')} to {datetime.fromtimestamp(end_param).strftime('%Y-%m-%d %H:%M:%S')}")
-            query = collection_ref.where('timestamp', '>=', start_param).where('timestamp', '<=', end_param)
-            docs = query.order_by('timestamp').limit(limit_param * 2).stream()
-        else:
-            # Jika tidak ada parameter waktu, ambil data terbaru
-            logger.info(f"Getting latest {limit_param} records")
-            docs = collection_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(limit_param * 2).stream()
+        # Mode agregasi/downsampling: ?bucket=1h (min/mean/max per bucket) dan/atau ?resolution=500 (LTTB)
+        bucket_param = request.args.get('bucket')
+        resolution_param = request.args.get('resolution', type=int)
+        if bucket_param or resolution_param:
+            try:
+                bucket_seconds = parse_bucket(bucket_param)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            # Default limit mode daftar (100) tidak berlaku; tanpa ?limit pembacaan
+            # Firestore dibatasi DOWNSAMPLE_MAX_FIRESTORE_POINTS
+            raw_limit = limit_param if 'limit' in request.args else None
+            return jsonify(get_downsampled_sensor_data(start_param, end_param, bucket_seconds, resolution_param, raw_limit))
 
-        # Kumpulkan data dari Firestore
-        firestore_data = []
-        for doc in docs:
-            data = doc.to_dict()
-            
-            # Ekstrak data sensor
-            humidity_firestore = data.get('humidity', 0)
-            temperature_firestore = data.get('temperature', 0)
-            soil_moisture_firestore = data.get('soil_moisture', 0)
-            
-            # Ekstrak timestamp - PRIORITASKAN DateTime field karena lebih akurat
-            datetime_firestore = data.get('DateTime')
-            timestamp_firestore = data.get('timestamp')
-            
-            # Normalisasi timestamp dengan prioritas DateTime field
-            normalized_timestamp = None
-            
-            if datetime_firestore:
-                logger.info(f"Processing DateTime field: {datetime_firestore}")
-                normalized_timestamp = parse_datetime_string(datetime_firestore)
-                if normalized_timestamp:
-                    logger.info(f"Successfully parsed DateTime: {datetime_firestore} -> {normalized_timestamp}")
-                else:
-                    logger.warning(f"Failed to parse DateTime: {datetime_firestore}")
-            
-            # Jika DateTime gagal atau tidak ada, coba timestamp field
-            if not normalized_timestamp and timestamp_firestore:
-                logger.info(f"Fallback to timestamp field: {timestamp_firestore}")
-                normalized_timestamp = normalize_timestamp(timestamp_firestore)
-            
-            # Jika kedua field gagal, gunakan waktu sekarang
-            if not normalized_timestamp:
-                logger.warning(f"No valid timestamp found in document {doc.id}, using current time")
-                normalized_timestamp = datetime.now().timestamp()
-            
-            # Validasi timestamp final (harus dalam rentang yang masuk akal)
-            current_time = datetime.now().timestamp()
-            if normalized_timestamp < 1577836800:  # Sebelum 1 Januari 2020
-                logger.warning(f"Timestamp too old ({normalized_timestamp}), skipping document {doc.id}")
-                continue
-            elif normalized_timestamp > current_time + 86400:  # Lebih dari 1 hari ke depan
-                logger.warning(f"Timestamp too far in future ({normalized_timestamp}), skipping document {doc.id}")
-                continue
-            
-            # Filter berdasarkan timestamp jika parameter diberikan
-            if start_param and end_param:
-                if normalized_timestamp < start_param or normalized_timestamp > end_param:
-                    continue
-
-            firestore_data.append({
-                'timestamp': normalized_timestamp,
-                'humidity': float(humidity_firestore) if humidity_firestore else 0,
-                'temperature': float(temperature_firestore) if temperature_firestore else 0,
-                'soil_moisture': float(soil_moisture_firestore) if soil_moisture_firestore else 0,
-                'source': 'firestore',
-                'original_datetime': datetime_firestore,
-                'original_timestamp': timestamp_firestore,
-                'doc_id': doc.id
-            })
+        # Mode ekspor streaming: ?format=ndjson atau ?format=csv (limit opsional)
+        format_param = request.args.get('format', default='json', type=str)
+        if format_param != 'json':
+            if format_param not in EXPORT_FORMATS:
+                return jsonify({'error': f"Format tidak dikenal: {format_param}"}), 400
+            return export_sensor_data(start_param, end_param, request.args.get('limit', type=int), format_param)
 
-        # Jika tidak ada parameter waktu atau data Firestore kosong, tambahkan data dari Realtime Database
-        if not start_param or not end_param or len(firestore_data) == 0:
-            # Ambil data dari Firebase Realtime Database
-            ref_dht = db.reference('/DHT')
-            dht_data = ref_dht.get()
+        # Pagination: ?cursor=<token dari header X-Next-Cursor halaman sebelumnya>
+        # melanjutkan ke `limit` record yang lebih lama. Sumber ditentukan sekali
+        # agar cursor dan halaman memakai sumber yang sama selama backfill store
+        from_store = use_sensor_store()
+        after = None
+        cursor_param = request.args.get('cursor')
+        first_page = not cursor_param
+        if cursor_param:
+            try:
+                position = decode_cursor(cursor_param, sensor_cursor_scope(start_param, end_param, from_store))
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
+            # Cursor tanpa doc_id menunjuk ke awal data, tanpa Realtime Database (lihat pemotongan di bawah)
+            after = position if position[1] is not None else None
 
-            ref_soil = db.reference('/SoilMoisture')
-            soil_moisture_data = ref_soil.get()
+        # Tanpa rentang waktu data Realtime Database selalu dibutuhkan di halaman
+        # pertama, jadi ambil bersamaan dengan pembacaan Firestore/store lokal
+        if first_page and (not start_param or not end_param):
+            (firestore_data, next_position), realtime_snapshot = parallel_reader.gather(
+                lambda: query_sensor_records(start_param, end_param, limit_param, from_store=from_store),
+                rtdb_snapshot_cache.get
+            )
+        else:
+            firestore_data, next_position = query_sensor_records(start_param, end_param, limit_param, after, from_store)
+            realtime_snapshot = None
+
+        # Jika tidak ada parameter waktu atau data Firestore kosong, tambahkan data dari Realtime Database
+        if first_page and (not start_param or not end_param or len(firestore_data) == 0):
+            # Ambil data dari Firebase Realtime Database (melalui cache bersama)
+            dht_data, soil_moisture_data = realtime_snapshot or rtdb_snapshot_cache.get()
 
             # Data Realtime Database (data terbaru)
             if dht_data and soil_moisture_data:
@@ -330,122 +860,330 @@ def get_sensor_data():
                         'source': 'realtime_db'
                     })
 
-        # Sorting data berdasarkan metode yang dipilih
-        if sort_method == 'datetime':
-            logger.info("Sorting data by detailed datetime (year -> month -> day -> hour -> minute -> second)")
-            firestore_data.sort(key=get_detailed_sort_key)
-        else:
-            logger.info("Sorting data by timestamp")
+        # Sorting berdasarkan timestamp float. Untuk sort=datetime urutannya sama
+        # dengan (tahun, bulan, tanggal, jam, menit, detik) waktu lokal
+        with phase_timer.span('sort'):
             firestore_data.sort(key=lambda x: x['timestamp'])
         
-        # Batasi jumlah data sesuai limit
-        if len(firestore_data) > limit_param:
-            firestore_data = firestore_data[-limit_param:]
-            # Urutkan ulang data yang sudah dibatasi dengan metode yang sama
-            if sort_method == 'datetime':
-                firestore_data.sort(key=get_detailed_sort_key)
-            else:
-                firestore_data.sort(key=lambda x: x['timestamp'])
+        # Batasi jumlah data sesuai limit (potongan list terurut tetap terurut)
+        with phase_timer.span('trim'):
+            if len(firestore_data) > limit_param:
+                firestore_data = firestore_data[-limit_param:]
+                # Record Firestore yang terpotong oleh data Realtime Database dibaca di
+                # halaman berikutnya: lanjutkan setelah record Firestore tertua yang tersisa
+                kept = next((item for item in firestore_data if item['source'] == 'firestore'), None)
+                next_position = sensor_record_position(kept, from_store) if kept is not None else (None, None)
 
-        logger.info(f"Returning {len(firestore_data)} data points (sorted by {sort_method})")
+        logger.info("Returning %d data points (sorted by %s)", len(firestore_data), sort_method)
         
-        if firestore_data:
+        if firestore_data and document_log.isEnabledFor(logging.DEBUG):
             first_dt = datetime.fromtimestamp(firestore_data[0]['timestamp'])
             last_dt = datetime.fromtimestamp(firestore_data[-1]['timestamp'])
-            logger.info(f"Time range: {first_dt.strftime('%Y-%m-%d %H:%M:%S')} to {last_dt.strftime('%Y-%m-%d %H:%M:%S')}")
+            document_log.debug("Time range: %s to %s", first_dt, last_dt)
             
             # Debug: tampilkan beberapa timestamp untuk verifikasi urutan
             if len(firestore_data) > 5:
-                logger.info("Sample timestamps (first 5 records):")
+                document_log.debug("Sample timestamps (first 5 records):")
                 for i in range(min(5, len(firestore_data))):
-                    dt = datetime.fromtimestamp(firestore_data[i]['timestamp'])
-                    original_dt = firestore_data[i].get('original_datetime', 'N/A')
-                    original_ts = firestore_data[i].get('original_timestamp', 'N/A')
-                    logger.info(f"  {i+1}. Parsed: {dt.strftime('%Y-%m-%d %H:%M:%S')}, Original DateTime: {original_dt}, Original Timestamp: {original_ts}, Source: {firestore_data[i].get('source', 'unknown')}")
+                    document_log.debug("  %d. Parsed: %s, Original DateTime: %s, Original Timestamp: %s, Source: %s",
+                                       i + 1, datetime.fromtimestamp(firestore_data[i]['timestamp']),
+                                       firestore_data[i].get('original_datetime', 'N/A'),
+                                       firestore_data[i].get('original_timestamp', 'N/A'),
+                                       firestore_data[i].get('source', 'unknown'))
 
         # Bersihkan data sebelum mengirim (hapus field debug)
-        clean_data = []
-        for item in firestore_data:
-            clean_item = {
-                'timestamp': item['timestamp'],
-                'humidity': item['humidity'],
-                'temperature': item['temperature'],
-                'soil_moisture': item['soil_moisture'],
-                'source': item['source']
-            }
-            clean_data.append(clean_item)
+        with phase_timer.span('serialize'):
+            clean_data = []
+            for item in firestore_data:
+                clean_item = {
+                    'timestamp': item['timestamp'],
+                    'humidity': item['humidity'],
+                    'temperature': item['temperature'],
+                    'soil_moisture': item['soil_moisture'],
+                    'source': item['source']
+                }
+                clean_data.append(clean_item)
+
+            response = jsonify(clean_data)
+            if next_position is not None:
+                response.headers['X-Next-Cursor'] = encode_cursor(sensor_cursor_scope(start_param, end_param, from_store), *next_position)
+            return response
+
+    except Exception as e:
+        logger.error("Error in get_sensor_data: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+def build_latest_data(dht_data, soil_data):
+    """Fungsi untuk menyusun payload data sensor terbaru dari snapshot /DHT dan /SoilMoisture."""
+    # Inisialisasi nilai default
+    suhu_udara = 0
+    kelembapan_udara = 0
+    kelembapan_tanah = 0
+    timestamp = datetime.now().timestamp()
+    
+    # Ambil data DHT
+    if dht_data:
+        if isinstance(dht_data, dict):
+            suhu_udara = dht_data.get('temperature', 0)
+            kelembapan_udara = dht_data.get('humidity', 0)
+            # Jika ada latestUpdate, parse dengan fungsi yang diperbaiki
+            if 'latestUpdate' in dht_data:
+                parsed_timestamp = parse_datetime_string(dht_data.get('latestUpdate'))
+                if parsed_timestamp:
+                    timestamp = parsed_timestamp
+                else:
+                    timestamp = normalize_timestamp(dht_data.get('latestUpdate'))
+        else:
+            logger.warning("DHT data is not dict: %s", type(dht_data))
+    
+    # Ambil data kelembapan tanah
+    if soil_data:
+        if isinstance(soil_data, dict):
+            kelembapan_tanah = soil_data.get('percentage', 0)
+            # Update timestamp jika soil data memiliki latestUpdate yang lebih baru
+            if 'latestUpdate' in soil_data:
+                parsed_timestamp = parse_datetime_string(soil_data.get('latestUpdate'))
+                if parsed_timestamp:
+                    soil_timestamp = parsed_timestamp
+                else:
+                    soil_timestamp = normalize_timestamp(soil_data.get('latestUpdate'))
+                
+                # Gunakan timestamp yang lebih baru
+                if soil_timestamp > timestamp:
+                    timestamp = soil_timestamp
+        else:
+            logger.warning("Soil data is not dict: %s", type(soil_data))
+    
+    return {
+        'suhu_udara': float(suhu_udara) if suhu_udara else 0,
+        'kelembapan_udara': float(kelembapan_udara) if kelembapan_udara else 0,
+        'kelembapan_tanah': float(kelembapan_tanah) if kelembapan_tanah else 0,
+        'timestamp': timestamp
+    }
+
+@app.route('/api/sensor-rollups')
+def get_sensor_rollups():
+    """
+    Endpoint untuk mendapatkan rollup data sensor per jam atau per hari
+    (count, min/mean/max, dan porsi keputusan siram) dari store lokal.
+    """
+    if rollup_store is None:
+        return jsonify({'error': 'Rollup membutuhkan store lokal (SENSOR_STORE_PATH)'}), 503
+    if not use_sensor_store():
+        return jsonify({'error': 'Store lokal sedang backfill dari Firestore, coba lagi nanti'}), 503
 
-        return jsonify(clean_data)
+    try:
+        granularity = request.args.get('granularity', default='hour', type=str)
+        start_param = request.args.get('start', type=int)
+        end_param = request.args.get('end', type=int)
+
+        sync_sensor_store()
+        try:
+            rollups = rollup_store.query(granularity, start_param, end_param)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        keys = list(rollups.keys())
+        data = [dict(zip(keys, values)) for values in zip(*(rollups[key].tolist() for key in keys))]
+        return jsonify({
+            'success': True,
+            'granularity': granularity,
+            'data': data,
+            'count': len(data)
+        })
 
     except Exception as e:
-        logger.error(f"Error in get_sensor_data: {str(e)}")
+        logger.error("Error in get_sensor_rollups: %s", e)
         return jsonify({'error': str(e)}), 500
 
+@app.cli.command('rollup-backfill')
+@click.option('--chunk-days', default=7, show_default=True, help='Jumlah hari per potongan backfill.')
+@click.option('--restart', is_flag=True, help='Mulai ulang dari awal, abaikan posisi tersimpan.')
+def rollup_backfill_command(chunk_days, restart):
+    """Sinkronkan store lokal lalu bangun ulang rollup jam/hari (dapat dilanjutkan)."""
+    if rollup_store is None:
+        raise click.ClickException('Atur SENSOR_STORE_PATH untuk mengaktifkan store lokal dan rollup')
+
+    synced = sync_sensor_store(force=True)
+    click.echo(f"{synced} dokumen disinkronkan dari Firestore")
+
+    def progress(position, last_ts):
+        click.echo(f"  rollup sampai {datetime.fromtimestamp(min(position, last_ts)).strftime('%Y-%m-%d')}")
+
+    chunks = rollup_store.backfill(chunk_days=chunk_days, restart=restart, progress=progress)
+    click.echo(f"Backfill selesai: {chunks} potongan, {rollup_store.stats()['rows']}")
+
+@app.cli.command('seed-local')
+@click.option('--rows', default=1000000, show_default=True, help='Jumlah pembacaan sintetis.')
+@click.option('--interval', default=60.0, show_default=True, help='Jarak antar pembacaan (detik).')
+@click.option('--collection', default='sensor_history', show_default=True, help='Koleksi tujuan.')
+@click.option('--seed', default=0, show_default=True, help='Seed generator acak.')
+def seed_local_command(rows, interval, collection, seed):
+    """Isi backend lokal (DATA_BACKEND=local) dengan pembacaan sensor sintetis."""
+    if DATA_BACKEND != 'local':
+        raise click.ClickException('Atur DATA_BACKEND=local untuk mengisi backend lokal')
+    if LOCAL_DATA_PATH == ':memory:':
+        raise click.ClickException('Atur LOCAL_DATA_PATH ke file SQLite agar data tersimpan')
+
+    firebase_resource.get()
+    started = time.perf_counter()
+
+    def progress(written):
+        click.echo(f"  {written}/{rows} pembacaan ditulis")
+
+    written = seed_sensor_history(local_database, rows, collection=collection, interval=interval,
+                                  seed=seed, progress=progress)
+    click.echo(f"{written} pembacaan ditulis ke {collection} dalam {time.perf_counter() - started:.1f} s")
+
+@app.cli.command('export-model')
+def export_model_command():
+    """Kompilasi model_rf dan tulis artefak mmap (jalankan sekali sebelum menjalankan worker)."""
+    rf_forest = export_model_artifact()
+    click.echo(f"Artefak ditulis ke {MODEL_ARTIFACT_PATH}: {rf_forest.n_trees} pohon, {rf_forest.n_nodes} node")
+
+@app.cli.command('publish-model')
+@click.option('--version', default=None, help='Nama versi (default: timestamp)')
+@click.option('--no-activate', is_flag=True, help='Daftarkan tanpa menjadikannya versi aktif')
+def publish_model_command(version, no_activate):
+    """Kompilasi model_rf dan publikasikan sebagai versi baru di registry model."""
+    rf_forest = load_random_forest()
+    version = model_registry.publish(
+        rf_forest, version=version, metadata={'source_sha256': file_sha256(model_path)},
+        activate=not no_activate
+    )
+    click.echo(f"Model versi {version} dipublikasikan ke {MODEL_REGISTRY_DIR}")
+
+@app.cli.command('activate-model')
+@click.argument('version')
+def activate_model_command(version):
+    """Jadikan versi yang sudah ada di registry sebagai versi aktif (juga untuk rollback)."""
+    model_registry.activate(version)
+    click.echo(f"Model versi {version} aktif; worker menukar model dalam {model_registry.poll_interval:.0f} detik")
+
+@app.cli.command('compact-model')
+@click.option('--steps', default='prune,quantize,merge', show_default=True,
+              help='Langkah dipisah koma: prune, quantize, merge, distill.')
+@click.option('--prune-trees', type=int, default=None, help='Jumlah pohon hasil prune (default: sampai --min-agreement).')
+@click.option('--min-agreement', default=0.999, show_default=True, help='Kesesuaian kelas minimum untuk prune.')
+@click.option('--distill-depth', default=12, show_default=True, help='Kedalaman pohon hasil distilasi.')
+@click.option('--output', default=None, help='Simpan artefak ke path ini alih-alih ke registry.')
+@click.option('--activate', is_flag=True, help='Jadikan model hasil pemadatan sebagai versi aktif.')
+def compact_model_command(steps, prune_trees, min_agreement, distill_depth, output, activate):
+    """Padatkan model_rf (prune/quantize/merge/distill) dan publikasikan hasilnya."""
+    steps = [step.strip() for step in steps.split(',') if step.strip()]
+    rf_forest = load_random_forest()
+    try:
+        compacted, report = compaction.compact(
+            rf_forest, steps, prune_trees=prune_trees, min_agreement=min_agreement, distill_depth=distill_depth
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    X = compaction.sample_domain(rf_forest, 10000, seed=7)
+    for name, forest in (('asli', rf_forest), ('padat', compacted)):
+        latency, throughput = training.measure_inference(forest, X)
+        click.echo(f"{name:>6}: {forest.n_trees} pohon, {forest.n_nodes} node, kedalaman {forest.max_depth}, "
+                   f"artefak {training.artifact_size(forest) / 1024:.0f} KB, "
+                   f"{latency * 1e6:.0f} us per baris, {throughput:.0f} baris/detik")
+    click.echo(f"Kesesuaian kelas {report['class_agreement']:.5f}, selisih probabilitas "
+               f"maks {report['max_abs_diff']:.4f} / rata-rata {report['mean_abs_diff']:.5f}")
+
+    if output:
+        compacted.save(output, metadata={'source_sha256': file_sha256(model_path)})
+        click.echo(f"Artefak ditulis ke {output}")
+    else:
+        version = model_registry.publish(
+            compacted, metadata={'source_sha256': file_sha256(model_path), 'compaction': steps,
+                                 'class_agreement': report['class_agreement']},
+            activate=activate
+        )
+        state = 'aktif' if activate else 'belum aktif (flask activate-model)'
+        click.echo(f"Model versi {version} dipublikasikan ke {MODEL_REGISTRY_DIR}, {state}")
+
+@app.cli.command('train')
+@click.option('--source', default='sensor_history', show_default=True,
+              help="sensor_history, watering_analysis, store, atau path file ekspor .ndjson/.csv")
+@click.option('--start', type=float, default=None, help='Timestamp awal data latih.')
+@click.option('--end', type=float, default=None, help='Timestamp akhir data latih.')
+@click.option('--trees', default=training.DEFAULT_TREES, show_default=True)
+@click.option('--max-depth', default=training.DEFAULT_MAX_DEPTH, show_default=True)
+@click.option('--n-jobs', default=-1, show_default=True, help='Jumlah proses fit paralel (-1 = semua CPU).')
+@click.option('--max-samples', type=float, default=None, help='Fraksi sampel bootstrap per pohon.')
+@click.option('--chunk-rows', default=10000, show_default=True, help='Baris per potongan pemuatan data.')
+@click.option('--max-rows', type=int, default=None, help='Batas jumlah baris data latih.')
+@click.option('--holdout', default=0.2, show_default=True, help='Fraksi data terbaru untuk evaluasi.')
+@click.option('--output', default=None, help='Simpan artefak ke path ini alih-alih ke registry.')
+@click.option('--activate', is_flag=True, help='Jadikan versi hasil latih sebagai versi aktif.')
+def train_command(source, start, end, trees, max_depth, n_jobs, max_samples, chunk_rows, max_rows, holdout, output, activate):
+    """Latih ulang Random Forest dari data sensor dan publikasikan ke registry model."""
+    label_field = None
+    if source == 'sensor_history':
+        records = iter_firestore_sensor_records(start, end)
+    elif source == 'watering_analysis':
+        # Label dari keputusan yang sudah tersimpan pada setiap analisis
+        query = firestore_client.collection('watering_analysis')
+        if start and end:
+            query = query.where('timestamp', '>=', start).where('timestamp', '<=', end)
+        records = (doc.to_dict() for doc in query.order_by('timestamp').stream())
+        label_field = 'keputusan_penyiraman'
+    elif source == 'store':
+        if sensor_store is None:
+            raise click.ClickException('Atur SENSOR_STORE_PATH untuk melatih dari store lokal')
+        sync_sensor_store(force=True)
+        records = sensor_store.iter_records(start, end, batch_size=chunk_rows)
+    elif os.path.exists(source):
+        records = training.iter_export_file(source)
+    else:
+        raise click.ClickException(f"Sumber data tidak dikenal: {source}")
+
+    def progress(rows):
+        click.echo(f"  {rows} baris dimuat")
+
+    started = time.perf_counter()
+    training_set = training.load_training_set(records, label_field, chunk_rows, max_rows, progress)
+    load_seconds = time.perf_counter() - started
+    click.echo(f"Data latih: {len(training_set)} baris ({training_set.nbytes / 1e6:.1f} MB) dalam {load_seconds:.1f}s")
+
+    try:
+        rf_forest, report = training.train(
+            training_set, holdout=holdout, n_estimators=trees, max_depth=max_depth,
+            n_jobs=n_jobs, max_samples=max_samples
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"Fit: {report['fit_seconds']:.1f}s (n_jobs={report['n_jobs']}), "
+               f"{report['trees']} pohon, {report['nodes']} node, artefak {report['artifact_bytes'] / 1024:.0f} KB")
+    if 'holdout_accuracy' in report:
+        click.echo(f"Akurasi holdout ({report['test_rows']} baris terbaru): {report['holdout_accuracy']:.4f}")
+    click.echo(f"Inferensi: {report['latency_seconds'] * 1e6:.0f} us per baris, "
+               f"{report['batch_rows_per_second']:.0f} baris/detik dalam batch")
+
+    if output:
+        rf_forest.save(output, metadata={'source': source})
+        click.echo(f"Artefak ditulis ke {output}")
+    else:
+        version = model_registry.publish(rf_forest, metadata={'source': source}, activate=activate)
+        state = 'aktif' if activate else 'belum aktif (flask activate-model)'
+        click.echo(f"Model versi {version} dipublikasikan ke {MODEL_REGISTRY_DIR}, {state}")
+
 @app.route('/api/latest-data')
 def get_latest_data():
     """Endpoint untuk mendapatkan data sensor terbaru dengan timestamp yang benar."""
     try:
-        # Ambil data terbaru dari Firebase Realtime Database
-        ref_dht = db.reference('/DHT')
-        dht_data = ref_dht.get()
-        
-        ref_soil = db.reference('/SoilMoisture')
-        soil_data = ref_soil.get()
-        
-        print("DHT Data:", dht_data)
-        print("Soil Data:", soil_data)
-        
-        # Inisialisasi nilai default
-        suhu_udara = 0
-        kelembapan_udara = 0
-        kelembapan_tanah = 0
-        timestamp = datetime.now().timestamp()
-        
-        # Ambil data DHT
-        if dht_data:
-            if isinstance(dht_data, dict):
-                suhu_udara = dht_data.get('temperature', 0)
-                kelembapan_udara = dht_data.get('humidity', 0)
-                # Jika ada latestUpdate, parse dengan fungsi yang diperbaiki
-                if 'latestUpdate' in dht_data:
-                    parsed_timestamp = parse_datetime_string(dht_data.get('latestUpdate'))
-                    if parsed_timestamp:
-                        timestamp = parsed_timestamp
-                    else:
-                        timestamp = normalize_timestamp(dht_data.get('latestUpdate'))
-            else:
-                print(f"DHT data is not dict: {type(dht_data)}")
-        
-        # Ambil data kelembapan tanah
-        if soil_data:
-            if isinstance(soil_data, dict):
-                kelembapan_tanah = soil_data.get('percentage', 0)
-                # Update timestamp jika soil data memiliki latestUpdate yang lebih baru
-                if 'latestUpdate' in soil_data:
-                    parsed_timestamp = parse_datetime_string(soil_data.get('latestUpdate'))
-                    if parsed_timestamp:
-                        soil_timestamp = parsed_timestamp
-                    else:
-                        soil_timestamp = normalize_timestamp(soil_data.get('latestUpdate'))
-                    
-                    # Gunakan timestamp yang lebih baru
-                    if soil_timestamp > timestamp:
-                        timestamp = soil_timestamp
-            else:
-                print(f"Soil data is not dict: {type(soil_data)}")
+        # Ambil data terbaru dari Firebase Realtime Database (melalui cache bersama)
+        dht_data, soil_data = rtdb_snapshot_cache.get()
         
-        result = {
-            'suhu_udara': float(suhu_udara) if suhu_udara else 0,
-            'kelembapan_udara': float(kelembapan_udara) if kelembapan_udara else 0,
-            'kelembapan_tanah': float(kelembapan_tanah) if kelembapan_tanah else 0,
-            'timestamp': timestamp
-        }
+        payload_log.debug("DHT Data: %s", dht_data)
+        payload_log.debug("Soil Data: %s", soil_data)
+        
+        result = build_latest_data(dht_data, soil_data)
         
-        print("Returning result:", result)
+        payload_log.debug("Returning result: %s", result)
         return jsonify(result)
 
     except Exception as e:
-        print("Error in get_latest_data:", str(e))
+        logger.error("Error in get_latest_data: %s", e)
         return jsonify({
             'error': str(e),
             'suhu_udara': 0,
@@ -454,13 +1192,58 @@ def get_latest_data():
             'timestamp': datetime.now().timestamp()
         }), 500
 
+# Hub broadcast untuk /api/stream; listener Firebase baru dijalankan saat klien pertama terhubung
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MS = 5000
+# Batas koneksi SSE per worker; harus di bawah jumlah thread worker (gunicorn.conf.py)
+SSE_MAX_CLIENTS = int(os.environ.get('SSE_MAX_CLIENTS', '16'))
+live_hub = BroadcastHub(max_subscribers=SSE_MAX_CLIENTS)
+live_feed = LiveFeed(
+    LocalListenerSource(firestore_client, rtdb) if DATA_BACKEND == 'local'
+    else FirebaseListenerSource(firestore_client, rtdb),
+    live_hub,
+    build_latest=build_latest_data,
+    on_snapshot=rtdb_snapshot_cache.set
+)
+atexit.register(live_feed.stop)
+
+@app.route('/api/stream')
+def stream_live_updates():
+    """
+    Endpoint Server-Sent Events untuk update live data sensor terbaru
+    (event `latest-data`) dan riwayat analisis (event `watering-analysis`).
+    Setiap koneksi menahan satu thread, sehingga gunicorn dijalankan dengan
+    worker gthread (gunicorn.conf.py) dan koneksi dibatasi SSE_MAX_CLIENTS per
+    worker; klien di atas batas mendapat 503 dan dashboard kembali ke polling.
+    """
+    subscription = live_hub.subscribe()
+    if subscription is None:
+        return jsonify({'error': 'Terlalu banyak koneksi live, gunakan polling'}), 503, {'Retry-After': '60'}
+    live_feed.ensure_started()
+
+    def generate():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                message = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                # Komentar SSE sebagai heartbeat agar koneksi tidak diputus proxy
+                yield message if message is not None else ": ping\n\n"
+        finally:
+            live_hub.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 # Endpoint untuk debugging timestamp
 @app.route('/api/debug-timestamps')
 def debug_timestamps():
     """Endpoint untuk debugging timestamp di Firestore dengan informasi lebih detail."""
     try:
         collection_ref = firestore_client.collection('sensor_history')
-        docs = collection_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(10).stream()
+        docs = collection_ref.order_by('timestamp', direction=QUERY_DESCENDING).limit(10).stream()
         
         debug_data = []
         for doc in docs:
@@ -500,175 +1283,277 @@ def debug_timestamps():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Antrian write-behind untuk hasil analisis: request/scheduler tidak menunggu commit Firestore
+analysis_writer = WriteBehindQueue(
+    firestore_client,
+    batch_size=int(os.environ.get('ANALYSIS_WRITE_BATCH_SIZE', '20')),
+    flush_interval=float(os.environ.get('ANALYSIS_WRITE_FLUSH_SECONDS', '2')),
+    spill_path=os.environ.get(
+        'ANALYSIS_SPILL_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'watering_analysis_spill.jsonl')
+    ),
+    on_commit=lambda _count, seconds: phase_timer.observe('firestore_write', seconds)
+)
+
+# Zona (petak kebun) yang dianalisis setiap jadwal; lihat zones.py untuk format
+WATERING_ZONES = parse_zones(os.environ.get('WATERING_ZONES'))
+ZONE_FETCH_WORKERS = int(os.environ.get('ZONE_FETCH_WORKERS', '8'))
+
+# Ringkasan (termasuk waktu per zona) dari analisis terjadwal terakhir
+last_scheduled_run = None
+
 # Sisanya sama seperti kode asli...
 def scheduled_watering_analysis():
     """
-    Fungsi untuk melakukan analisis penyiraman terjadwal.
-    Dipanggil otomatis oleh scheduler.
+    Fungsi untuk melakukan analisis penyiraman terjadwal untuk semua zona.
+    Dipanggil otomatis oleh scheduler. Data terbaru setiap zona diambil
+    secara paralel, semua zona diprediksi dengan satu panggilan vektor, lalu
+    hasilnya masuk antrian tulis batch.
     """
+    global last_scheduled_run
+    started = time.perf_counter()
     try:
-        logger.info("Memulai analisis penyiraman terjadwal...")
+        logger.info("Memulai analisis penyiraman terjadwal untuk %d zona...", len(WATERING_ZONES))
         
-        # Ambil data terbaru dari sensor_history
-        collection_ref = firestore_client.collection('sensor_history')
-        docs = collection_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(1).stream()
+        # Ambil data terbaru dari koleksi sensor setiap zona secara paralel
+        readings = fetch_latest_readings(firestore_client, WATERING_ZONES, ZONE_FETCH_WORKERS, direction=QUERY_DESCENDING)
+        fetched = time.perf_counter()
         
-        latest_data = None
-        for doc in docs:
-            latest_data = doc.to_dict()
-            break
-            
-        if not latest_data:
+        available = [reading for reading in readings if reading['data']]
+        if not available:
             logger.error("Tidak ada data sensor tersedia untuk analisis terjadwal")
-            return
-            
-        # Ekstrak data sensor
-        temperature = float(latest_data.get('temperature', 0))
-        humidity = float(latest_data.get('humidity', 0))
-        soil_moisture = float(latest_data.get('soil_moisture', 0))
-        
-        # Lakukan prediksi berdasarkan ambang batas
-        watering_decision = check_watering_conditions(temperature, humidity, soil_moisture)
         
-        # Tentukan alasan keputusan
-        reasons = []
-        if temperature < 20:
-            reasons.append(f"Suhu terlalu rendah ({temperature}°C < 20°C)")
-        elif temperature > 31:
-            reasons.append(f"Suhu terlalu tinggi ({temperature}°C > 31°C)")
-            
-        if humidity < 75:
-            reasons.append(f"Kelembapan udara terlalu rendah ({humidity}% < 75%)")
-        elif humidity > 80:
-            reasons.append(f"Kelembapan udara terlalu tinggi ({humidity}% > 80%)")
-            
-        if soil_moisture < 60:
-            reasons.append(f"Kelembapan tanah terlalu rendah ({soil_moisture}% < 60%)")
-        elif soil_moisture > 75:
-            reasons.append(f"Kelembapan tanah terlalu tinggi ({soil_moisture}% > 75%)")
-        
-        decision_text = "siram" if watering_decision == 1 else "jangan siram"
-        reason_text = "; ".join(reasons) if reasons else "Semua parameter dalam rentang optimal"
+        # Ekstrak data sensor semua zona sebagai kolom
+        temperature = np.array([float(reading['data'].get('temperature', 0)) for reading in available])
+        humidity = np.array([float(reading['data'].get('humidity', 0)) for reading in available])
+        soil_moisture = np.array([float(reading['data'].get('soil_moisture', 0)) for reading in available])
         
         # Waktu saat ini
         current_time = datetime.now()
         
-        # Data untuk disimpan ke watering_analysis
-        analysis_result = {
-            'humidity': humidity,
-            'soil_moisture': soil_moisture, 
-            'temperature': temperature,
-            'time': current_time.isoformat(),
-            'timestamp': current_time.timestamp(),
-            'keputusan_penyiraman': watering_decision,
-            'keputusan_text': decision_text,
-            'alasan': reason_text,
-            'created_at': current_time.isoformat(),
-            'analysis_type': 'scheduled',
-            'scheduled_time': current_time.strftime('%H:%M')
-        }
+        # Lakukan prediksi berdasarkan ambang batas beserta alasannya (semua zona sekaligus)
+        decisions, reason_codes = watering_rules.evaluate(temperature, humidity, soil_moisture)
+        reasons = watering_rules.reason_texts(reason_codes, temperature, humidity, soil_moisture)
         
         # Jika model Random Forest tersedia, tambahkan prediksi RF
-        if rf_model is not None:
+        rf_results = None
+        if get_rf_forest() is not None and available:
             try:
-                features = np.array([[temperature, humidity, soil_moisture]])
-                rf_prediction = rf_model.predict(features)[0]
-                rf_probability = rf_model.predict_proba(features)[0]
-                
-                analysis_result.update({
-                    'rf_prediction': int(rf_prediction),
-                    'rf_confidence': float(max(rf_probability) * 100),
-                    'rf_probability_no_water': float(rf_probability[0]),
-                    'rf_probability_water': float(rf_probability[1])
-                })
+                rf_results = predict_random_forest_batch(temperature, humidity, soil_moisture, current_time.hour)
             except Exception as e:
-                logger.error(f"Error using Random Forest model in scheduled analysis: {e}")
+                logger.error("Error using Random Forest model in scheduled analysis: %s", e)
+        predicted = time.perf_counter()
         
-        # Simpan hasil analisis ke koleksi 'watering_analysis'
-        analysis_collection = firestore_client.collection('watering_analysis')
-        doc_ref = analysis_collection.add(analysis_result)
+        for i, reading in enumerate(available):
+            watering_decision = int(decisions[i])
+            decision_text = "siram" if watering_decision == 1 else "jangan siram"
+            reason_text = next(reasons)
+            
+            # Data untuk disimpan ke watering_analysis
+            analysis_result = {
+                'humidity': float(humidity[i]),
+                'soil_moisture': float(soil_moisture[i]), 
+                'temperature': float(temperature[i]),
+                'time': current_time.isoformat(),
+                'timestamp': current_time.timestamp(),
+                'keputusan_penyiraman': watering_decision,
+                'keputusan_text': decision_text,
+                'alasan': reason_text,
+                'created_at': current_time.isoformat(),
+                'analysis_type': 'scheduled',
+                'scheduled_time': current_time.strftime('%H:%M'),
+                'zone': reading['zone']
+            }
+            if rf_results is not None:
+                analysis_result.update(rf_results[i])
+            
+            # Simpan hasil analisis ke koleksi 'watering_analysis' (di-batch secara asinkron)
+            reading['analysis_id'] = analysis_writer.enqueue('watering_analysis', analysis_result)
+            reading['decision'] = decision_text
+            
+            logger.info("[%s] Analisis terjadwal masuk antrian simpan dengan ID: %s", reading['zone'], reading['analysis_id'])
+            logger.info("[%s] Keputusan: %s - Alasan: %s", reading['zone'], decision_text, reason_text)
+            logger.info("[%s] Data sensor - Suhu: %s°C, Kelembapan Udara: %s%%, Kelembapan Tanah: %s%%",
+                        reading['zone'], temperature[i], humidity[i], soil_moisture[i])
+        finished = time.perf_counter()
         
-        logger.info(f"Analisis terjadwal berhasil disimpan dengan ID: {doc_ref[1].id}")
-        logger.info(f"Keputusan: {decision_text} - Alasan: {reason_text}")
-        logger.info(f"Data sensor - Suhu: {temperature}°C, Kelembapan Udara: {humidity}%, Kelembapan Tanah: {soil_moisture}%")
+        last_scheduled_run = {
+            'time': current_time.isoformat(),
+            'zones_total': len(readings),
+            'zones_analyzed': len(available),
+            'fetch_ms': (fetched - started) * 1000,
+            'predict_ms': (predicted - fetched) * 1000,
+            'enqueue_ms': (finished - predicted) * 1000,
+            'total_ms': (finished - started) * 1000,
+            'zones': [
+                {
+                    'zone': reading['zone'],
+                    'collection': reading['collection'],
+                    'status': 'error' if reading['error'] else ('ok' if reading['data'] else 'no_data'),
+                    'fetch_ms': reading['fetch_seconds'] * 1000,
+                    'sensor_doc_id': reading['doc_id'],
+                    'analysis_id': reading.get('analysis_id'),
+                    'decision': reading.get('decision'),
+                    'error': reading['error']
+                }
+                for reading in readings
+            ]
+        }
+        logger.info("Analisis terjadwal selesai: %d/%d zona dalam %.1f ms",
+                    len(available), len(readings), last_scheduled_run['total_ms'])
+        scheduler_job_seconds.observe(finished - started, job='watering_analysis', status='ok')
         
     except Exception as e:
-        logger.error(f"Error in scheduled watering analysis: {str(e)}")
-
-# Inisialisasi scheduler
-scheduler = BackgroundScheduler()
+        logger.error("Error in scheduled watering analysis: %s", e)
+        scheduler_job_seconds.observe(time.perf_counter() - started, job='watering_analysis', status='error')
 
-# Tambahkan job terjadwal untuk analisis penyiraman
+# Jadwal analisis penyiraman
 scheduled_hours = [6, 8, 10, 12, 14, 16, 18]
 
-for hour in scheduled_hours:
-    scheduler.add_job(
-        func=scheduled_watering_analysis,
-        trigger=CronTrigger(hour=hour, minute=0),
-        id=f'watering_analysis_{hour:02d}00',
-        name=f'Analisis Penyiraman {hour:02d}:00',
-        replace_existing=True
-    )
+def start_scheduler():
+    """Fungsi untuk membuat dan menjalankan scheduler analisis (fase startup 'scheduler')."""
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
+    # Inisialisasi scheduler
+    scheduler = BackgroundScheduler()
+
+    # Tambahkan job terjadwal untuk analisis penyiraman
+    for hour in scheduled_hours:
+        scheduler.add_job(
+            func=scheduled_watering_analysis,
+            trigger=CronTrigger(hour=hour, minute=0),
+            id=f'watering_analysis_{hour:02d}00',
+            name=f'Analisis Penyiraman {hour:02d}:00',
+            replace_existing=True
+        )
+
+    # Mulai scheduler
+    scheduler.start()
+    logger.info("Scheduler untuk analisis penyiraman otomatis telah dimulai")
+    logger.info("Jadwal analisis: %s", ', '.join(f'{h:02d}:00' for h in scheduled_hours))
+    return scheduler
 
-# Mulai scheduler
-scheduler.start()
-logger.info("Scheduler untuk analisis penyiraman otomatis telah dimulai")
-logger.info(f"Jadwal analisis: {', '.join([f'{h:02d}:00' for h in scheduled_hours])}")
+scheduler_resource = LazyResource('scheduler', start_scheduler, startup_report, required=False)
+
+# Scheduler hanya dijalankan oleh satu proses. Thread BackgroundScheduler tidak ikut
+# ter-fork, jadi scheduler tidak dimulai saat import (master gunicorn dengan
+# --preload) maupun oleh warm-up setiap worker, yang akan menjalankan analisis
+# sebanyak jumlah worker. Di gunicorn, hook post_worker_init (gunicorn.conf.py)
+# memanggil start_scheduler_leader() di setiap worker dan hanya worker yang
+# memegang flock pada SCHEDULER_LOCK_PATH yang menjalankannya; lock lepas saat
+# worker itu mati sehingga worker penggantinya mengambil alih. `python app.py`
+# memanggilnya langsung. SCHEDULER_ENABLED=0 mematikan scheduler sama sekali.
+SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', '1') != '0'
+SCHEDULER_LOCK_PATH = os.environ.get(
+    'SCHEDULER_LOCK_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scheduler.lock')
+)
+_scheduler_lock_file = None
+
+def start_scheduler_leader():
+    """
+    Jalankan scheduler jika proses ini mendapat leader lock; return True jika
+    scheduler berjalan di proses ini. Lock ditahan sampai proses berakhir.
+    """
+    global _scheduler_lock_file
+    if not SCHEDULER_ENABLED:
+        return False
+    if _scheduler_lock_file is None and fcntl is not None:
+        try:
+            lock_file = open(SCHEDULER_LOCK_PATH, 'a')
+        except OSError as e:
+            # Worker tetap melayani request; scheduler tidak berjalan di proses ini
+            logger.warning("Lock scheduler tidak dapat dibuka di %s: %s", SCHEDULER_LOCK_PATH, e)
+            return False
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            logger.info("Scheduler dijalankan proses lain (lock %s dipegang)", SCHEDULER_LOCK_PATH)
+            return False
+        except OSError as e:
+            # Misalnya filesystem tanpa dukungan flock
+            lock_file.close()
+            logger.warning("Lock scheduler %s tidak dapat diambil: %s", SCHEDULER_LOCK_PATH, e)
+            return False
+        _scheduler_lock_file = lock_file
+    try:
+        scheduler_resource.get()
+    except Exception:
+        # Error sudah dicatat oleh LazyResource; worker tetap melayani request
+        return False
+    return True
+
+def shutdown_background_jobs():
+    """Hentikan scheduler lalu flush antrian tulis analisis saat aplikasi ditutup."""
+    if scheduler_resource.state == READY:
+        scheduler = scheduler_resource.get()
+        if scheduler.running:
+            scheduler.shutdown()
+    model_registry.stop()
+    analysis_writer.close()
 
 # Shutdown scheduler saat aplikasi ditutup
-atexit.register(lambda: scheduler.shutdown())
+atexit.register(shutdown_background_jobs)
 
 @app.route('/')
 def index():
     """Halaman utama yang menampilkan grafik data sensor."""
     return render_template('index.html')
 
+# Analisis manual terakhir di worker ini; analisis ulang dokumen sensor yang
+# sama dengan versi model yang sama tidak menulis dokumen baru. Memo ini hanya
+# jalur cepat per worker: ID dokumen watering_analysis diturunkan dari
+# sensor_doc_id dan versi model, sehingga worker lain yang menganalisis dokumen
+# yang sama menimpa dokumen yang sama, bukan menambah dokumen baru
+last_manual_analysis = None
+analysis_dedup = {'written': 0, 'skipped': 0}
+analysis_dedup_lock = threading.Lock()
+
+def manual_analysis_doc_id(sensor_doc_id, model_version):
+    """ID dokumen watering_analysis untuk analisis manual satu dokumen sensor dengan satu versi model."""
+    return f"manual-{sensor_doc_id}-{model_version or 'rules'}".replace('/', '_')
+
 @app.route('/api/analyze-watering')
 def analyze_watering():
     """
     Endpoint untuk melakukan analisis penyiraman berdasarkan ambang batas yang ditentukan.
     Data diambil dari koleksi sensor_history dan hasil disimpan ke watering_analysis.
     """
+    global last_manual_analysis
     try:
         # Ambil data terbaru dari sensor_history
         collection_ref = firestore_client.collection('sensor_history')
-        docs = collection_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(1).stream()
+        docs = collection_ref.order_by('timestamp', direction=QUERY_DESCENDING).limit(1).stream()
         
         latest_data = None
+        sensor_doc_id = None
         for doc in docs:
             latest_data = doc.to_dict()
+            sensor_doc_id = doc.id
             break
             
         if not latest_data:
             return jsonify({'error': 'Tidak ada data sensor tersedia di sensor_history'}), 404
+        
+        # Dokumen sensor ini sudah dianalisis dengan model yang sama: kembalikan
+        # hasil sebelumnya tanpa menulis dokumen watering_analysis baru
+        active_model = get_active_model()
+        model_version = active_model.version if active_model is not None else None
+        with analysis_dedup_lock:
+            previous = last_manual_analysis
+            if previous is not None and previous['sensor_doc_id'] == sensor_doc_id and previous['model_version'] == model_version:
+                analysis_dedup['skipped'] += 1
+                return jsonify(dict(previous['response'], already_analyzed=True))
             
         # Ekstrak data sensor
         temperature = float(latest_data.get('temperature', 0))
         humidity = float(latest_data.get('humidity', 0))
         soil_moisture = float(latest_data.get('soil_moisture', 0))
         
-        # Lakukan prediksi berdasarkan ambang batas
-        watering_decision = check_watering_conditions(temperature, humidity, soil_moisture)
-        
-        # Tentukan alasan keputusan
-        reasons = []
-        if temperature < 20:
-            reasons.append(f"Suhu terlalu rendah ({temperature}°C < 20°C)")
-        elif temperature > 31:
-            reasons.append(f"Suhu terlalu tinggi ({temperature}°C > 31°C)")
-            
-        if humidity < 75:
-            reasons.append(f"Kelembapan udara terlalu rendah ({humidity}% < 75%)")
-        elif humidity > 80:
-            reasons.append(f"Kelembapan udara terlalu tinggi ({humidity}% > 80%)")
-            
-        if soil_moisture < 60:
-            reasons.append(f"Kelembapan tanah terlalu rendah ({soil_moisture}% < 60%)")
-        elif soil_moisture > 75:
-            reasons.append(f"Kelembapan tanah terlalu tinggi ({soil_moisture}% > 75%)")
-        
-        decision_text = "siram" if watering_decision == 1 else "jangan siram"
-        reason_text = "; ".join(reasons) if reasons else "Semua parameter dalam rentang optimal"
+        # Lakukan prediksi berdasarkan ambang batas beserta alasannya
+        watering_decision, decision_text, reason_text = evaluate_watering_decision(temperature, humidity, soil_moisture)
         
         # Waktu saat ini
         current_time = datetime.now()
@@ -684,31 +1569,25 @@ def analyze_watering():
             'keputusan_text': decision_text,
             'alasan': reason_text,
             'created_at': current_time.isoformat(),
-            'analysis_type': 'manual'
+            'analysis_type': 'manual',
+            'sensor_doc_id': sensor_doc_id
         }
         
         # Jika model Random Forest tersedia, tambahkan prediksi RF sebagai perbandingan
-        if rf_model is not None:
+        if get_rf_forest() is not None:
             try:
-                features = np.array([[temperature, humidity, soil_moisture]])
-                rf_prediction = rf_model.predict(features)[0]
-                rf_probability = rf_model.predict_proba(features)[0]
-                
-                analysis_result.update({
-                    'rf_prediction': int(rf_prediction),
-                    'rf_confidence': float(max(rf_probability) * 100),
-                    'rf_probability_no_water': float(rf_probability[0]),
-                    'rf_probability_water': float(rf_probability[1])
-                })
+                analysis_result.update(predict_random_forest(temperature, humidity, soil_moisture, current_time.hour))
             except Exception as e:
-                print(f"Error using Random Forest model: {e}")
+                logger.error("Error using Random Forest model: %s", e)
         
-        # Simpan hasil analisis ke koleksi 'watering_analysis'
-        analysis_collection = firestore_client.collection('watering_analysis')
-        doc_ref = analysis_collection.add(analysis_result)
+        # Simpan hasil analisis ke koleksi 'watering_analysis' (di-batch secara
+        # asinkron); ID tetap per (dokumen sensor, versi model) sehingga idempoten
+        doc_id = analysis_writer.enqueue(
+            'watering_analysis', analysis_result, doc_id=manual_analysis_doc_id(sensor_doc_id, model_version)
+        )
         
-        print(f"Analisis berhasil disimpan dengan ID: {doc_ref[1].id}")
-        print(f"Keputusan: {decision_text} - Alasan: {reason_text}")
+        logger.info("Analisis masuk antrian simpan dengan ID: %s", doc_id)
+        logger.info("Keputusan: %s - Alasan: %s", decision_text, reason_text)
         
         # Return hasil analisis
         response_data = {
@@ -721,14 +1600,10 @@ def analyze_watering():
                 'humidity': humidity,
                 'soil_moisture': soil_moisture
             },
-            'thresholds': {
-                'temperature_range': '20-31°C',
-                'humidity_range': '75-80%',
-                'soil_moisture_range': '60-75%'
-            },
+            'thresholds': watering_rules.threshold_ranges(),
             'timestamp': analysis_result['timestamp'],
             'time': analysis_result['time'],
-            'doc_id': doc_ref[1].id
+            'doc_id': doc_id
         }
         
         # Tambahkan data Random Forest jika tersedia
@@ -739,88 +1614,264 @@ def analyze_watering():
                 'probabilities': {
                     'no_water': analysis_result['rf_probability_no_water'],
                     'water': analysis_result['rf_probability_water']
-                }
+                },
+                'model_version': analysis_result['rf_model_version']
             }
         
+        with analysis_dedup_lock:
+            last_manual_analysis = {
+                'sensor_doc_id': sensor_doc_id,
+                'model_version': model_version,
+                'response': response_data
+            }
+            analysis_dedup['written'] += 1
         return jsonify(response_data)
         
     except Exception as e:
-        print(f"Error in analyze_watering: {str(e)}")
+        logger.error("Error in analyze_watering: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+# Ukuran body maksimum /api/predict-batch (byte); body yang lebih besar ditolak dengan 413
+PREDICT_BATCH_MAX_BYTES = int(os.environ.get('PREDICT_BATCH_MAX_BYTES', str(64 * 1024 * 1024)))
+
+@app.route('/api/predict-batch', methods=['POST'])
+def predict_batch():
+    """
+    Endpoint untuk prediksi penyiraman banyak baris data sensor sekaligus.
+    Body berupa JSON, NDJSON, float32 mentah atau Arrow IPC (lihat batch_io).
+    Semua baris diprediksi dengan satu kali penelusuran hutan Random Forest.
+    """
+    request.max_content_length = PREDICT_BATCH_MAX_BYTES
+    try:
+        body = request.get_data(cache=False)
+    except RequestEntityTooLarge:
+        return jsonify({'error': f"Body melebihi batas {PREDICT_BATCH_MAX_BYTES} byte"}), 413
+
+    try:
+        columns = parse_batch(
+            body,
+            request.content_type,
+            columns=request.args.get('columns', type=int)
+        )
+    except UnsupportedBatchFormat as e:
+        return jsonify({'error': str(e)}), 415
+    except BatchFormatError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        temperature = columns['temperature']
+        humidity = columns['humidity']
+        soil_moisture = columns['soil_moisture']
+
+        # Baris tanpa jam memakai jam saat ini
+        hour = columns['hour']
+        hour[np.isnan(hour)] = datetime.now().hour
+
+        decisions, reason_codes = watering_rules.evaluate(temperature, humidity, soil_moisture)
+
+        # Teks alasan hanya dirender jika diminta (?reasons=text)
+        reasons = None
+        if request.args.get('reasons') == 'text':
+            reasons = watering_rules.reason_texts(reason_codes, temperature, humidity, soil_moisture)
+
+        rf_prediction = rf_probability = None
+        active_model = get_active_model()
+        if active_model is not None:
+            with phase_timer.span('predict'):
+                features = active_model.predictor.build_features(temperature, humidity, soil_moisture, hour=hour)
+                rf_prediction, rf_probability = active_model.predictor.predict_with_proba(features)
+
+        results = []
+        for i, (decision, reason_code) in enumerate(zip(decisions.tolist(), reason_codes.tolist())):
+            row = {
+                'prediction': decision,
+                'decision': "siram" if decision == 1 else "jangan siram",
+                'reason_code': reason_code
+            }
+            if reasons is not None:
+                row['reason'] = next(reasons)
+            if rf_prediction is not None:
+                row['random_forest'] = {
+                    'prediction': int(rf_prediction[i]),
+                    'probabilities': {
+                        'no_water': float(rf_probability[i, 0]),
+                        'water': float(rf_probability[i, 1])
+                    }
+                }
+            results.append(row)
+
+        logger.info("Prediksi batch selesai untuk %d baris", len(results))
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'reason_codes': watering_rules.REASON_NAMES,
+            'model_version': active_model.version if active_model is not None else None,
+            'results': results
+        })
+
+    except Exception as e:
+        logger.error("Error in predict_batch: %s", e)
         return jsonify({'error': str(e)}), 500
 
+# Ukuran halaman /api/watering-history (?limit=), bawaan dan maksimum
+WATERING_HISTORY_PAGE_SIZE = 20
+WATERING_HISTORY_MAX_PAGE_SIZE = 500
+
 @app.route('/api/watering-history')
 def get_watering_history():
-    """Endpoint untuk mendapatkan riwayat analisis penyiraman."""
+    """
+    Endpoint untuk mendapatkan riwayat analisis penyiraman, terbaru lebih dulu.
+    Halaman berikutnya diambil dengan ?cursor=<next_cursor halaman sebelumnya>.
+    """
     try:
+        limit = request.args.get('limit', default=WATERING_HISTORY_PAGE_SIZE, type=int)
+        limit = min(max(limit, 1), WATERING_HISTORY_MAX_PAGE_SIZE)
+
         # Ambil riwayat analisis dari Firestore, diurutkan berdasarkan timestamp terbaru
         analysis_collection = firestore_client.collection('watering_analysis')
-        docs = analysis_collection.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(20).stream()
+        query = analysis_collection.order_by('timestamp', direction=QUERY_DESCENDING)
+        cursor_param = request.args.get('cursor')
+        if cursor_param:
+            try:
+                after = decode_cursor(cursor_param, ['watering-history'])
+                if after[1] is None:
+                    raise InvalidCursor("Cursor tidak valid untuk query ini")
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
+            query = start_after_position(query, analysis_collection, after)
+        docs = list(query.limit(limit).stream())
         
         history = []
         for doc in docs:
             data = doc.to_dict()
             data['id'] = doc.id
             history.append(data)
+
+        next_cursor = None
+        if docs and len(docs) >= limit:
+            next_cursor = encode_cursor(['watering-history'], cursor_timestamp(docs[-1].get('timestamp')), docs[-1].id)
             
         return jsonify({
             'success': True,
             'data': history,
-            'count': len(history)
+            'count': len(history),
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
-        print(f"Error in get_watering_history: {str(e)}")
+        logger.error("Error in get_watering_history: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/threshold-info')
 def get_threshold_info():
     """Endpoint untuk mendapatkan informasi ambang batas yang digunakan."""
     return jsonify({
-        'thresholds': {
-            'temperature': {
-                'min': 20,
-                'max': 31,
-                'unit': '°C',
-                'description': 'Rentang suhu udara optimal'
-            },
-            'humidity': {
-                'min': 75,
-                'max': 80,
-                'unit': '%',
-                'description': 'Rentang kelembapan udara optimal'
-            },
-            'soil_moisture': {
-                'min': 60,
-                'max': 75,
-                'unit': '%',
-                'description': 'Rentang kelembapan tanah optimal'
-            }
-        },
-        'logic': 'Jika salah satu parameter di luar rentang optimal, maka keputusan = siram (1), jika tidak = jangan siram (0)'
+        'thresholds': watering_rules.threshold_info(),
+        'logic': watering_rules.WATERING_LOGIC
     })
 
 @app.route('/api/scheduler-status')
 def get_scheduler_status():
-    """Endpoint untuk mendapatkan status scheduler dan jadwal analisis."""
+    """
+    Endpoint untuk mendapatkan status scheduler dan jadwal analisis. Scheduler
+    hanya berjalan di worker leader (lihat start_scheduler_leader); worker lain
+    melaporkan scheduler_leader false dan daftar job kosong.
+    """
     try:
+        leader = scheduler_resource.state == READY
+        running = False
         jobs = []
-        for job in scheduler.get_jobs():
-            jobs.append({
-                'id': job.id,
-                'name': job.name,
-                'next_run': job.next_run_time.isoformat() if job.next_run_time else None,
-                'trigger': str(job.trigger)
-            })
+        if leader:
+            scheduler = scheduler_resource.get()
+            running = scheduler.running
+            for job in scheduler.get_jobs():
+                jobs.append({
+                    'id': job.id,
+                    'name': job.name,
+                    'next_run': job.next_run_time.isoformat() if job.next_run_time else None,
+                    'trigger': str(job.trigger)
+                })
         
         return jsonify({
-            'scheduler_running': scheduler.running,
+            'scheduler_running': running,
+            'scheduler_leader': leader,
             'scheduled_hours': scheduled_hours,
             'jobs': jobs,
-            'total_jobs': len(jobs)
+            'total_jobs': len(jobs),
+            'zones': [zone['zone'] for zone in WATERING_ZONES],
+            'last_run': last_scheduled_run
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/model')
+def get_model_info():
+    """Endpoint untuk mendapatkan versi model yang dilayani worker ini dan isi registry."""
+    active = get_active_model()
+    info = model_registry.stats()
+    if active is not None:
+        info['trees'] = active.forest.n_trees
+        info['nodes'] = active.forest.n_nodes
+        info['predictor'] = active.predictor.stats() if active.predictor is not active.forest else {'mode': 'forest'}
+    return jsonify(info)
+
+@app.route('/api/ready')
+def get_readiness():
+    """
+    Endpoint readiness: 200 jika semua fase startup wajib sudah siap, 503
+    jika masih dimuat atau gagal. Berisi laporan waktu setiap fase.
+    """
+    ready = is_ready(startup_resources)
+    report = startup_report.as_dict()
+    report['ready'] = ready
+    report['warmup'] = STARTUP_WARMUP
+    return jsonify(report), 200 if ready else 503
+
+@app.route('/api/cache-stats')
+def get_cache_stats():
+    """Endpoint untuk mendapatkan statistik cache (hit/miss) dan antrian tulis per worker."""
+    return jsonify({
+        'analysis_writes': analysis_writer.stats(),
+        'analysis_dedup': dict(analysis_dedup),
+        'predictions': prediction_cache.stats(),
+        'rtdb_snapshot': rtdb_snapshot_cache.stats(),
+        'sensor_store': sensor_store.stats() if sensor_store is not None else None,
+        'rollups': rollup_store.stats() if rollup_store is not None else None
+    })
+
+def collect_cache_metrics():
+    """Collector /metrics: hit/miss cache, dedup analisis, dan antrian tulis."""
+    dedup_total = analysis_dedup['skipped'] + analysis_dedup['written']
+    caches = {
+        'rtdb_snapshot': rtdb_snapshot_cache.stats(),
+        'predictions': prediction_cache.stats(),
+        'analysis_dedup': {
+            'hits': analysis_dedup['skipped'],
+            'misses': analysis_dedup['written'],
+            'hit_rate': analysis_dedup['skipped'] / dedup_total if dedup_total else 0.0
+        },
+    }
+    writes = analysis_writer.stats()
+    return [
+        ('app_cache_hits_total', 'counter', 'Jumlah hit cache.',
+         [({'cache': name}, stats['hits']) for name, stats in caches.items()]),
+        ('app_cache_misses_total', 'counter', 'Jumlah miss cache.',
+         [({'cache': name}, stats['misses']) for name, stats in caches.items()]),
+        ('app_cache_hit_ratio', 'gauge', 'Rasio hit cache sejak worker dimulai.',
+         [({'cache': name}, stats['hit_rate']) for name, stats in caches.items()]),
+        ('app_analysis_writes_total', 'counter', 'Dokumen analisis menurut hasil penulisan.',
+         [({'result': key}, writes[key]) for key in ('enqueued', 'written', 'spilled', 'replayed')]),
+        ('app_analysis_writes_pending', 'gauge', 'Dokumen analisis yang belum di-commit.',
+         [({}, writes['pending'])]),
+    ]
+
+metrics_registry.add_collector(collect_cache_metrics)
+
+@app.route('/metrics')
+def get_metrics():
+    """Endpoint metrik worker ini dalam format teks Prometheus."""
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/api/trigger-scheduled-analysis')
 def trigger_scheduled_analysis():
     """Endpoint untuk memicu analisis terjadwal secara manual (untuk testing)."""
@@ -836,5 +1887,14 @@ def trigger_scheduled_analysis():
             'error': str(e)
         }), 500
 
+# Warm-up: 'background' (default) memuat fase berat di thread latar belakang,
+# 'sync' memuat semuanya sebelum import selesai (perilaku lama). Scheduler tidak
+# termasuk: hanya dimulai oleh start_scheduler_leader()
+STARTUP_WARMUP = os.environ.get('STARTUP_WARMUP', 'background')
+startup_resources = [firebase_resource, rtdb_resource, model_resource]
+startup_report.record('import', READY, time.perf_counter() - _IMPORT_STARTED)
+warm_up(startup_resources, background=STARTUP_WARMUP != 'sync')
+
 if __name__ == '__main__':
+    start_scheduler_leader()
     app.run(debug=True)
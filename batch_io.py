@@ -0,0 +1,190 @@
+"""
+Parsing body request untuk prediksi batch.
+
+Format yang didukung (dipilih dari header Content-Type):
+- application/json            : list objek / list array / {"rows": [...]} / kolom {"temperature": [...], ...}
+- application/x-ndjson        : satu objek atau array JSON per baris
+- application/octet-stream    : float32 little-endian mentah, baris demi baris
+                                (temperature, humidity, soil_moisture[, hour])
+- application/vnd.apache.arrow.stream : Arrow IPC stream (butuh pyarrow)
+
+Semua format menghasilkan dict kolom NumPy: temperature, humidity,
+soil_moisture dan hour (float64, NaN jika jam tidak diberikan). Nilai sensor
+harus berhingga, jam di rentang 0-23, dan timestamp berupa detik Unix yang
+dapat dikonversi ke waktu lokal; selain itu BatchFormatError.
+"""
+import json
+from datetime import datetime
+
+import numpy as np
+
+SENSOR_COLUMNS = ['temperature', 'humidity', 'soil_moisture']
+
+JSON_TYPES = {'application/json'}
+NDJSON_TYPES = {'application/x-ndjson', 'application/ndjson', 'application/jsonlines'}
+FLOAT32_TYPES = {'application/octet-stream', 'application/x-float32'}
+ARROW_TYPES = {'application/vnd.apache.arrow.stream', 'application/vnd.apache.arrow.file'}
+
+
+class BatchFormatError(ValueError):
+    """Body request batch tidak dapat dibaca."""
+
+
+class UnsupportedBatchFormat(BatchFormatError):
+    """Content-Type body batch tidak didukung."""
+
+
+def parse_batch(body, content_type, columns=None):
+    """
+    Baca body request menjadi kolom-kolom NumPy.
+    `columns` hanya dipakai untuk float32 mentah (3 atau 4 kolom per baris).
+    """
+    mime = (content_type or 'application/json').split(';')[0].strip().lower()
+
+    if mime in JSON_TYPES:
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            raise BatchFormatError(f"JSON tidak valid: {e}")
+        return _columns_from_json(payload)
+
+    if mime in NDJSON_TYPES:
+        rows = []
+        for line_number, line in enumerate(body.splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                raise BatchFormatError(f"NDJSON tidak valid pada baris {line_number}: {e}")
+        return _columns_from_rows(rows)
+
+    if mime in FLOAT32_TYPES:
+        return _columns_from_float32(body, columns or 3)
+
+    if mime in ARROW_TYPES:
+        return _columns_from_arrow(body)
+
+    raise UnsupportedBatchFormat(f"Content-Type tidak didukung: {mime}")
+
+
+def _columns_from_json(payload):
+    if isinstance(payload, dict):
+        if 'rows' in payload:
+            return _columns_from_rows(payload['rows'])
+        # Format kolom: {"temperature": [...], "humidity": [...], ...}
+        return _finalize_columns({key: payload.get(key) for key in SENSOR_COLUMNS + ['hour', 'timestamp']})
+    if isinstance(payload, list):
+        return _columns_from_rows(payload)
+    raise BatchFormatError("Body JSON harus berupa list baris atau objek")
+
+
+def _columns_from_rows(rows):
+    if not rows:
+        raise BatchFormatError("Batch kosong")
+
+    columns = {key: [] for key in SENSOR_COLUMNS + ['hour', 'timestamp']}
+    for index, row in enumerate(rows):
+        if isinstance(row, dict):
+            for key in columns:
+                columns[key].append(row.get(key))
+        elif isinstance(row, (list, tuple)) and len(row) in (3, 4):
+            for key, value in zip(SENSOR_COLUMNS + ['hour'], row):
+                columns[key].append(value)
+            if len(row) == 3:
+                columns['hour'].append(None)
+            columns['timestamp'].append(None)
+        else:
+            raise BatchFormatError(f"Baris {index} harus berupa objek atau array 3/4 angka")
+    return _finalize_columns(columns)
+
+
+def _columns_from_float32(body, n_columns):
+    if n_columns not in (3, 4):
+        raise BatchFormatError("Parameter columns harus 3 atau 4")
+    if len(body) % (4 * n_columns):
+        raise BatchFormatError(f"Panjang body bukan kelipatan {n_columns} float32")
+
+    matrix = np.frombuffer(body, dtype='<f4').reshape(-1, n_columns)
+    if len(matrix) == 0:
+        raise BatchFormatError("Batch kosong")
+    names = SENSOR_COLUMNS + (['hour'] if n_columns == 4 else [])
+    return _finalize_columns({key: matrix[:, i] for i, key in enumerate(names)})
+
+
+def _columns_from_arrow(body):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedBatchFormat("Format Arrow membutuhkan paket pyarrow")
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid:
+        try:
+            table = pa.ipc.open_file(pa.BufferReader(body)).read_all()
+        except pa.ArrowInvalid as e:
+            raise BatchFormatError(f"Arrow IPC tidak valid: {e}")
+
+    columns = {}
+    for key in SENSOR_COLUMNS + ['hour', 'timestamp']:
+        if key in table.column_names:
+            columns[key] = table.column(key).to_numpy(zero_copy_only=False)
+    return _finalize_columns(columns)
+
+
+def _to_float_array(values, key):
+    if values is None:
+        return None
+    try:
+        # None menjadi NaN
+        array = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise BatchFormatError(f"Nilai kolom '{key}' harus berupa angka")
+    if array.ndim != 1:
+        raise BatchFormatError(f"Kolom '{key}' harus berupa list angka")
+    return array
+
+
+def _hour_from_timestamp(timestamp):
+    try:
+        return datetime.fromtimestamp(timestamp).hour
+    except (OverflowError, OSError, ValueError):
+        raise BatchFormatError(f"Timestamp di luar rentang: {timestamp}")
+
+
+def _finalize_columns(columns):
+    result = {}
+    for key in SENSOR_COLUMNS:
+        array = _to_float_array(columns.get(key), key)
+        if array is None:
+            raise BatchFormatError(f"Kolom '{key}' wajib diisi")
+        result[key] = array
+
+    n_rows = len(result['temperature'])
+    if n_rows == 0:
+        raise BatchFormatError("Batch kosong")
+    if any(len(result[key]) != n_rows for key in SENSOR_COLUMNS):
+        raise BatchFormatError("Panjang kolom sensor tidak sama")
+    if not all(np.isfinite(result[key]).all() for key in SENSOR_COLUMNS):
+        raise BatchFormatError("Nilai sensor tidak boleh kosong atau tak hingga")
+
+    hour = _to_float_array(columns.get('hour'), 'hour')
+    if hour is None:
+        hour = np.full(n_rows, np.nan)
+    if len(hour) != n_rows:
+        raise BatchFormatError("Panjang kolom hour tidak sama dengan kolom sensor")
+    # NaN berarti jam tidak diberikan; selain itu harus 0-23
+    if ((hour < 0) | (hour > 23)).any():
+        raise BatchFormatError("Nilai hour harus di antara 0 dan 23")
+
+    # Jam boleh diturunkan dari timestamp (detik Unix) bila kolom hour kosong
+    timestamps = _to_float_array(columns.get('timestamp'), 'timestamp')
+    if timestamps is not None and len(timestamps) == n_rows:
+        missing = np.isnan(hour) & ~np.isnan(timestamps)
+        for i in np.flatnonzero(missing):
+            hour[i] = _hour_from_timestamp(timestamps[i])
+
+    result['hour'] = hour
+    return result
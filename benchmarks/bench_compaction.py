@@ -0,0 +1,65 @@
+"""
+Benchmark pemadatan model: kesesuaian, ukuran dan kecepatan per varian.
+
+Setiap kombinasi langkah `compaction` diterapkan pada model_rf, lalu
+dibandingkan dengan hutan asli pada sampel domain sensor terpisah
+(kesesuaian kelas dan selisih probabilitas), jumlah pohon/node, ukuran
+artefak mmap, latensi satu baris dan throughput batch.
+
+Pemakaian:
+    python benchmarks/bench_compaction.py [--distill-depth 12]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import compaction  # noqa: E402
+import training  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'model_rf')
+
+VARIANTS = [
+    ('quantize',),
+    ('merge',),
+    ('quantize', 'merge'),
+    ('prune',),
+    ('prune', 'quantize', 'merge'),
+    ('distill',),
+    ('distill', 'quantize', 'merge'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--distill-depth', type=int, default=12)
+    parser.add_argument('--min-agreement', type=float, default=0.999)
+    args = parser.parse_args()
+
+    with open(MODEL_PATH, 'rb') as f:
+        forest = CompiledForest.from_sklearn(pickle.load(f))
+    X = compaction.sample_domain(forest, 10000, seed=7)
+
+    def row(name, candidate, report, seconds):
+        latency, throughput = training.measure_inference(candidate, X)
+        print(f"{name:>24} {candidate.n_trees:>6} {candidate.n_nodes:>7} "
+              f"{training.artifact_size(candidate) / 1024:>9.0f} {latency * 1e6:>9.0f} {throughput:>11.0f} "
+              f"{report['class_agreement']:>9.5f} {report['max_abs_diff']:>9.4f} {seconds:>8.1f}")
+
+    print(f"{'varian':>24} {'pohon':>6} {'node':>7} {'KB':>9} {'us/baris':>9} {'baris/det':>11} "
+          f"{'sesuai':>9} {'maks dp':>9} {'waktu(s)':>8}")
+    row('asli', forest, compaction.agreement(forest, forest, X), 0.0)
+    for steps in VARIANTS:
+        started = time.perf_counter()
+        compacted, report = compaction.compact(
+            forest, steps, min_agreement=args.min_agreement, distill_depth=args.distill_depth
+        )
+        row('+'.join(steps), compacted, report, time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark pembacaan backend berurutan vs bersamaan (ParallelReader).
+
+Firestore dan Realtime Database diganti fake in-process dengan latensi
+tetap per round trip (mirip emulator lokal), lalu endpoint dipanggil lewat
+Flask test client: sekali-sekali untuk latensi, dan dari banyak thread
+klien sekaligus untuk throughput (seperti worker gunicorn gthread).
+Cache RTDB dilewati agar setiap request benar-benar membaca backend.
+
+Pemakaian:
+    python benchmarks/bench_concurrency.py [--firestore-ms 40] [--rtdb-ms 30]
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+ENDPOINTS = ['/api/sensor-data?limit=100', '/api/latest-data']
+CLIENT_COUNTS = [1, 8, 32]
+
+
+def fake_credentials():
+    """Service account palsu (kunci RSA baru) agar app dapat diimport tanpa kredensial asli."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    return json.dumps({
+        'type': 'service_account',
+        'project_id': 'bench',
+        'private_key_id': 'bench',
+        'private_key': pem,
+        'client_email': 'bench@bench.iam.gserviceaccount.com',
+        'client_id': '0',
+        'token_uri': 'https://oauth2.googleapis.com/token'
+    })
+
+
+class FakeDocument:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeQuery:
+    """Query Firestore palsu: satu round trip berlatensi tetap per stream()."""
+
+    def __init__(self, documents, latency, descending=False, limit=None):
+        self.documents = documents
+        self.latency = latency
+        self.descending = descending
+        self._limit = limit
+
+    def where(self, *args, **kwargs):
+        return self
+
+    def order_by(self, field, direction=None):
+        return FakeQuery(self.documents, self.latency, descending=direction == 'DESCENDING', limit=self._limit)
+
+    def limit(self, n):
+        return FakeQuery(self.documents, self.latency, self.descending, n)
+
+    def stream(self):
+        time.sleep(self.latency)
+        documents = self.documents[::-1] if self.descending else self.documents
+        return iter(documents[:self._limit])
+
+
+class FakeFirestore:
+    def __init__(self, n_documents, latency):
+        start = time.time() - n_documents * 60
+        self.documents = [
+            FakeDocument(f's{i:06d}', {
+                'timestamp': start + i * 60,
+                'DateTime': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start + i * 60)),
+                'temperature': 25 + i % 7,
+                'humidity': 70 + i % 12,
+                'soil_moisture': 55 + i % 25
+            })
+            for i in range(n_documents)
+        ]
+        self.latency = latency
+
+    def collection(self, name):
+        return FakeQuery(self.documents, self.latency)
+
+
+class FakeReference:
+    def __init__(self, data, latency):
+        self.data = data
+        self.latency = latency
+
+    def get(self):
+        time.sleep(self.latency)
+        return self.data
+
+
+class FakeRealtimeDatabase:
+    def __init__(self, latency):
+        self.latency = latency
+        self.data = {
+            '/DHT': {'temperature': 27.5, 'humidity': 72.0, 'latestUpdate': time.strftime('%Y-%m-%d %H:%M:%S')},
+            '/SoilMoisture': {'percentage': 61.0, 'latestUpdate': time.strftime('%Y-%m-%d %H:%M:%S')}
+        }
+
+    def reference(self, path):
+        return FakeReference(self.data.get(path), self.latency)
+
+
+class UncachedSnapshot:
+    """Pengganti rtdb_snapshot_cache yang selalu membaca backend."""
+
+    def __init__(self, loader):
+        self.get = loader
+
+    def set(self, value):
+        pass
+
+
+def measure_latency(client, url, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            raise SystemExit(f"{url} gagal: {response.status_code} {response.get_data(as_text=True)[:200]}")
+    return float(np.median(timings))
+
+
+def measure_throughput(flask_app, url, clients, seconds):
+    done = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def worker(i):
+        client = flask_app.test_client()
+        while time.perf_counter() < deadline:
+            client.get(url)
+            done[i] += 1
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(worker, range(clients)))
+    return sum(done) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--firestore-ms', type=float, default=40)
+    parser.add_argument('--rtdb-ms', type=float, default=30)
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    os.environ.pop('SENSOR_STORE_PATH', None)
+    os.environ.setdefault('GOOGLE_CREDENTIALS_JSON', fake_credentials())
+    logging.disable(logging.INFO)
+
+    import app
+    from parallel_reads import ParallelReader
+
+    app.firestore_client = FakeFirestore(args.documents, args.firestore_ms / 1000)
+    app.rtdb = FakeRealtimeDatabase(args.rtdb_ms / 1000)
+    app.rtdb_snapshot_cache = UncachedSnapshot(app.fetch_realtime_snapshot)
+    client = app.app.test_client()
+
+    modes = {
+        'berurutan': ParallelReader(max_workers=0),
+        'bersamaan': ParallelReader(max_workers=16),
+    }
+    print(f"Latensi fake: Firestore {args.firestore_ms:.0f} ms, RTDB {args.rtdb_ms:.0f} ms per round trip")
+    for url in ENDPOINTS:
+        print(f"\n{url}")
+        print(f"{'mode':>10} {'latensi (ms)':>13} " + ' '.join(f"{f'{c} klien (req/s)':>16}" for c in CLIENT_COUNTS))
+        for name, reader in modes.items():
+            app.parallel_reader = reader
+            # Endpoint mencetak data ke stdout; buang agar tabel tetap terbaca
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                latency = measure_latency(client, url, args.repeat)
+                throughputs = [measure_throughput(app.app, url, clients, args.seconds) for clients in CLIENT_COUNTS]
+            print(f"{name:>10} {latency * 1000:>13.1f} " + ' '.join(f"{value:>16.1f}" for value in throughputs))
+
+    for reader in modes.values():
+        reader.shutdown()
+    app.shutdown_background_jobs()
+    print(f"\nThread aktif di akhir: {threading.active_count()}")
+
+
+if __name__ == '__main__':
+    main()
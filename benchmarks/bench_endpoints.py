@@ -0,0 +1,166 @@
+"""
+Throughput semua endpoint dengan backend data lokal (tanpa Firebase).
+
+Aplikasi diimport dengan DATA_BACKEND=local: koleksi sensor_history diisi
+pembacaan sintetis di SQLite (memori atau file), lalu setiap route GET
+(kecuali /api/stream) dan POST /api/predict-batch dipanggil lewat Flask test
+client: sekali-sekali untuk latensi median, dan dari beberapa thread klien
+sekaligus untuk throughput. Dengan --sensor-store, query sensor juga diukur
+lewat store lokal (SENSOR_STORE_PATH) di direktori sementara.
+
+Pemakaian:
+    python benchmarks/bench_endpoints.py [--rows 1000000] [--path data.db] [--sensor-store]
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+CLIENT_COUNTS = [1, 8]
+
+# Route yang tidak diukur: SSE menahan koneksi tanpa batas waktu
+SKIPPED_ROUTES = {'/api/stream'}
+
+# Request tambahan dengan parameter (route tanpa parameter selalu diukur)
+EXTRA_REQUESTS = [
+    ('GET', '/api/sensor-data?limit=1000'),
+    ('GET', '/api/sensor-data?start={day_ago}&end={now}&limit=1000'),
+    ('GET', '/api/sensor-data?start={week_ago}&end={now}&bucket=1h'),
+    ('GET', '/api/sensor-data?start={week_ago}&end={now}&resolution=500'),
+    ('GET', '/api/sensor-data?format=ndjson&start={day_ago}&end={now}'),
+]
+
+PREDICT_BATCH_ROWS = 1000
+
+
+def build_requests(flask_app):
+    now = int(time.time())
+    values = {'now': now, 'day_ago': now - 86400, 'week_ago': now - 7 * 86400}
+    requests = []
+    for rule in sorted(flask_app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if rule.arguments or rule.rule in SKIPPED_ROUTES or rule.endpoint == 'static':
+            continue
+        if 'GET' in rule.methods:
+            requests.append(('GET', rule.rule))
+    requests.extend((method, url.format(**values)) for method, url in EXTRA_REQUESTS)
+    requests.append(('POST', '/api/predict-batch'))
+    return requests
+
+
+def predict_batch_body(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return json.dumps([
+        {'temperature': t, 'humidity': h, 'soil_moisture': s}
+        for t, h, s in zip(np.round(rng.uniform(20, 38, rows), 1).tolist(),
+                           np.round(rng.uniform(50, 95, rows), 1).tolist(),
+                           np.round(rng.uniform(20, 90, rows), 1).tolist())
+    ])
+
+
+def call(client, method, url, body):
+    if method == 'POST':
+        return client.post(url, data=body, content_type='application/json')
+    response = client.get(url)
+    # Endpoint streaming baru dieksekusi saat body dibaca
+    response.get_data()
+    return response
+
+
+def measure_latency(client, method, url, body, repeat):
+    timings = []
+    status = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        status = call(client, method, url, body).status_code
+        timings.append(time.perf_counter() - t0)
+    return float(np.median(timings)), status
+
+
+def measure_throughput(flask_app, method, url, body, clients, seconds):
+    done = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def worker(i):
+        client = flask_app.test_client()
+        while time.perf_counter() < deadline:
+            call(client, method, url, body)
+            done[i] += 1
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(worker, range(clients)))
+    return sum(done) / seconds
+
+
+def import_local_app(rows, path=':memory:', sensor_store=False, tmp_dir=None):
+    """
+    Import app dengan backend lokal berisi `rows` pembacaan sintetis (file
+    `path` yang sudah terisi dipakai ulang). File sementara (spill, registry,
+    store lokal) ditulis ke `tmp_dir`. Return modul app.
+    """
+    tmp_dir = tmp_dir or tempfile.mkdtemp(prefix='bench-')
+    os.environ.pop('GOOGLE_CREDENTIALS_JSON', None)
+    os.environ['DATA_BACKEND'] = 'local'
+    os.environ['LOCAL_DATA_PATH'] = path
+    os.environ['LOCAL_SEED_ROWS'] = str(rows)
+    os.environ['STARTUP_WARMUP'] = 'sync'
+    os.environ['ANALYSIS_SPILL_PATH'] = os.path.join(tmp_dir, 'spill.jsonl')
+    os.environ['MODEL_REGISTRY_DIR'] = os.path.join(tmp_dir, 'models')
+    if sensor_store:
+        os.environ['SENSOR_STORE_PATH'] = os.path.join(tmp_dir, 'sensor_store.db')
+    else:
+        os.environ.pop('SENSOR_STORE_PATH', None)
+    logging.disable(logging.WARNING)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import app
+        if app.sensor_store is not None:
+            app.sync_sensor_store(force=True)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200000, help='Jumlah pembacaan sintetis.')
+    parser.add_argument('--path', default=':memory:', help='Database backend lokal (file dipakai ulang jika sudah terisi).')
+    parser.add_argument('--sensor-store', action='store_true', help='Layani query sensor dari store lokal.')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    started = time.perf_counter()
+    app = import_local_app(args.rows, args.path, args.sensor_store, tmp.name)
+    print(f"Backend lokal {args.path}: {app.local_database.count('sensor_history')} pembacaan, "
+          f"siap dalam {time.perf_counter() - started:.1f} s")
+
+    client = app.app.test_client()
+    body = predict_batch_body(PREDICT_BATCH_ROWS)
+    print(f"\n{'endpoint':<62} {'status':>6} {'latensi (ms)':>13} "
+          + ' '.join(f"{f'{c} klien (req/s)':>16}" for c in CLIENT_COUNTS))
+    for method, url in build_requests(app.app):
+        # Endpoint mencetak data ke stdout; buang agar tabel tetap terbaca
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            latency, status = measure_latency(client, method, url, body, args.repeat)
+            throughputs = [measure_throughput(app.app, method, url, body, clients, args.seconds)
+                           for clients in CLIENT_COUNTS]
+        label = f"{method} {url}"
+        if len(label) > 62:
+            label = label[:59] + '...'
+        print(f"{label:<62} {status:>6} {latency * 1000:>13.2f} "
+              + ' '.join(f"{value:>16.1f}" for value in throughputs))
+
+    app.shutdown_background_jobs()
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
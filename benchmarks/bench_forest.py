@@ -0,0 +1,98 @@
+"""
+Benchmark inferensi Random Forest: sklearn vs CompiledForest.
+
+Sebelum mengukur latensi, skrip ini memeriksa kesamaan hasil (parity)
+CompiledForest terhadap sklearn pada input acak; skrip gagal jika ada
+perbedaan kelas atau probabilitas.
+
+Pemakaian:
+    python benchmarks/bench_forest.py [--model model_rf] [--parity-rows 20000]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from forest_engine import CompiledForest  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+# Rentang nilai acak per fitur (sedikit lebih lebar dari rentang sensor)
+FEATURE_RANGES = {
+    'hour': (0, 24),
+    'temperature': (10, 45),
+    'humidity': (40, 100),
+    'soil_moisture': (20, 100),
+}
+
+
+def random_features(forest, n_rows, rng):
+    columns = {name: rng.uniform(low, high, n_rows) for name, (low, high) in FEATURE_RANGES.items()}
+    return forest.build_features(columns['temperature'], columns['humidity'],
+                                 columns['soil_moisture'], hour=columns['hour'])
+
+
+def check_parity(model, forest, X):
+    sk_proba = model.predict_proba(X)
+    sk_pred = model.predict(X)
+    pred, proba = forest.predict_with_proba(X)
+
+    max_diff = float(np.abs(sk_proba - proba).max())
+    mismatches = int((sk_pred != pred).sum())
+    print(f"Parity pada {len(X)} baris: selisih probabilitas maks {max_diff:.2e}, kelas berbeda {mismatches}")
+    if max_diff > 1e-9 or mismatches:
+        raise SystemExit("CompiledForest tidak sama dengan sklearn")
+
+
+def measure(fn, X, min_seconds=0.5):
+    """Median latensi (detik) satu panggilan fn(X)."""
+    fn(X)
+    timings = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < min_seconds or len(timings) < 3:
+        t0 = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - t0)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model', default=os.path.join(os.path.dirname(__file__), '..', 'model_rf'))
+    parser.add_argument('--parity-rows', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # sklearn memberi peringatan feature names saat X berupa ndarray
+    warnings.filterwarnings('ignore', category=UserWarning)
+
+    with open(args.model, 'rb') as f:
+        model = pickle.load(f)
+
+    t0 = time.perf_counter()
+    forest = CompiledForest.from_sklearn(model)
+    print(f"Kompilasi {forest.n_trees} pohon / {forest.n_nodes} node: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(args.seed)
+    check_parity(model, forest, random_features(forest, args.parity_rows, rng))
+
+    def sklearn_predict(X):
+        # Jalur lama di app.py: predict lalu predict_proba
+        model.predict(X)
+        model.predict_proba(X)
+
+    print(f"{'batch':>8} {'sklearn (ms)':>14} {'compiled (ms)':>14} {'speedup':>9}")
+    for batch_size in BATCH_SIZES:
+        X = random_features(forest, batch_size, rng)
+        sk_time = measure(sklearn_predict, X)
+        compiled_time = measure(forest.predict_with_proba, X)
+        print(f"{batch_size:>8} {sk_time * 1000:>14.3f} {compiled_time * 1000:>14.3f} {sk_time / compiled_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Biaya logging di hot path /api/sensor-data dan /api/latest-data.
+
+Aplikasi diimport dengan backend data lokal (lihat bench_endpoints.py), lalu
+setiap request diukur pada beberapa konfigurasi logging. Output log ditulis
+ke os.devnull sehingga yang terukur adalah biaya membentuk dan memformat
+record, bukan kecepatan terminal:
+
+    verbose  channel debug 'documents' dan 'payloads' aktif tanpa sampling
+             (volume log sama dengan log INFO per dokumen sebelumnya)
+    default  INFO dengan sampling 20/60 (konfigurasi bawaan aplikasi)
+    json     seperti default, format JSON
+    off      logging dimatikan (logging.disable)
+
+Pemakaian:
+    python benchmarks/bench_logging.py [--rows 50000] [--repeat 30]
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_endpoints import import_local_app  # noqa: E402
+from structured_logging import configure_logging  # noqa: E402
+
+REQUESTS = [
+    '/api/sensor-data?limit=1000',
+    '/api/sensor-data?limit=100',
+    '/api/latest-data',
+]
+
+# (nama, argumen configure_logging); None berarti logging dimatikan
+MODES = [
+    ('verbose', {'sample': None, 'debug_channels': ('documents', 'payloads')}),
+    ('default', {'sample': '20/60'}),
+    ('json', {'sample': '20/60', 'log_format': 'json'}),
+    ('off', None),
+]
+
+
+def apply_mode(options, stream, prefix):
+    for channel in ('documents', 'payloads'):
+        logging.getLogger(f'{prefix}.{channel}').setLevel(logging.NOTSET)
+    if options is None:
+        logging.disable(logging.CRITICAL)
+        return
+    logging.disable(logging.NOTSET)
+    configure_logging(stream=stream, force=True, channel_prefix=prefix, **options)
+
+
+def measure(client, url, repeat, warmup=3):
+    for _ in range(warmup):
+        client.get(url).get_data()
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        client.get(url).get_data()
+        timings.append(time.perf_counter() - t0)
+    timings = np.asarray(timings) * 1000
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=50000, help='Jumlah pembacaan sintetis.')
+    parser.add_argument('--repeat', type=int, default=30, help='Jumlah request per endpoint dan mode.')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    app = import_local_app(args.rows, tmp_dir=tmp.name)
+    client = app.app.test_client()
+
+    print(f"{'endpoint':<32} " + ' '.join(f"{name + ' p50/p99 (ms)':>24}" for name, _ in MODES))
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results = {}
+        for name, options in MODES:
+            apply_mode(options, devnull, app.logger.name)
+            for url in REQUESTS:
+                results[name, url] = measure(client, url, args.repeat)
+    logging.disable(logging.WARNING)
+
+    for url in REQUESTS:
+        print(f"{url:<32} " + ' '.join(f"{'%.2f / %.2f' % results[name, url]:>24}" for name, _ in MODES))
+
+    app.shutdown_background_jobs()
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark mode inferensi tabel lookup vs penelusuran hutan.
+
+Melaporkan memori tabel per resolusi grid (tabel padat naif vs tabel indeks
+sumbu + tabel sel), waktu membangun tabel, latensi satu baris dan
+throughput batch, serta memeriksa hasil tabel identik dengan hutan untuk
+nilai pada resolusi sensor maupun nilai di luar grid (fallback).
+
+Pemakaian:
+    python benchmarks/bench_lookup_grid.py [--rows 50000]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import compaction  # noqa: E402
+import training  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+from lookup_grid import LookupGrid, memory_report  # noqa: E402
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'model_rf')
+RESOLUTIONS = [1.0, 0.5, 0.1, 0.05, 0.01]
+
+
+def format_bytes(value):
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if value < 1024 or unit == 'TB':
+            return f"{value:.0f} {unit}" if unit == 'B' else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    with open(MODEL_PATH, 'rb') as f:
+        forest = CompiledForest.from_sklearn(pickle.load(f))
+
+    print("Memori tabel per resolusi (suhu/kelembapan/tanah; jam tetap 1)")
+    print(f"{'resolusi':>9} {'titik grid':>16} {'tabel padat':>12} {'sel':>7} {'tabel sel':>10}")
+    for row in memory_report(forest, RESOLUTIONS):
+        print(f"{row['resolution']:>9} {row['grid_points']:>16} {format_bytes(row['dense_bytes']):>12} "
+              f"{row['cells']:>7} {format_bytes(row['compressed_bytes']):>10}")
+
+    started = time.perf_counter()
+    grid = LookupGrid.build(forest)
+    print(f"\nTabel resolusi sensor: dibangun dalam {time.perf_counter() - started:.2f}s, "
+          f"bentuk {list(grid.table.shape[:-1])}, {format_bytes(grid.nbytes)}")
+
+    # Nilai sensor seperti dari Firestore: desimal satu angka dalam float64
+    X = np.round(compaction.sample_domain(forest, args.rows, seed=11).astype(np.float64), 1)
+    off_grid = X.copy()
+    off_grid[::10, 1] += 0.03
+    off_grid[5::10, 2] = 120.0
+    for name, data in (('pada grid', X), ('10% di luar grid', off_grid)):
+        if not np.array_equal(grid.predict_proba(data), forest.predict_proba(data)):
+            raise SystemExit(f"Hasil tabel lookup berbeda dari hutan ({name})")
+    print(f"Paritas tabel vs hutan ({args.rows} baris, termasuk fallback): identik")
+
+    print(f"\n{'mode':>16} {'us/baris':>9} {'baris/det':>12}")
+    for name, predictor, data in (('hutan', forest, X), ('tabel', grid, X), ('tabel+fallback', grid, off_grid)):
+        latency, throughput = training.measure_inference(predictor, data)
+        print(f"{name:>16} {latency * 1e6:>9.1f} {throughput:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark pemuatan model per worker: unpickle + kompilasi vs artefak mmap.
+
+Setiap mode menjalankan N proses worker bersamaan (seperti worker gunicorn).
+Worker memuat model, menjalankan prediksi, lalu menunggu semua saudaranya
+selesai memuat sebelum mengukur RSS dan PSS dari /proc. PSS membagi halaman
+bersama (page cache artefak mmap) rata ke semua proses, sehingga
+menunjukkan memori yang benar-benar ditanggung setiap worker.
+
+Pemakaian:
+    python benchmarks/bench_model_load.py [--workers 4]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MODEL_PATH = os.path.join(ROOT, 'model_rf')
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import numpy as np
+from forest_engine import CompiledForest
+mode, model_path, artifact_path = sys.argv[1:4]
+if mode == 'pickle':
+    import pickle
+    with open(model_path, 'rb') as f:
+        forest = CompiledForest.from_sklearn(pickle.load(f))
+else:
+    forest = CompiledForest.load(artifact_path)
+loaded = time.perf_counter()
+rng = np.random.default_rng(0)
+X = np.column_stack([rng.integers(0, 24, 256), rng.uniform(15, 40, 256),
+                     rng.uniform(30, 100, 256), rng.uniform(0, 100, 256)])
+proba = forest.predict_proba(X)
+sys.stdout.write('loaded\n')
+sys.stdout.flush()
+sys.stdin.readline()
+
+def read_kb(path, key):
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(key + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+sys.stdout.write(json.dumps({
+    'load': loaded - started,
+    'rss_kb': read_kb('/proc/self/status', 'VmRSS'),
+    'pss_kb': read_kb('/proc/self/smaps_rollup', 'Pss'),
+    'sklearn': 'sklearn' in sys.modules,
+    'proba': proba.tolist()
+}) + '\n')
+"""
+
+
+def run_workers(mode, workers, artifact_path):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    procs = [
+        subprocess.Popen([sys.executable, '-c', CHILD, mode, MODEL_PATH, artifact_path],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env)
+        for _ in range(workers)
+    ]
+    # Ukur memori hanya setelah semua worker memuat model
+    for proc in procs:
+        if proc.stdout.readline().strip() != 'loaded':
+            raise SystemExit(f"Worker {mode} gagal memuat model")
+    results = []
+    for proc in procs:
+        proc.stdin.write('\n')
+        proc.stdin.flush()
+    for proc in procs:
+        results.append(json.loads(proc.stdout.readline()))
+        proc.wait()
+    return results
+
+
+def mean(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import pickle
+    import numpy as np
+    from forest_engine import CompiledForest
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_path = os.path.join(tmp, 'model_rf.forest')
+        with open(MODEL_PATH, 'rb') as f:
+            CompiledForest.from_sklearn(pickle.load(f)).save(artifact_path)
+        print(f"Ukuran pickle {os.path.getsize(MODEL_PATH) / 1024:.0f} KB, "
+              f"artefak {os.path.getsize(artifact_path) / 1024:.0f} KB")
+
+        outputs = {}
+        print(f"\n{args.workers} worker per mode")
+        print(f"{'mode':>7} {'load (ms)':>10} {'RSS/worker (MB)':>16} {'PSS/worker (MB)':>16} {'sklearn':>8}")
+        for mode in ('pickle', 'mmap'):
+            results = run_workers(mode, args.workers, artifact_path)
+            outputs[mode] = np.array(results[0]['proba'])
+            print(f"{mode:>7} {mean([r['load'] for r in results]) * 1000:>10.1f} "
+                  f"{mean([r['rss_kb'] for r in results]) / 1024:>16.1f} "
+                  f"{mean([r['pss_kb'] for r in results]) / 1024:>16.1f} "
+                  f"{str(any(r['sklearn'] for r in results)):>8}")
+
+    diff = float(np.max(np.abs(outputs['pickle'] - outputs['mmap'])))
+    print(f"\nParitas prediksi pickle vs mmap: selisih maks {diff:.2e}")
+    if diff != 0.0:
+        raise SystemExit("Prediksi artefak mmap berbeda dari model pickle")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark latensi prediksi selama hot-reload model.
+
+Beberapa thread terus memprediksi satu baris (seperti request
+/api/analyze-watering) dengan membaca `ModelRegistry.active()`, sementara
+thread lain berganti-ganti mengaktifkan dua versi di registry. Latensi
+p50/p99/maks dibandingkan dengan periode tanpa pertukaran model, dan
+setiap prediksi dicek sama dengan keluaran versi yang dipakainya.
+
+Pemakaian:
+    python benchmarks/bench_model_swap.py [--seconds 3] [--swap-ms 100]
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from forest_engine import CompiledForest  # noqa: E402
+from model_registry import ModelRegistry  # noqa: E402
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'model_rf')
+ROW = np.array([[13, 31.0, 65.0, 35.0]])
+
+
+def serve(registry, seconds, threads, expected):
+    timings = [[] for _ in range(threads)]
+    mismatches = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(i):
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            active = registry.active()
+            proba = active.forest.predict_proba(ROW)
+            timings[i].append(time.perf_counter() - t0)
+            if not np.array_equal(proba, expected[active.version]):
+                mismatches[i] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return np.concatenate([np.asarray(t) for t in timings]), sum(mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--swap-ms', type=float, default=100)
+    args = parser.parse_args()
+
+    with open(MODEL_PATH, 'rb') as f:
+        forest = CompiledForest.from_sklearn(pickle.load(f))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(tmp, poll_interval=0)
+        # Versi kedua berisi separuh pohon agar keluarannya berbeda
+        registry.publish(forest, version='v1')
+        n_half = forest.n_trees // 2
+        half = CompiledForest(forest.feature, forest.threshold, forest.children, forest.value,
+                              forest.roots[:n_half], forest.classes, forest.max_depth, forest.feature_names)
+        registry.publish(half, version='v2', activate=False)
+        registry.load_current()
+        expected = {'v1': forest.predict_proba(ROW), 'v2': half.predict_proba(ROW)}
+
+        baseline, _ = serve(registry, args.seconds, args.threads, expected)
+
+        swaps = [0]
+        stop = threading.Event()
+
+        def swapper():
+            while not stop.wait(args.swap_ms / 1000):
+                registry.activate('v2' if registry.active().version == 'v1' else 'v1')
+                if registry.check():
+                    swaps[0] += 1
+
+        thread = threading.Thread(target=swapper)
+        thread.start()
+        swapping, mismatches = serve(registry, args.seconds, args.threads, expected)
+        stop.set()
+        thread.join()
+
+    print(f"{args.threads} thread prediksi, {args.seconds:.0f} detik per mode")
+    print(f"{'mode':>14} {'prediksi':>9} {'p50 (us)':>9} {'p99 (us)':>9} {'maks (ms)':>10}")
+    for name, timings in (('tanpa swap', baseline), (f'swap {args.swap_ms:.0f} ms', swapping)):
+        print(f"{name:>14} {len(timings):>9} {np.percentile(timings, 50) * 1e6:>9.0f} "
+              f"{np.percentile(timings, 99) * 1e6:>9.0f} {timings.max() * 1000:>10.2f}")
+    print(f"\n{swaps[0]} pertukaran model, {mismatches} prediksi tidak sesuai versinya")
+    if mismatches:
+        raise SystemExit("Prediksi memakai campuran dua versi model")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark memo prediksi (prediction_cache) untuk pola polling dashboard.
+
+Mensimulasikan dashboard yang memanggil /api/analyze-watering setiap 30
+detik sementara sensor menulis pembacaan baru setiap 60 detik, plus
+jadwal yang menanyakan pembacaan yang sama. Dilaporkan latensi prediksi
+per panggilan dan hit rate dengan cache aktif vs nonaktif, serta jumlah
+dokumen watering_analysis yang benar-benar ditulis.
+
+Pemakaian:
+    python benchmarks/bench_prediction_cache.py [--polls 2000]
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_concurrency import FakeDocument, FakeFirestore, fake_credentials  # noqa: E402
+
+
+class CountingWriter:
+    """Pengganti antrian write-behind yang hanya menghitung dokumen yang ditulis."""
+
+    def __init__(self):
+        self.enqueued = 0
+
+    def enqueue(self, collection, data):
+        self.enqueued += 1
+        return f'a{self.enqueued:06d}'
+
+    def close(self):
+        pass
+
+
+def reading_stream(polls, seed=3):
+    """Pembacaan sensor berubah perlahan (resolusi 0,1) dan berganti setiap dua polling."""
+    rng = np.random.default_rng(seed)
+    temperature, humidity, soil_moisture = 28.0, 78.0, 65.0
+    for poll in range(polls):
+        if poll % 2 == 0:
+            temperature = round(float(np.clip(temperature + rng.choice([-0.1, 0, 0.1]), 20, 35)), 1)
+            humidity = round(float(np.clip(humidity + rng.choice([-0.1, 0, 0.1]), 60, 95)), 1)
+            soil_moisture = round(float(np.clip(soil_moisture + rng.choice([-0.1, 0, 0.1]), 40, 90)), 1)
+        yield poll // 2, temperature, humidity, soil_moisture
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--polls', type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ.pop('SENSOR_STORE_PATH', None)
+    os.environ.setdefault('GOOGLE_CREDENTIALS_JSON', fake_credentials())
+    logging.disable(logging.INFO)
+
+    import app
+    from caching import LRUCache
+
+    firestore = FakeFirestore(0, latency=0)
+    app.firestore_client = firestore
+    app.get_active_model()
+    client = app.app.test_client()
+
+    print(f"{args.polls} polling, dokumen sensor baru setiap 2 polling")
+    print(f"{'cache':>8} {'us/prediksi':>12} {'hit rate':>9} {'analisis ditulis':>17}")
+    for name, size in (('nonaktif', 0), ('aktif', 4096)):
+        app.prediction_cache = LRUCache(size)
+        app.last_manual_analysis = None
+        app.analysis_writer = writer = CountingWriter()
+        timings = []
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for doc_index, temperature, humidity, soil_moisture in reading_stream(args.polls):
+                firestore.documents[:] = [FakeDocument(f's{doc_index:06d}', {
+                    'timestamp': time.time(), 'temperature': temperature,
+                    'humidity': humidity, 'soil_moisture': soil_moisture
+                })]
+                client.get('/api/analyze-watering')
+                # Analisis terjadwal untuk pembacaan yang sama
+                started = time.perf_counter()
+                app.predict_random_forest(temperature, humidity, soil_moisture, datetime.now().hour)
+                timings.append(time.perf_counter() - started)
+        stats = app.prediction_cache.stats()
+        print(f"{name:>8} {np.median(timings) * 1e6:>12.1f} {stats['hit_rate']:>9.2f} "
+              f"{writer.enqueued:>17}")
+
+    app.shutdown_background_jobs()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark cold start: waktu import app dan respons pertama '/'.
+
+Setiap mode dijalankan di proses Python baru: `sync` memuat Firebase dan
+model sebelum import selesai (perilaku lama), `background` menunda
+semuanya ke thread warm-up. Dilaporkan juga kapan /api/ready menjadi 200.
+
+Pemakaian:
+    python benchmarks/bench_startup.py [--runs 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from bench_concurrency import fake_credentials
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+CHILD = r"""
+import json, os, sys, time
+started = time.perf_counter()
+sys.stdout = open(os.devnull, 'w')
+import logging
+logging.disable(logging.INFO)
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+status = client.get('/').status_code
+first_response = time.perf_counter()
+while client.get('/api/ready').status_code != 200:
+    time.sleep(0.01)
+ready = time.perf_counter()
+app.shutdown_background_jobs()
+sys.__stdout__.write(json.dumps({
+    'import': imported - started,
+    'first_response': first_response - started,
+    'ready': ready - started,
+    'status': status
+}))
+"""
+
+
+def run_child(mode, env):
+    env = dict(env, STARTUP_WARMUP=mode)
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.pop('SENSOR_STORE_PATH', None)
+    env.setdefault('GOOGLE_CREDENTIALS_JSON', fake_credentials())
+
+    print(f"{'mode':>10} {'import (ms)':>12} {'/ pertama (ms)':>15} {'ready (ms)':>11}")
+    for mode in ('sync', 'background'):
+        results = [run_child(mode, env) for _ in range(args.runs)]
+        if any(result['status'] != 200 for result in results):
+            raise SystemExit(f"'/' gagal pada mode {mode}")
+        median = {key: float(np.median([result[key] for result in results])) * 1000
+                  for key in ('import', 'first_response', 'ready')}
+        print(f"{mode:>10} {median['import']:>12.0f} {median['first_response']:>15.0f} {median['ready']:>11.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+"""
+Suite benchmark end-to-end dengan baseline JSON dan mode perbandingan.
+
+Aplikasi dijalankan di atas backend data lokal (DATA_BACKEND=local, lihat
+bench_endpoints.py) dengan riwayat watering_analysis sintetis. Setiap
+skenario endpoint dijalankan pada beberapa tingkat konkurensi; latensi setiap request dicatat sehingga p50/p99 dan
+throughput berasal dari run yang sama. Latensi `predict_proba` model aktif
+(hutan atau tabel lookup, sesuai PREDICTION_MODE) diukur langsung untuk
+batch 1 sampai 1 juta baris.
+
+Hasil dapat disimpan sebagai baseline (--save) dan dibandingkan dengan
+baseline sebelumnya (--compare). Exit code 1 jika ada metrik yang lebih
+buruk dari toleransi atau porsi request yang gagal naik, sehingga suite
+dapat dipakai di CI.
+
+Pemakaian:
+    python benchmarks/bench_suite.py --save baseline.json
+    python benchmarks/bench_suite.py --compare baseline.json [--tolerance 0.2]
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_endpoints import call, import_local_app, predict_batch_body  # noqa: E402
+from local_backend import _dumps, synthetic_readings  # noqa: E402
+import watering_rules  # noqa: E402
+
+SUITE_VERSION = 2
+
+# (nama, method, url, persiapan); {now} adalah timestamp pembacaan terbaru di
+# backend lokal. Persiapan 'new-reading' menulis pembacaan sensor baru sebelum
+# setiap request (di luar waktu yang diukur), sehingga analisis tidak dilayani
+# dari memo dokumen yang sudah dianalisis
+ENDPOINT_SCENARIOS = [
+    ('sensor-data/latest-100', 'GET', '/api/sensor-data?limit=100', None),
+    ('sensor-data/latest-1000', 'GET', '/api/sensor-data?limit=1000', None),
+    ('sensor-data/range-1h', 'GET', '/api/sensor-data?start={hour_ago}&end={now}&limit=100', None),
+    ('sensor-data/range-1d', 'GET', '/api/sensor-data?start={day_ago}&end={now}&limit=1000', None),
+    ('sensor-data/range-7d', 'GET', '/api/sensor-data?start={week_ago}&end={now}&limit=5000', None),
+    ('latest-data', 'GET', '/api/latest-data', None),
+    ('analyze-watering', 'GET', '/api/analyze-watering', None),
+    ('analyze-watering/new-reading', 'GET', '/api/analyze-watering', 'new-reading'),
+    ('watering-history', 'GET', '/api/watering-history', None),
+    ('predict-batch/1000', 'POST', '/api/predict-batch', None),
+]
+
+# Jarak antar dokumen watering_analysis sintetis (detik)
+ANALYSIS_INTERVAL = 2 * 3600
+
+CONCURRENCY_LEVELS = [1, 8, 32]
+PREDICT_BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000, 1000000]
+
+# Metrik yang dibandingkan: (lebih besar lebih baik, pengali toleransi).
+# p99 lebih berisik dari p50, jadi diberi toleransi dua kali lipat.
+COMPARED_METRICS = {
+    'p50_ms': (False, 1.0),
+    'p99_ms': (False, 2.0),
+    'throughput': (True, 1.0),
+}
+
+
+def summarize(timings, elapsed, errors=0):
+    timings = np.asarray(timings) * 1000
+    return {
+        'requests': int(len(timings)),
+        'errors': int(errors),
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'mean_ms': float(timings.mean()),
+        'throughput': len(timings) / elapsed
+    }
+
+
+def seed_watering_analysis(database, rows, end, seed=1):
+    """
+    Isi watering_analysis dengan `rows` hasil analisis terjadwal sintetis
+    (satu setiap ANALYSIS_INTERVAL detik sampai `end`), agar /api/watering-history
+    diukur terhadap riwayat yang berisi.
+    """
+    timestamps, temperature, humidity, soil_moisture = synthetic_readings(rows, end, ANALYSIS_INTERVAL, seed)
+    decisions, codes = watering_rules.evaluate(temperature, humidity, soil_moisture)
+    reasons = watering_rules.reason_texts(codes, temperature, humidity, soil_moisture)
+    batch = []
+    for index, (ts, temp, hum, soil, decision) in enumerate(zip(
+        timestamps.tolist(), temperature.tolist(), humidity.tolist(), soil_moisture.tolist(), decisions.tolist()
+    )):
+        moment = datetime.fromtimestamp(ts)
+        batch.append(('watering_analysis', f'seed-analysis-{index:07d}', ts, _dumps({
+            'humidity': hum,
+            'soil_moisture': soil,
+            'temperature': temp,
+            'time': moment.isoformat(),
+            'timestamp': ts,
+            'keputusan_penyiraman': int(decision),
+            'keputusan_text': 'siram' if decision == 1 else 'jangan siram',
+            'alasan': next(reasons),
+            'created_at': moment.isoformat(),
+            'analysis_type': 'scheduled',
+            'scheduled_time': moment.strftime('%H:%M'),
+            'zone': 'default'
+        })))
+    database.write_many(
+        'INSERT OR REPLACE INTO documents (collection, doc_id, timestamp, data) VALUES (?, ?, ?, ?)', batch
+    )
+    return len(batch)
+
+
+def new_reading_writer(app, now):
+    """Fungsi yang menulis satu pembacaan sensor_history baru (timestamp naik) setiap dipanggil."""
+    collection = app.firestore_client.collection('sensor_history')
+    counter = itertools.count(1)
+
+    def write():
+        index = next(counter)
+        ts = now + index
+        collection.document(f'bench-reading-{index:09d}').set({
+            'timestamp': ts,
+            'DateTime': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts)),
+            'temperature': 25.0 + index % 10,
+            'humidity': 60.0 + index % 20,
+            'soil_moisture': 40.0 + index % 30
+        })
+
+    return write
+
+
+def run_endpoint(flask_app, method, url, body, clients, seconds, warmup=3, prepare=None):
+    """
+    Jalankan `clients` thread klien selama `seconds` detik; catat latensi setiap
+    request. `prepare` (opsional) dipanggil sebelum setiap request, di luar waktu yang diukur.
+    """
+    client = flask_app.test_client()
+    for _ in range(warmup):
+        if prepare is not None:
+            prepare()
+        call(client, method, url, body)
+
+    timings = [[] for _ in range(clients)]
+    errors = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def worker(i):
+        client = flask_app.test_client()
+        while time.perf_counter() < deadline:
+            if prepare is not None:
+                prepare()
+            t0 = time.perf_counter()
+            status = call(client, method, url, body).status_code
+            timings[i].append(time.perf_counter() - t0)
+            if status >= 400:
+                errors[i] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(worker, range(clients)))
+    elapsed = time.perf_counter() - started
+    return summarize([t for worker_timings in timings for t in worker_timings], elapsed, sum(errors))
+
+
+def run_predict(predictor, X, batch_size, budget_seconds=2.0, max_repeat=200):
+    """Latensi predict_proba untuk satu ukuran batch; diulang sampai anggaran waktu habis."""
+    batch = X[:batch_size]
+    predictor.predict_proba(batch)
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_repeat and (len(timings) < 3 or time.perf_counter() - started < budget_seconds):
+        t0 = time.perf_counter()
+        predictor.predict_proba(batch)
+        timings.append(time.perf_counter() - t0)
+    result = summarize(timings, sum(timings))
+    result['rows_per_second'] = batch_size * result['throughput']
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args):
+    tmp = tempfile.TemporaryDirectory()
+    app = import_local_app(args.rows, args.path, args.sensor_store, tmp.name)
+    latest = (app.firestore_client.collection('sensor_history')
+              .order_by('timestamp', direction='DESCENDING').limit(1).get())
+    now = int(latest[0].get('timestamp')) if latest else int(time.time())
+    window = {'now': now, 'hour_ago': now - 3600, 'day_ago': now - 86400, 'week_ago': now - 7 * 86400}
+    body = predict_batch_body(1000)
+    if not app.local_database.count('watering_analysis'):
+        seed_watering_analysis(app.local_database, args.analysis_rows, now)
+
+    active = app.get_active_model()
+    report = {
+        'suite_version': SUITE_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'rows': app.local_database.count('sensor_history'),
+        'analysis_rows': app.local_database.count('watering_analysis'),
+        'data_path': args.path,
+        'sensor_store': args.sensor_store,
+        'prediction_mode': app.PREDICTION_MODE,
+        'model_version': active.version if active is not None else None,
+        'results': {}
+    }
+    results = report['results']
+
+    new_reading = new_reading_writer(app, now)
+    for name, method, url, preparation in ENDPOINT_SCENARIOS:
+        url = url.format(**window)
+        prepare = new_reading if preparation == 'new-reading' else None
+        for clients in args.concurrency:
+            key = f'endpoint:{name}@c{clients}'
+            if args.only and args.only not in key:
+                continue
+            # Endpoint mencetak data ke stdout; buang agar tabel tetap terbaca
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                results[key] = run_endpoint(app.app, method, url, body, clients, args.seconds, prepare=prepare)
+            print_result(key, results[key])
+
+    sizes = [size for size in PREDICT_BATCH_SIZES
+             if size <= args.max_batch and (not args.only or args.only in f'predict:{size}')]
+    if active is not None and sizes:
+        from compaction import sample_domain
+
+        X = sample_domain(active.forest, max(sizes), seed=0)
+        for size in sizes:
+            key = f'predict:{size}'
+            results[key] = run_predict(active.predictor, X, size, args.seconds)
+            print_result(key, results[key])
+
+    app.shutdown_background_jobs()
+    tmp.cleanup()
+    return report
+
+
+def print_result(key, result):
+    extra = f" {result['rows_per_second']:>12.0f} baris/s" if 'rows_per_second' in result else ''
+    errors = f"  ({result['errors']} error)" if result['errors'] else ''
+    print(f"{key:<40} p50 {result['p50_ms']:>9.2f} ms  p99 {result['p99_ms']:>9.2f} ms  "
+          f"{result['throughput']:>9.1f} /s{extra}{errors}")
+
+
+def error_rate(result):
+    return result.get('errors', 0) / result['requests'] if result.get('requests') else 0.0
+
+
+def compare(baseline, current, tolerance):
+    """
+    Bandingkan hasil dengan baseline. Return list baris (key, metrik, baseline,
+    sekarang, perubahan relatif, status) untuk key yang ada di keduanya.
+    Kenaikan porsi request yang gagal selalu regresi: skenario yang mulai
+    gagal cepat dengan 4xx/5xx justru terlihat lebih cepat di metrik latensi,
+    jadi metrik latensi key itu tidak dibandingkan.
+    """
+    rows = []
+    for key, result in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None:
+            continue
+        before, after = error_rate(base), error_rate(result)
+        if before or after:
+            change = (after - before) / before if before else float('inf')
+            rows.append((key, 'error_rate', before, after, change, 'REGRESI' if after > before else 'ok'))
+            if after > before:
+                continue
+        for metric, (higher_is_better, scale) in COMPARED_METRICS.items():
+            before, after = base.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            if worse > tolerance * scale:
+                status = 'REGRESI'
+            elif worse < -tolerance * scale:
+                status = 'lebih baik'
+            else:
+                status = 'ok'
+            rows.append((key, metric, before, after, change, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200000, help='Jumlah pembacaan sintetis.')
+    parser.add_argument('--path', default=':memory:', help='Database backend lokal (file dipakai ulang jika sudah terisi).')
+    parser.add_argument('--sensor-store', action='store_true', help='Layani query sensor dari store lokal.')
+    parser.add_argument('--analysis-rows', type=int, default=5000,
+                        help='Jumlah dokumen watering_analysis sintetis (jika koleksi masih kosong).')
+    parser.add_argument('--concurrency', type=lambda value: [int(c) for c in value.split(',')],
+                        default=CONCURRENCY_LEVELS, help='Tingkat konkurensi, dipisah koma.')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Durasi per skenario dan tingkat konkurensi.')
+    parser.add_argument('--max-batch', type=int, default=PREDICT_BATCH_SIZES[-1], help='Ukuran batch prediksi terbesar.')
+    parser.add_argument('--only', default=None, help='Jalankan hanya hasil yang key-nya memuat teks ini.')
+    parser.add_argument('--save', default=None, help='Simpan hasil sebagai baseline JSON.')
+    parser.add_argument('--compare', default=None, help='Bandingkan dengan baseline JSON ini.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Perubahan relatif yang masih dianggap sama.')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('suite_version') != SUITE_VERSION:
+            raise SystemExit(f"Baseline {args.compare} dibuat oleh versi suite lain")
+
+    report = run_suite(args)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nHasil disimpan ke {args.save}")
+
+    if baseline is None:
+        return
+    print(f"\nDibandingkan dengan {args.compare} (commit {baseline.get('git_commit')}, "
+          f"{baseline.get('created_at')}), toleransi {args.tolerance:.0%}")
+    rows = compare(baseline, report, args.tolerance)
+    for key, metric, before, after, change, status in rows:
+        print(f"{key:<40} {metric:<11} {before:>12.2f} -> {after:>12.2f} {change:>+8.1%}  {status}")
+    regressions = [row for row in rows if row[-1] == 'REGRESI']
+    print(f"\n{len(regressions)} regresi dari {len(rows)} metrik")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
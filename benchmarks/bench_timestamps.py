@@ -0,0 +1,128 @@
+"""
+Benchmark parsing DateTime: parser lama vs TimestampParser.
+
+Parser lama (salinan fungsi parse_datetime_string sebelum modul timestamps)
+mencoba setiap format secara berurutan dan menulis log INFO untuk setiap
+parse yang berhasil. Skrip ini memeriksa bahwa parser memoisasi dan parser
+kolom memberikan hasil yang sama persis dengan parser lama, lalu mengukur
+throughput ketiganya.
+
+Pemakaian:
+    python benchmarks/bench_timestamps.py [--rows 100000]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from timestamps import DATETIME_FORMATS, TimestampParser  # noqa: E402
+
+logger = logging.getLogger('bench_timestamps')
+
+# Campuran format seperti di Firestore: mayoritas format perangkat, sisanya format lain
+FORMAT_MIX = [
+    ("%d/%m/%Y %H:%M:%S", 0.80),
+    ("%Y-%m-%d %H:%M:%S", 0.10),
+    ("%Y-%m-%dT%H:%M:%S.%f", 0.05),
+    ("%Y-%m-%dT%H:%M:%SZ", 0.04),
+    ("%Y-%m-%dT%H:%M:%S+07:00", 0.01),
+]
+
+
+def legacy_parse_datetime_string(datetime_str):
+    """Parser lama dari app.py (format dicoba berurutan, log INFO setiap berhasil)."""
+    try:
+        if not datetime_str:
+            logger.warning("Empty datetime string provided")
+            return None
+
+        datetime_str = str(datetime_str).strip()
+
+        for fmt in DATETIME_FORMATS:
+            try:
+                dt = datetime.strptime(datetime_str, fmt)
+                timestamp = dt.timestamp()
+                logger.info(f"Successfully parsed '{datetime_str}' with format '{fmt}' -> timestamp: {timestamp}")
+                return timestamp
+            except ValueError:
+                continue
+
+        try:
+            if datetime_str.endswith('Z'):
+                datetime_str = datetime_str[:-1] + '+00:00'
+            dt = datetime.fromisoformat(datetime_str)
+            timestamp = dt.timestamp()
+            logger.info(f"Successfully parsed '{datetime_str}' with ISO format -> timestamp: {timestamp}")
+            return timestamp
+        except ValueError:
+            logger.error(f"Could not parse datetime string: '{datetime_str}'")
+            return None
+
+    except Exception as e:
+        logger.error(f"Error parsing datetime string '{datetime_str}': {e}")
+        return None
+
+
+def generate_strings(n_rows, rng):
+    formats = [fmt for fmt, _ in FORMAT_MIX]
+    weights = np.array([weight for _, weight in FORMAT_MIX])
+    choices = rng.choice(len(formats), size=n_rows, p=weights / weights.sum())
+    start = datetime(2025, 1, 1)
+    offsets = np.sort(rng.uniform(0, 365 * 86400, n_rows))
+    return [
+        (start + timedelta(seconds=float(offset))).strftime(formats[choice])
+        for offset, choice in zip(offsets, choices)
+    ]
+
+
+def check_parity(values):
+    expected = np.array([np.nan if v is None else v for v in map(legacy_parse_datetime_string, values)])
+    scalar_parser = TimestampParser()
+    scalar = np.array([np.nan if v is None else v for v in map(scalar_parser.parse, values)])
+    column = TimestampParser().parse_column(values)
+
+    for name, result in (('scalar', scalar), ('kolom', column)):
+        same = np.array_equal(expected, result, equal_nan=True)
+        print(f"Parity {name} pada {len(values)} string: {'sama' if same else 'BERBEDA'}")
+        if not same:
+            raise SystemExit(f"Parser {name} tidak sama dengan parser lama")
+
+
+def measure(fn, values):
+    t0 = time.perf_counter()
+    fn(values)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Log INFO parser lama dievaluasi (f-string) tetapi tidak ditulis ke mana pun
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+    rng = np.random.default_rng(args.seed)
+    values = generate_strings(args.rows, rng)
+    check_parity(values[:20000])
+
+    scalar_parser = TimestampParser()
+    timings = {
+        'lama': measure(lambda vs: [legacy_parse_datetime_string(v) for v in vs], values),
+        'memoisasi': measure(lambda vs: [scalar_parser.parse(v) for v in vs], values),
+        'kolom': measure(TimestampParser().parse_column, values),
+    }
+
+    print(f"{'parser':>10} {'total (ms)':>12} {'per string (us)':>16} {'speedup':>9}")
+    for name, seconds in timings.items():
+        print(f"{name:>10} {seconds * 1000:>12.1f} {seconds / args.rows * 1e6:>16.2f} {timings['lama'] / seconds:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
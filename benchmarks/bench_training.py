@@ -0,0 +1,80 @@
+"""
+Benchmark pelatihan ulang untuk satu tahun pembacaan sensor.
+
+Membuat file ekspor NDJSON sintetis (default satu pembacaan per menit
+selama 365 hari), lalu mengukur pemuatan per potongan ke matriks float32,
+fit RandomForestClassifier untuk beberapa nilai n_jobs, ukuran model dan
+latensi inferensi. Puncak memori proses (ru_maxrss) dilaporkan untuk
+memastikan pemuatan tetap terbatas.
+
+Pemakaian:
+    python benchmarks/bench_training.py [--days 365] [--n-jobs 1,-1]
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import training  # noqa: E402
+
+
+def write_export(path, days, interval):
+    """Tulis data sintetis dengan pola harian suhu/kelembapan seperti sensor kebun."""
+    rng = np.random.default_rng(7)
+    start = time.time() - days * 86400
+    n_rows = int(days * 86400 / interval)
+    with open(path, 'w', encoding='utf-8') as f:
+        for offset in range(0, n_rows, 100000):
+            ts = start + np.arange(offset, min(n_rows, offset + 100000)) * interval
+            phase = np.sin((ts % 86400) / 86400 * 2 * np.pi)
+            temperature = 27 + 5 * phase + rng.normal(0, 1.5, len(ts))
+            humidity = 78 - 8 * phase + rng.normal(0, 4, len(ts))
+            soil_moisture = 65 + 12 * np.sin(ts / (3 * 86400)) + rng.normal(0, 5, len(ts))
+            f.writelines(
+                json.dumps({'timestamp': t, 'temperature': round(a, 2), 'humidity': round(b, 2),
+                            'soil_moisture': round(c, 2), 'source': 'firestore'}) + '\n'
+                for t, a, b, c in zip(ts.tolist(), temperature.tolist(), humidity.tolist(), soil_moisture.tolist())
+            )
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=float, default=365)
+    parser.add_argument('--interval', type=float, default=60, help='Detik antar pembacaan')
+    parser.add_argument('--n-jobs', default='1,-1')
+    parser.add_argument('--trees', type=int, default=training.DEFAULT_TREES)
+    parser.add_argument('--max-samples', type=float, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sensor-data.ndjson')
+        n_rows = write_export(path, args.days, args.interval)
+        print(f"File ekspor: {n_rows} baris, {os.path.getsize(path) / 1e6:.0f} MB")
+
+        started = time.perf_counter()
+        training_set = training.load_training_set(training.iter_export_file(path), chunk_rows=10000)
+        load_seconds = time.perf_counter() - started
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"Pemuatan: {load_seconds:.1f}s, matriks {training_set.nbytes / 1e6:.1f} MB, "
+              f"puncak RSS {peak_mb:.0f} MB")
+
+    print(f"\n{os.cpu_count()} CPU, {args.trees} pohon")
+    print(f"{'n_jobs':>7} {'fit (s)':>8} {'node':>7} {'artefak (KB)':>13} {'akurasi':>8} {'latensi (us)':>13}")
+    for n_jobs in (int(value) for value in args.n_jobs.split(',')):
+        _, report = training.train(training_set, n_estimators=args.trees, n_jobs=n_jobs,
+                                   max_samples=args.max_samples)
+        print(f"{n_jobs:>7} {report['fit_seconds']:>8.1f} {report['nodes']:>7} "
+              f"{report['artifact_bytes'] / 1024:>13.0f} {report['holdout_accuracy']:>8.4f} "
+              f"{report['latency_seconds'] * 1e6:>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Cache in-process yang dipakai bersama oleh semua request dalam satu worker.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class ReadThroughCache:
+    """
+    Cache read-through satu nilai dengan TTL dan refresh single-flight.
+
+    Saat nilai kedaluwarsa hanya satu thread yang memanggil `loader`; request
+    lain yang datang bersamaan menunggu hasil fetch yang sama alih-alih
+    membuat round trip sendiri ke backend.
+    """
+
+    def __init__(self, loader, ttl):
+        self._loader = loader
+        self.ttl = float(ttl)
+        self._cond = threading.Condition()
+        self._value = _MISSING
+        self._loaded_at = 0.0
+        self._loading = False
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.errors = 0
+
+    def _fresh(self, now):
+        return self._value is not _MISSING and now - self._loaded_at < self.ttl
+
+    def get(self):
+        with self._cond:
+            waited = False
+            while True:
+                if self._fresh(time.monotonic()):
+                    if waited:
+                        self.shared += 1
+                    else:
+                        self.hits += 1
+                    return self._value
+                if not self._loading:
+                    self._loading = True
+                    self.misses += 1
+                    break
+                # Thread lain sedang fetch; tunggu hasilnya
+                waited = True
+                self._cond.wait()
+
+        try:
+            value = self._loader()
+        except Exception:
+            with self._cond:
+                self._loading = False
+                self.errors += 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._value = value
+            self._loaded_at = time.monotonic()
+            self._loading = False
+            self._cond.notify_all()
+        return value
+
+    def set(self, value):
+        """Isi cache secara langsung (misalnya dari listener realtime)."""
+        with self._cond:
+            self._value = value
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._cond:
+            self._value = _MISSING
+
+    def stats(self):
+        with self._cond:
+            requests = self.hits + self.misses + self.shared
+            age = time.monotonic() - self._loaded_at if self._value is not _MISSING else None
+            return {
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared_fetches': self.shared,
+                'errors': self.errors,
+                'hit_rate': (self.hits + self.shared) / requests if requests else 0.0,
+                'age_seconds': age
+            }
+
+
+class LRUCache:
+    """
+    Cache key -> nilai dengan ukuran terbatas; entri yang paling lama tidak
+    dipakai dibuang lebih dulu. Aman dipakai dari banyak thread.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = int(maxsize)
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'maxsize': self.maxsize,
+                'size': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0
+            }
@@ -0,0 +1,263 @@
+"""
+Pemadatan model Random Forest untuk inferensi yang lebih cepat dan kecil.
+
+Langkah yang tersedia (dapat digabung, hasilnya tetap `CompiledForest`):
+
+- `prune`: pilih subset pohon secara greedy sampai probabilitas rata-ratanya
+  cukup dekat dengan hutan penuh pada sampel domain sensor.
+- `quantize_thresholds`: geser ambang batas ke tengah antara dua nilai
+  berurutan pada resolusi sensor. Untuk input pada resolusi tersebut
+  keputusan setiap node tidak berubah, tetapi node yang setara antar pohon
+  menjadi identik.
+- `merge_subtrees`: gabungkan subtree identik (hash-consing) dan buang split
+  yang kedua anaknya sama, sehingga node menjadi DAG yang lebih kecil.
+- `distill`: latih satu pohon regresi pada probabilitas hutan untuk sampel
+  domain sensor; satu pohon lebih dalam menggantikan ratusan pohon dangkal.
+
+Kesesuaian dengan model asli selalu diukur pada sampel domain sensor yang
+terpisah dari sampel yang dipakai untuk pruning/distilasi.
+"""
+import numpy as np
+
+from forest_engine import FEATURE_ALIASES, CompiledForest
+
+# Resolusi asli pembacaan sensor (DHT22: 0,1 °C dan 0,1 %RH)
+SENSOR_RESOLUTION = {
+    'hour': 1.0,
+    'temperature': 0.1,
+    'humidity': 0.1,
+    'soil_moisture': 0.1,
+}
+
+# Rentang nilai yang masuk akal untuk sampel domain
+SENSOR_DOMAIN = {
+    'hour': (0, 23),
+    'temperature': (10.0, 45.0),
+    'humidity': (20.0, 100.0),
+    'soil_moisture': (0.0, 100.0),
+}
+
+COMPACTION_STEPS = ('prune', 'quantize', 'merge', 'distill')
+
+
+def _sensor_keys(forest):
+    names = forest.feature_names or []
+    keys = [FEATURE_ALIASES.get(name) for name in names]
+    if len(keys) != forest.n_features or None in keys:
+        raise ValueError(f"Fitur model tidak dikenal: {forest.feature_names}")
+    return keys
+
+
+def _grid_values(k, resolution):
+    # Nilai sensor ke-k pada resolusi tersebut, dibandingkan dalam float32 seperti saat prediksi
+    return np.round(k * resolution, 6).astype(np.float32).astype(np.float64)
+
+
+def sample_domain(forest, n_samples=20000, seed=0):
+    """Sampel acak seragam pada domain sensor, dibulatkan ke resolusi sensor, urut fitur model."""
+    rng = np.random.default_rng(seed)
+    columns = []
+    for key in _sensor_keys(forest):
+        low, high = SENSOR_DOMAIN[key]
+        resolution = SENSOR_RESOLUTION[key]
+        k = rng.integers(int(round(low / resolution)), int(round(high / resolution)) + 1, n_samples)
+        columns.append(_grid_values(k, resolution))
+    return np.stack(columns, axis=1).astype(np.float32)
+
+
+def agreement(reference, candidate, X):
+    """Kesesuaian kelas dan selisih probabilitas kandidat terhadap model referensi."""
+    expected = reference.predict_proba(X)
+    actual = candidate.predict_proba(X)
+    diff = np.abs(expected - actual)
+    return {
+        'class_agreement': float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean()),
+        'max_abs_diff': float(diff.max()),
+        'mean_abs_diff': float(diff.mean())
+    }
+
+
+def _rebuild(forest, roots, share=True, collapse=True):
+    """
+    Bangun ulang array node yang dapat dicapai dari `roots` dengan hash-consing:
+    daun dengan nilai sama dan node dengan (fitur, ambang, anak) sama dipakai
+    bersama. Dengan `collapse`, split yang kedua anaknya identik dihapus.
+    """
+    features, thresholds, children, values = [], [], [], []
+    keys = {}
+    memo = {}
+    depths = []
+    children_old = forest.children
+    value_old = forest.value
+
+    def add(key, feature, threshold, left, right, value, depth):
+        node = keys.get(key) if share else None
+        if node is not None:
+            return node
+        node = len(features)
+        features.append(feature)
+        thresholds.append(threshold)
+        children.append((node if left is None else left, node if right is None else right))
+        values.append(value)
+        depths.append(depth)
+        keys[key] = node
+        return node
+
+    def visit(old):
+        if old in memo:
+            return memo[old]
+        left_old, right_old = int(children_old[old, 0]), int(children_old[old, 1])
+        if left_old == old and right_old == old:
+            value = value_old[:, old]
+            node = add(('leaf', value.tobytes()), 0, np.inf, None, None, value, 0)
+        else:
+            left, right = visit(left_old), visit(right_old)
+            if collapse and left == right:
+                node = left
+            else:
+                feature, threshold = int(forest.feature[old]), float(forest.threshold[old])
+                node = add(('split', feature, threshold, left, right), feature, threshold,
+                           left, right, None, 1 + max(depths[left], depths[right]))
+        memo[old] = node
+        return node
+
+    new_roots = [visit(int(root)) for root in roots]
+    n_classes = value_old.shape[0]
+    value = np.zeros((n_classes, len(features)), dtype=np.float64)
+    for node, node_value in enumerate(values):
+        if node_value is not None:
+            value[:, node] = node_value
+
+    return CompiledForest(
+        feature=np.asarray(features, dtype=np.intp),
+        threshold=np.asarray(thresholds, dtype=np.float64),
+        children=np.asarray(children, dtype=np.intp).reshape(-1, 2),
+        value=value,
+        roots=np.asarray(new_roots, dtype=np.intp),
+        classes=forest.classes,
+        max_depth=max(depths[root] for root in new_roots) if new_roots else 0,
+        feature_names=forest.feature_names,
+        metadata=forest.metadata
+    )
+
+
+def select_trees(forest, X, n_trees=None, min_agreement=0.999):
+    """
+    Pilih pohon secara greedy: setiap langkah menambah pohon yang paling
+    mendekatkan probabilitas rata-rata subset ke hutan penuh. Berhenti pada
+    `n_trees` pohon, atau saat kesesuaian kelas mencapai `min_agreement`.
+    """
+    # (kelas, sampel, pohon): probabilitas daun setiap pohon
+    per_tree = forest.value[:, forest.apply(X)].astype(np.float32)
+    target = per_tree.mean(axis=2)
+    target_class = target.argmax(axis=0)
+    limit = n_trees or forest.n_trees
+
+    selected = []
+    total = np.zeros_like(target)
+    available = np.ones(forest.n_trees, dtype=bool)
+    while len(selected) < limit:
+        count = len(selected) + 1
+        error = (((total[:, :, None] + per_tree) / count - target[:, :, None]) ** 2).sum(axis=(0, 1))
+        error[~available] = np.inf
+        best = int(np.argmin(error))
+        selected.append(best)
+        available[best] = False
+        total += per_tree[:, :, best]
+        if n_trees is None and (total.argmax(axis=0) == target_class).mean() >= min_agreement:
+            break
+    return selected
+
+
+def prune(forest, n_trees=None, min_agreement=0.999, n_samples=20000, seed=1):
+    """Hutan berisi subset pohon hasil `select_trees` pada sampel domain sensor."""
+    X = sample_domain(forest, n_samples, seed)
+    selected = select_trees(forest, X, n_trees, min_agreement)
+    return _rebuild(forest, forest.roots[sorted(selected)], share=False, collapse=False)
+
+
+def quantize_thresholds(forest, resolution=None):
+    """
+    Ganti setiap ambang batas dengan titik tengah dua nilai sensor berurutan
+    yang mengapitnya. Prediksi untuk input pada resolusi sensor tidak berubah.
+    """
+    resolution = dict(SENSOR_RESOLUTION, **(resolution or {}))
+    threshold = forest.threshold.copy()
+    for index, key in enumerate(_sensor_keys(forest)):
+        mask = (forest.feature == index) & np.isfinite(threshold)
+        t = threshold[mask]
+        step = resolution[key]
+        k = np.floor(t / step).astype(np.int64)
+        # Koreksi pembulatan: k adalah nilai grid terbesar yang <= t
+        for _ in range(2):
+            k = np.where(_grid_values(k, step) > t, k - 1, k)
+            k = np.where(_grid_values(k + 1, step) <= t, k + 1, k)
+        threshold[mask] = (_grid_values(k, step) + _grid_values(k + 1, step)) / 2
+    return CompiledForest(
+        forest.feature, threshold, forest.children, forest.value, forest.roots, forest.classes,
+        forest.max_depth, forest.feature_names, forest.metadata
+    )
+
+
+def merge_subtrees(forest):
+    """Gabungkan subtree identik antar pohon dan hapus split yang tidak mengubah hasil."""
+    return _rebuild(forest, forest.roots)
+
+
+def distill(forest, max_depth=12, n_samples=300000, min_samples_leaf=5, seed=2):
+    """
+    Latih satu pohon regresi (sklearn) pada probabilitas hutan untuk sampel
+    domain sensor, lalu kompilasi menjadi CompiledForest satu pohon.
+    """
+    from sklearn.tree import DecisionTreeRegressor
+
+    X = sample_domain(forest, n_samples, seed)
+    student = DecisionTreeRegressor(max_depth=max_depth, min_samples_leaf=min_samples_leaf, random_state=seed)
+    student.fit(X, forest.predict_proba(X))
+
+    tree = student.tree_
+    is_leaf = tree.children_left == -1
+    node_ids = np.arange(tree.node_count)
+    value = tree.value[:, :, 0].T.astype(np.float64)
+    value /= np.where(value.sum(axis=0) == 0, 1.0, value.sum(axis=0))
+    return CompiledForest(
+        feature=np.where(is_leaf, 0, tree.feature).astype(np.intp),
+        threshold=np.where(is_leaf, np.inf, tree.threshold).astype(np.float64),
+        children=np.stack([np.where(is_leaf, node_ids, tree.children_left),
+                           np.where(is_leaf, node_ids, tree.children_right)], axis=1).astype(np.intp),
+        value=np.ascontiguousarray(value),
+        roots=np.zeros(1, dtype=np.intp),
+        classes=forest.classes,
+        max_depth=tree.max_depth,
+        feature_names=forest.feature_names,
+        metadata=forest.metadata
+    )
+
+
+def compact(forest, steps, prune_trees=None, min_agreement=0.999, distill_depth=12):
+    """
+    Jalankan langkah pemadatan berurutan (`prune` atau `distill`, lalu
+    `quantize`, lalu `merge`). Return (CompiledForest, laporan kesesuaian
+    terhadap model asli). `prune` dan `distill` tidak dapat digabung: distilasi
+    membangun ulang hutan sehingga hasil prune tidak terpakai.
+    """
+    unknown = set(steps) - set(COMPACTION_STEPS)
+    if unknown:
+        raise ValueError(f"Langkah pemadatan tidak dikenal: {', '.join(sorted(unknown))}")
+    if 'prune' in steps and 'distill' in steps:
+        raise ValueError("Langkah prune dan distill tidak dapat digabung; pilih salah satu")
+
+    compacted = forest
+    if 'distill' in steps:
+        compacted = distill(compacted, max_depth=distill_depth)
+    elif 'prune' in steps:
+        compacted = prune(compacted, prune_trees, min_agreement)
+    if 'quantize' in steps:
+        compacted = quantize_thresholds(compacted)
+    if 'merge' in steps:
+        compacted = merge_subtrees(compacted)
+
+    compacted.metadata = dict(forest.metadata, compaction=[step for step in COMPACTION_STEPS if step in steps])
+    report = agreement(forest, compacted, sample_domain(forest, 50000, seed=99))
+    report.update({'trees': compacted.n_trees, 'nodes': compacted.n_nodes, 'max_depth': compacted.max_depth})
+    return compacted, report
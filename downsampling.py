@@ -0,0 +1,109 @@
+"""
+Agregasi per bucket waktu dan downsampling LTTB untuk data grafik.
+
+Semua fungsi bekerja pada array NumPy yang sudah terurut berdasarkan
+timestamp, sehingga biaya per request ditentukan oleh jumlah titik keluaran
+dan satu kali lintasan vektor atas data mentah.
+"""
+import re
+
+import numpy as np
+
+BUCKET_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_bucket(value):
+    """
+    Ubah parameter bucket menjadi detik. Mendukung angka detik ('900') atau
+    angka dengan satuan s/m/h/d/w ('15m', '1h', '1d').
+    """
+    if value is None or value == '':
+        return None
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*', str(value).lower())
+    if not match:
+        raise ValueError(f"Format bucket tidak valid: {value}")
+    seconds = float(match.group(1)) * BUCKET_UNITS[match.group(2) or 's']
+    if seconds <= 0:
+        raise ValueError("Ukuran bucket harus lebih dari 0")
+    return seconds
+
+
+def bucket_aggregate(timestamps, columns, bucket_seconds):
+    """
+    Hitung count serta min/mean/max setiap kolom per bucket waktu.
+
+    `timestamps` harus terurut naik; `columns` adalah dict nama -> array.
+    Return dict berisi 'timestamp' (awal bucket), 'count', dan untuk tiap
+    kolom: nama (mean), nama_min, nama_max.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if len(timestamps) == 0:
+        result = {'timestamp': np.empty(0), 'count': np.empty(0, dtype=np.int64)}
+        for name in columns:
+            result[name] = result[f'{name}_min'] = result[f'{name}_max'] = np.empty(0)
+        return result
+
+    bucket_ids = np.floor(timestamps / bucket_seconds).astype(np.int64)
+    # Indeks awal setiap bucket pada array yang sudah terurut
+    starts = np.flatnonzero(np.r_[True, bucket_ids[1:] != bucket_ids[:-1]])
+    counts = np.diff(np.r_[starts, len(timestamps)])
+
+    result = {
+        'timestamp': bucket_ids[starts] * bucket_seconds,
+        'count': counts,
+    }
+    for name, values in columns.items():
+        values = np.asarray(values, dtype=np.float64)
+        result[name] = np.add.reduceat(values, starts) / counts
+        result[f'{name}_min'] = np.minimum.reduceat(values, starts)
+        result[f'{name}_max'] = np.maximum.reduceat(values, starts)
+    return result
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Pilih indeks titik dengan Largest-Triangle-Three-Buckets.
+
+    `y` boleh berupa matriks (n, k) untuk beberapa seri sekaligus; setiap
+    seri diskalakan ke rentangnya lalu luas segitiga dijumlahkan, sehingga
+    satu set indeks mewakili semua seri.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if y.ndim == 1:
+        y = y[:, None]
+
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    span = np.ptp(y, axis=0)
+    span[span == 0] = 1.0
+    y = (y - y.min(axis=0)) / span
+
+    # Titik pertama dan terakhir selalu dipertahankan; sisanya dibagi ke n_out - 2 bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Titik rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        if next_lo >= next_hi:
+            next_x, next_y = x[-1], y[-1]
+        else:
+            next_x = x[next_lo:next_hi].mean()
+            next_y = y[next_lo:next_hi].mean(axis=0)
+
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        areas = np.abs(
+            (x[previous] - next_x) * (by - y[previous]) - (x[previous] - bx)[:, None] * (next_y - y[previous])
+        ).sum(axis=1)
+        previous = lo + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return selected
@@ -0,0 +1,303 @@
+"""
+Mesin inferensi Random Forest berbasis array datar.
+
+Model sklearn yang dipickle (`model_rf`) dikompilasi sekali saat dimuat menjadi
+beberapa array NumPy yang disambung untuk semua pohon (fitur, ambang batas,
+anak kiri/kanan dan nilai daun). Prediksi kemudian menelusuri semua pohon
+sekaligus secara tervektorisasi, tanpa dispatch Python per pohon.
+
+Hasil kompilasi dapat disimpan sebagai artefak biner (`save`) dan dibuka
+kembali dengan mmap read-only (`load`): worker tidak perlu unpickle maupun
+mengimport sklearn, dan halaman memori array dibagi bersama lewat page cache OS.
+"""
+import json
+import mmap
+import os
+import threading
+
+import numpy as np
+
+# Nama kolom fitur yang dikenal beserta besaran sensor yang diwakilinya.
+# Model saat ini dilatih dengan fitur: Waktu (jam), Suhu Udara,
+# Kelembapan Udara, Kelembapan Tanah.
+FEATURE_ALIASES = {
+    'Waktu': 'hour',
+    'Suhu Udara': 'temperature',
+    'Kelembapan Udara': 'humidity',
+    'Kelembapan Tanah': 'soil_moisture',
+    'hour': 'hour',
+    'temperature': 'temperature',
+    'humidity': 'humidity',
+    'soil_moisture': 'soil_moisture',
+}
+
+# Urutan fitur default untuk model tanpa `feature_names_in_`
+DEFAULT_FEATURES = ['temperature', 'humidity', 'soil_moisture']
+
+# Jumlah baris yang diproses per potongan agar memori matriks indeks node
+# (baris x pohon) tetap terbatas untuk batch besar
+CHUNK_ROWS = 256
+
+# Batas baris x pohon yang ditelusuri per node tanpa vektorisasi
+SCALAR_WALK_MAX = 4
+
+# Format artefak: magic (8 byte), panjang header (uint64 little-endian),
+# header JSON, lalu data array yang masing-masing disejajarkan ke ARTIFACT_ALIGN byte
+ARTIFACT_MAGIC = b'CFOREST1'
+ARTIFACT_ALIGN = 64
+ARTIFACT_ARRAYS = {
+    'feature': '<i8',
+    'threshold': '<f8',
+    'children': '<i8',
+    'value': '<f8',
+    'roots': '<i8',
+}
+
+
+def _align(offset):
+    return (offset + ARTIFACT_ALIGN - 1) // ARTIFACT_ALIGN * ARTIFACT_ALIGN
+
+
+def write_artifact(path, magic, header, arrays):
+    """
+    Tulis artefak biner: `magic`, header JSON (ditambah spesifikasi array),
+    lalu array {nama: (array, dtype)} yang disejajarkan. Atomik lewat rename.
+    """
+    arrays = {name: np.ascontiguousarray(array, dtype=dtype) for name, (array, dtype) in arrays.items()}
+    specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        specs[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps(dict(header, arrays=specs)).encode('utf-8')
+    data_offset = _align(16 + len(header))
+
+    # Nama sementara unik per thread: warm-up dan perintah CLI dalam satu proses
+    # dapat menulis artefak yang sama bersamaan
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(magic)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_offset + specs[name]['offset'])
+            f.write(array.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_artifact(path, magic, use_mmap=True):
+    """Baca artefak hasil `write_artifact`. Return (header, {nama: array read-only})."""
+    with open(path, 'rb') as f:
+        if f.read(8) != magic:
+            raise ValueError(f"Bukan artefak {magic.decode()}: {path}")
+        header_length = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(header_length).decode('utf-8'))
+        if use_mmap:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            f.seek(0)
+            buffer = f.read()
+
+    data_offset = _align(16 + header_length)
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        count = int(np.prod(spec['shape']))
+        arrays[name] = np.frombuffer(
+            buffer, dtype=spec['dtype'], count=count, offset=data_offset + spec['offset']
+        ).reshape(spec['shape'])
+    return header, arrays
+
+
+class CompiledForest:
+    """
+    Representasi Random Forest dalam array datar.
+
+    Node dari semua pohon disimpan berurutan; `roots` berisi indeks node akar
+    tiap pohon dan `children[i]` berisi (anak kiri, anak kanan) node i. Node
+    daun menunjuk ke dirinya sendiri sebagai kedua anaknya sehingga
+    penelusuran dapat berjalan `max_depth` langkah tanpa percabangan per
+    sampel. `value` berbentuk (n_kelas, n_node) berisi probabilitas daun.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes,
+                 max_depth, feature_names=None, metadata=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes = classes
+        self.max_depth = int(max_depth)
+        self.n_features = int(len(feature_names)) if feature_names is not None else int(feature.max() + 1)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.metadata = dict(metadata or {})
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Kompilasi RandomForestClassifier (sklearn) menjadi CompiledForest."""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n_nodes)
+
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            # Normalisasi nilai daun menjadi probabilitas seperti predict_proba per pohon
+            leaf_value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = leaf_value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.stack([left, right], axis=1))
+            values.append(leaf_value / normalizer)
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        feature_names = getattr(model, 'feature_names_in_', None)
+        if feature_names is None:
+            feature_names = DEFAULT_FEATURES[:model.n_features_in_] if model.n_features_in_ <= 3 else None
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.concatenate(children).astype(np.intp),
+            value=np.ascontiguousarray(np.concatenate(values).T),
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.asarray(model.classes_),
+            max_depth=max_depth,
+            feature_names=feature_names,
+        )
+
+    def save(self, path, metadata=None):
+        """
+        Simpan sebagai artefak biner untuk `load`. Ditulis ke file sementara
+        lalu di-rename, sehingga worker lain tidak pernah membaca file setengah jadi.
+        """
+        write_artifact(path, ARTIFACT_MAGIC, {
+            'version': 1,
+            'max_depth': self.max_depth,
+            'classes': self.classes.tolist(),
+            'feature_names': self.feature_names,
+            'metadata': dict(self.metadata, **(metadata or {})),
+        }, {name: (getattr(self, name), dtype) for name, dtype in ARTIFACT_ARRAYS.items()})
+
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """
+        Buka artefak hasil `save`. Dengan `use_mmap` array menunjuk langsung
+        ke halaman file yang di-mmap read-only (tanpa salinan).
+        """
+        header, arrays = read_artifact(path, ARTIFACT_MAGIC, use_mmap)
+        return cls(
+            classes=np.asarray(header['classes']),
+            max_depth=header['max_depth'],
+            feature_names=header['feature_names'],
+            metadata=header.get('metadata'),
+            **{name: arrays[name] for name in ARTIFACT_ARRAYS}
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def build_features(self, temperature, humidity, soil_moisture, hour=None):
+        """
+        Susun matriks fitur (n_sampel, n_fitur) sesuai urutan fitur model.
+        Setiap argumen boleh berupa skalar atau array; `hour` hanya dipakai
+        jika model membutuhkan fitur waktu.
+        """
+        columns = {
+            'temperature': temperature,
+            'humidity': humidity,
+            'soil_moisture': soil_moisture,
+            'hour': hour,
+        }
+        names = self.feature_names or DEFAULT_FEATURES
+        ordered = []
+        for name in names:
+            key = FEATURE_ALIASES.get(name)
+            if key is None:
+                raise ValueError(f"Fitur model tidak dikenal: {name}")
+            if columns[key] is None:
+                raise ValueError(f"Fitur '{name}' dibutuhkan model tetapi tidak diberikan")
+            ordered.append(np.atleast_1d(np.asarray(columns[key], dtype=np.float64)))
+        ordered = np.broadcast_arrays(*ordered)
+        return np.stack(ordered, axis=1)
+
+    def predict_proba(self, X):
+        """Probabilitas rata-rata semua pohon untuk setiap baris X."""
+        # sklearn membandingkan fitur dalam float32 dengan ambang batas float64
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X memiliki {X.shape[1]} fitur, model membutuhkan {self.n_features}")
+
+        X = np.ascontiguousarray(X)
+        proba = np.empty((X.shape[0], len(self.classes)), dtype=np.float64)
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            proba[start:start + len(chunk)] = self._predict_chunk(chunk)
+        return proba
+
+    def _apply_chunk(self, X):
+        n_rows, n_features = X.shape
+        if n_rows * self.n_trees <= SCALAR_WALK_MAX:
+            return self._apply_scalar(X)
+        flat_x = X.ravel()
+        row_offset = (np.arange(n_rows) * n_features)[:, None]
+        flat_children = self.children.ravel()
+
+        # Matriks (baris, pohon) berisi node aktif; semua pohon maju satu level per langkah
+        node = np.broadcast_to(self.roots, (n_rows, self.n_trees))
+        for _ in range(self.max_depth):
+            go_right = flat_x.take(row_offset + self.feature.take(node)) > self.threshold.take(node)
+            node = flat_children.take(node * 2 + go_right)
+        return node
+
+    def _apply_scalar(self, X):
+        # Untuk beberapa baris x sedikit pohon (model hasil distilasi), overhead
+        # satu operasi NumPy per level lebih mahal daripada menelusuri node langsung
+        feature, threshold, children = self.feature, self.threshold, self.children
+        leaves = np.empty((X.shape[0], self.n_trees), dtype=np.intp)
+        for i, row in enumerate(X.tolist()):
+            for j, node in enumerate(self.roots.tolist()):
+                for _ in range(self.max_depth):
+                    node = int(children[node, 1 if row[feature[node]] > threshold[node] else 0])
+                leaves[i, j] = node
+        return leaves
+
+    def _predict_chunk(self, X):
+        node = self._apply_chunk(X)
+        return np.stack([class_value.take(node).sum(axis=1) for class_value in self.value], axis=1) / self.n_trees
+
+    def apply(self, X):
+        """Indeks node daun (baris, pohon) untuk setiap baris X, seperti `apply` sklearn."""
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32).reshape(-1, self.n_features))
+        return np.concatenate([
+            self._apply_chunk(X[start:start + CHUNK_ROWS]) for start in range(0, max(len(X), 1), CHUNK_ROWS)
+        ])
+
+    def predict_with_proba(self, X):
+        """Kembalikan (kelas, probabilitas) dari satu kali penelusuran hutan."""
+        proba = self.predict_proba(X)
+        return self.classes.take(np.argmax(proba, axis=1)), proba
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
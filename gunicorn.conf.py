@@ -0,0 +1,34 @@
+"""
+Konfigurasi gunicorn: `gunicorn -c gunicorn.conf.py app:app`.
+
+/api/stream (Server-Sent Events) menahan satu thread per dashboard yang
+terbuka, jadi worker sync bawaan gunicorn akan habis oleh beberapa tab dan
+dibunuh setelah `timeout`. Dengan worker gthread setiap worker melayani
+`threads` request sekaligus dan `timeout` hanya berlaku untuk heartbeat
+worker, bukan durasi satu response. Aplikasi membatasi koneksi SSE per
+worker (SSE_MAX_CLIENTS, bawaan 16) di bawah jumlah thread agar selalu ada
+thread untuk request biasa; klien yang ditolak kembali ke polling.
+
+Scheduler analisis penyiraman hanya berjalan di satu worker: hook
+post_worker_init berjalan di setiap worker setelah fork dan aplikasi dimuat,
+lalu start_scheduler_leader() hanya menjalankan scheduler di worker yang
+mendapat leader lock (SCHEDULER_LOCK_PATH). Master tidak pernah menjalankan
+scheduler, juga dengan --preload. Jika worker leader mati, worker pengganti
+mengambil alih lock.
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_worker_init(worker):
+    from app import start_scheduler_leader
+
+    if start_scheduler_leader():
+        worker.log.info("Worker %s menjalankan scheduler analisis", worker.pid)
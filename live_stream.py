@@ -0,0 +1,265 @@
+"""
+Distribusi update sensor secara live ke dashboard melalui Server-Sent Events.
+
+Satu listener di sisi server (Realtime Database `listen()` pada /DHT dan
+/SoilMoisture serta snapshot listener Firestore pada `watering_analysis`)
+meneruskan perubahan ke `BroadcastHub`, yang menyebarkannya ke semua klien
+`/api/stream` yang terhubung. Sumber listener dapat diganti dengan
+`ManualListenerSource` untuk pengujian tanpa jaringan.
+"""
+import json
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event, data):
+    """Format satu pesan Server-Sent Events."""
+    payload = json.dumps(data, default=str, separators=(',', ':'))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """Antrian pesan untuk satu klien SSE."""
+
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # Klien lambat: buang pesan tertua agar publisher tidak pernah terblokir
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            self.queue.put_nowait(message)
+
+    def get(self, timeout=None):
+        """Ambil pesan berikutnya, atau None jika timeout (untuk heartbeat)."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class BroadcastHub:
+    """
+    Hub broadcast in-memory. Pesan diformat sekali lalu dimasukkan ke antrian
+    setiap subscriber. Event yang ditandai `retain` disimpan dan langsung
+    dikirim ke subscriber baru sebagai state awal. `max_subscribers`
+    membatasi jumlah klien sekaligus (setiap klien menahan satu thread).
+    """
+
+    def __init__(self, max_queue=100, max_subscribers=None):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._retained = {}
+        self.published = 0
+
+    def subscribe(self):
+        """Daftarkan klien baru; None jika jumlah subscriber sudah mencapai batas."""
+        subscription = Subscription(self.max_queue)
+        with self._lock:
+            if self.max_subscribers is not None and len(self._subscribers) >= self.max_subscribers:
+                return None
+            for message in self._retained.values():
+                subscription.put(message)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event, data, retain=False):
+        message = format_sse(event, data)
+        with self._lock:
+            if retain:
+                self._retained[event] = message
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for subscription in subscribers:
+            subscription.put(message)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+def apply_rtdb_event(state, event_type, path, data):
+    """
+    Terapkan event Realtime Database (put/patch) ke state node yang dilihat
+    listener. `path` relatif terhadap node yang di-listen ('/' = seluruh node).
+    """
+    keys = [key for key in (path or '/').split('/') if key]
+    if not keys:
+        if event_type == 'patch' and isinstance(state, dict) and isinstance(data, dict):
+            merged = dict(state)
+            merged.update(data)
+            return merged
+        return data
+
+    root = dict(state) if isinstance(state, dict) else {}
+    node = root
+    for key in keys[:-1]:
+        child = node.get(key)
+        node[key] = dict(child) if isinstance(child, dict) else {}
+        node = node[key]
+
+    leaf = keys[-1]
+    if event_type == 'patch' and isinstance(data, dict):
+        child = node.get(leaf)
+        merged = dict(child) if isinstance(child, dict) else {}
+        merged.update(data)
+        node[leaf] = merged
+    elif data is None:
+        node.pop(leaf, None)
+    else:
+        node[leaf] = data
+    return root
+
+
+class FirebaseListenerSource:
+    """Sumber listener berbasis Firebase: RTDB listen() dan Firestore on_snapshot()."""
+
+    def __init__(self, firestore_client, rtdb, paths=('/DHT', '/SoilMoisture'),
+                 history_collection='watering_analysis', history_limit=20):
+        self.firestore_client = firestore_client
+        self.rtdb = rtdb
+        self.paths = paths
+        self.history_collection = history_collection
+        self.history_limit = history_limit
+        self._registrations = []
+        self._watch = None
+
+    def start(self, on_realtime, on_history):
+        from firebase_admin import firestore
+
+        for path in self.paths:
+            state = {'value': None}
+
+            def callback(event, path=path, state=state):
+                state['value'] = apply_rtdb_event(state['value'], event.event_type, event.path, event.data)
+                on_realtime(path, state['value'])
+
+            self._registrations.append(self.rtdb.reference(path).listen(callback))
+
+        def on_snapshot(_docs, changes, _read_time):
+            upserted, removed = [], []
+            for change in changes:
+                if change.type.name == 'REMOVED':
+                    removed.append(change.document.id)
+                else:
+                    data = change.document.to_dict()
+                    data['id'] = change.document.id
+                    upserted.append(data)
+            on_history(upserted, removed)
+
+        query = (self.firestore_client.collection(self.history_collection)
+                 .order_by('timestamp', direction=firestore.Query.DESCENDING)
+                 .limit(self.history_limit))
+        self._watch = query.on_snapshot(on_snapshot)
+
+    def stop(self):
+        for registration in self._registrations:
+            registration.close()
+        self._registrations = []
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+
+class ManualListenerSource:
+    """Sumber listener palsu; event dipicu manual lewat emit_*(), tanpa jaringan."""
+
+    def __init__(self):
+        self.on_realtime = None
+        self.on_history = None
+        self.started = False
+
+    def start(self, on_realtime, on_history):
+        self.on_realtime = on_realtime
+        self.on_history = on_history
+        self.started = True
+
+    def stop(self):
+        self.started = False
+
+    def emit_realtime(self, path, data):
+        self.on_realtime(path, data)
+
+    def emit_history(self, upserted=(), removed=()):
+        self.on_history(list(upserted), list(removed))
+
+
+class LiveFeed:
+    """
+    Menghubungkan sumber listener ke hub. Listener dijalankan sekali saat
+    klien pertama terhubung dan dipakai bersama oleh semua klien.
+
+    `build_latest` mengubah (data_dht, data_soil) menjadi payload event
+    `latest-data`; `on_snapshot` (opsional) menerima snapshot yang sama,
+    misalnya untuk memperbarui cache RTDB. Event baru dikirim setelah data
+    semua REALTIME_PATHS diterima, sehingga klien tidak melihat nilai nol untuk
+    path yang belum tiba.
+    """
+
+    REALTIME_PATHS = ('/DHT', '/SoilMoisture')
+
+    def __init__(self, source, hub, build_latest, on_snapshot=None):
+        self.source = source
+        self.hub = hub
+        self.build_latest = build_latest
+        self.on_snapshot = on_snapshot
+        self._lock = threading.Lock()
+        # Event realtime diproses berurutan agar payload lama tidak menimpa yang baru
+        self._event_lock = threading.Lock()
+        self._started = False
+        self._realtime = {}
+        self._last_latest = None
+
+    def ensure_started(self):
+        with self._lock:
+            if self._started:
+                return
+            self.source.start(self._handle_realtime, self._handle_history)
+            self._started = True
+            logger.info("Listener live stream dimulai")
+
+    def stop(self):
+        with self._lock:
+            if self._started:
+                self.source.stop()
+                self._started = False
+
+    def _handle_realtime(self, path, data):
+        try:
+            with self._event_lock:
+                self._realtime[path] = data
+                snapshot = tuple(self._realtime.get(p) for p in self.REALTIME_PATHS)
+                if any(value is None for value in snapshot):
+                    return
+
+                if self.on_snapshot is not None:
+                    self.on_snapshot(snapshot)
+
+                latest = self.build_latest(*snapshot)
+                # Hanya kirim jika payload berubah
+                if latest != self._last_latest:
+                    self._last_latest = latest
+                    self.hub.publish('latest-data', latest, retain=True)
+        except Exception as e:
+            logger.error("Error handling realtime event %s: %s", path, e)
+
+    def _handle_history(self, upserted, removed):
+        if upserted or removed:
+            self.hub.publish('watering-analysis', {'upserted': upserted, 'removed': removed})
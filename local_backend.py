@@ -0,0 +1,542 @@
+"""
+Backend data lokal pengganti Firebase untuk pengembangan dan uji beban.
+
+`LocalDatabase` menyimpan dokumen Firestore dan node Realtime Database di
+satu database SQLite (file, atau ':memory:') dan menyediakan subset API
+client Firebase yang dipakai aplikasi:
+
+- Firestore: `collection(name)` dengan `where`/`order_by`/`limit`/
+  `start_after`/`stream`/`get`, `document(id).set/get/delete`, `add` dan
+  `batch()` (semua operasi batch dalam satu transaksi).
+- Realtime Database: `reference(path).get/set/update` (path persis, tanpa
+  penelusuran child).
+
+Dokumen disimpan sebagai JSON dengan kolom `timestamp` terindeks, sehingga
+query rentang waktu dan "N terbaru" tetap berupa pencarian index walaupun
+koleksi berisi jutaan pembacaan sintetis (`seed_sensor_history`). Field lain
+difilter lewat `json_extract`. Urutan mengikuti Firestore: dokumen tanpa field
+yang diurutkan tidak ikut, nilai sama diurutkan berdasarkan id dokumen.
+"""
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from datetime import date, datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    timestamp REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (collection, doc_id)
+);
+CREATE INDEX IF NOT EXISTS documents_timestamp ON documents (collection, timestamp, doc_id);
+CREATE TABLE IF NOT EXISTS realtime (
+    path TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+DESCENDING = 'DESCENDING'
+ASCENDING = 'ASCENDING'
+
+COMPARISON_OPERATORS = ('==', '!=', '<', '<=', '>', '>=')
+
+# Baris per fetchmany() saat stream() membaca database file
+STREAM_FETCH_ROWS = 1000
+
+# Jumlah dokumen per transaksi saat seeding
+SEED_BATCH_ROWS = 50000
+
+
+def _encode(value):
+    # Nilai yang tidak dikenal json (numpy, datetime) disimpan seperti yang dikirim Firestore ke client
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps(data):
+    return json.dumps(data, default=_encode, separators=(',', ':'))
+
+
+def _timestamp_column(data):
+    value = data.get('timestamp')
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _field_sql(field):
+    if field == 'timestamp':
+        return 'timestamp'
+    if not field.replace('_', '').isalnum():
+        raise ValueError(f"Nama field tidak didukung backend lokal: {field}")
+    return f"json_extract(data, '$.{field}')"
+
+
+def _normalize_path(path):
+    return '/' + '/'.join(part for part in str(path).split('/') if part)
+
+
+class LocalDatabase:
+    """
+    Satu database SQLite untuk koleksi Firestore dan node Realtime Database.
+    Database file memakai satu koneksi per thread (WAL, pembaca tidak saling
+    menunggu); ':memory:' memakai satu koneksi bersama yang dijaga lock.
+    Penulisan selalu berurutan.
+    """
+
+    _instances = weakref.WeakSet()
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.in_memory = path == ':memory:'
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shared = sqlite3.connect(path, check_same_thread=False) if self.in_memory else None
+
+        conn = self.connection()
+        with self._lock:
+            conn.executescript(SCHEMA)
+            conn.commit()
+
+        self.firestore = LocalFirestore(self)
+        self.rtdb = LocalRealtimeDatabase(self)
+        LocalDatabase._instances.add(self)
+
+    def connection(self):
+        if self._shared is not None:
+            return self._shared
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def select(self, sql, params=()):
+        """Generator baris hasil query."""
+        if self._shared is not None:
+            with self._lock:
+                rows = self._shared.execute(sql, params).fetchall()
+            yield from rows
+            return
+
+        cursor = self.connection().execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(STREAM_FETCH_ROWS)
+            if not rows:
+                return
+            yield from rows
+
+    def write(self, statements):
+        """Jalankan list (sql, params) dalam satu transaksi."""
+        conn = self.connection()
+        with self._lock, conn:
+            for sql, params in statements:
+                conn.execute(sql, params)
+
+    def write_many(self, sql, rows):
+        conn = self.connection()
+        with self._lock, conn:
+            conn.executemany(sql, rows)
+
+    def count(self, collection):
+        return next(self.select('SELECT COUNT(*) FROM documents WHERE collection = ?', (collection,)))[0]
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'collections': {
+                name: count for name, count in
+                self.select('SELECT collection, COUNT(*) FROM documents GROUP BY collection')
+            },
+            'realtime_paths': [row[0] for row in self.select('SELECT path FROM realtime ORDER BY path')]
+        }
+
+    @classmethod
+    def _reset_after_fork(cls):
+        # Koneksi SQLite tidak boleh dipakai lintas fork; child membuka koneksi sendiri
+        for database in list(cls._instances):
+            database._local = threading.local()
+            database._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=LocalDatabase._reset_after_fork)
+
+
+class LocalDocumentSnapshot:
+    """Setara DocumentSnapshot Firestore: id, exists, to_dict(), get(field)."""
+
+    __slots__ = ('id', 'reference', '_data')
+
+    def __init__(self, reference, data):
+        self.id = reference.id
+        self.reference = reference
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return None if self._data is None else dict(self._data)
+
+    def get(self, field):
+        return None if self._data is None else self._data.get(field)
+
+
+class LocalDocumentReference:
+    def __init__(self, firestore, collection, doc_id):
+        self.firestore = firestore
+        self.collection = collection
+        self.id = doc_id
+
+    def get(self):
+        rows = list(self.firestore.database.select(
+            'SELECT data FROM documents WHERE collection = ? AND doc_id = ?', (self.collection, self.id)
+        ))
+        return LocalDocumentSnapshot(self, json.loads(rows[0][0]) if rows else None)
+
+    def set(self, data, merge=False):
+        batch = self.firestore.batch()
+        batch.set(self, data, merge=merge)
+        batch.commit()
+
+    def update(self, data):
+        self.set(data, merge=True)
+
+    def delete(self):
+        batch = self.firestore.batch()
+        batch.delete(self)
+        batch.commit()
+
+
+class LocalQuery:
+    """Query Firestore yang diterjemahkan ke satu SELECT; tidak diubah setelah dibuat."""
+
+    def __init__(self, firestore, collection, filters=(), order=None, direction=ASCENDING,
+                 limit_count=None, cursor=None):
+        self.firestore = firestore
+        self.collection_name = collection
+        self._filters = tuple(filters)
+        self._order = order
+        self._direction = direction
+        self._limit = limit_count
+        self._cursor = cursor
+
+    def _copy(self, **changes):
+        values = {
+            'filters': self._filters, 'order': self._order, 'direction': self._direction,
+            'limit_count': self._limit, 'cursor': self._cursor
+        }
+        values.update(changes)
+        return LocalQuery(self.firestore, self.collection_name, **values)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if op_string not in COMPARISON_OPERATORS:
+            raise ValueError(f"Operator tidak didukung backend lokal: {op_string}")
+        _field_sql(field_path)
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        _field_sql(field_path)
+        return self._copy(order=field_path, direction=DESCENDING if direction == DESCENDING else ASCENDING)
+
+    def limit(self, count):
+        return self._copy(limit_count=int(count))
+
+    def start_after(self, document_fields):
+        """Lanjutkan setelah snapshot dokumen atau dict berisi field yang diurutkan."""
+        if self._order is None:
+            raise ValueError("start_after() membutuhkan order_by() terlebih dahulu")
+        if isinstance(document_fields, LocalDocumentSnapshot):
+            return self._copy(cursor=(document_fields.get(self._order), document_fields.id))
+        return self._copy(cursor=(document_fields[self._order], None))
+
+    def _sql(self):
+        clauses = ['collection = ?']
+        params = [self.collection_name]
+        for field, op, value in self._filters:
+            clauses.append(f"{_field_sql(field)} {'=' if op == '==' else op} ?")
+            params.append(value)
+
+        order = ''
+        if self._order is not None:
+            column = _field_sql(self._order)
+            clauses.append(f'{column} IS NOT NULL')
+            sort = 'DESC' if self._direction == DESCENDING else 'ASC'
+            if self._cursor is not None:
+                value, doc_id = self._cursor
+                op = '<' if self._direction == DESCENDING else '>'
+                if doc_id is None:
+                    clauses.append(f'{column} {op} ?')
+                    params.append(value)
+                else:
+                    clauses.append(f'({column} {op} ? OR ({column} = ? AND doc_id {op} ?))')
+                    params.extend([value, value, doc_id])
+            order = f' ORDER BY {column} {sort}, doc_id {sort}'
+
+        sql = f"SELECT doc_id, data FROM documents WHERE {' AND '.join(clauses)}{order}"
+        if self._limit is not None:
+            sql += ' LIMIT ?'
+            params.append(self._limit)
+        return sql, params
+
+    def stream(self):
+        sql, params = self._sql()
+        for doc_id, data in self.firestore.database.select(sql, params):
+            reference = LocalDocumentReference(self.firestore, self.collection_name, doc_id)
+            yield LocalDocumentSnapshot(reference, json.loads(data))
+
+    def get(self):
+        return list(self.stream())
+
+
+class LocalCollection(LocalQuery):
+    def __init__(self, firestore, name):
+        super().__init__(firestore, name)
+        self.id = name
+
+    def document(self, document_id=None):
+        return LocalDocumentReference(self.firestore, self.id, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data, document_id=None):
+        reference = self.document(document_id)
+        reference.set(document_data)
+        return time.time(), reference
+
+
+class LocalWriteBatch:
+    """Batch tulis; semua operasi di-commit dalam satu transaksi SQLite."""
+
+    def __init__(self, firestore):
+        self.firestore = firestore
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        if merge:
+            current = reference.get().to_dict() or {}
+            current.update(document_data)
+            document_data = current
+        self._writes.append((reference, dict(document_data)))
+
+    def update(self, reference, field_updates):
+        self.set(reference, field_updates, merge=True)
+
+    def delete(self, reference):
+        self._writes.append((reference, None))
+
+    def commit(self):
+        statements = []
+        for reference, data in self._writes:
+            if data is None:
+                statements.append((
+                    'DELETE FROM documents WHERE collection = ? AND doc_id = ?',
+                    (reference.collection, reference.id)
+                ))
+            else:
+                statements.append((
+                    'INSERT OR REPLACE INTO documents (collection, doc_id, timestamp, data) VALUES (?, ?, ?, ?)',
+                    (reference.collection, reference.id, _timestamp_column(data), _dumps(data))
+                ))
+        self.firestore.database.write(statements)
+        self.firestore.notify(self._writes)
+        self._writes = []
+
+
+class LocalFirestore:
+    """Pengganti client Firestore di atas LocalDatabase."""
+
+    def __init__(self, database):
+        self.database = database
+        self._listeners = []
+
+    def collection(self, name):
+        return LocalCollection(self, name)
+
+    def batch(self):
+        return LocalWriteBatch(self)
+
+    def add_listener(self, listener):
+        """Daftarkan fungsi (collection, upserted, removed) yang dipanggil setiap commit."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def notify(self, writes):
+        for listener in list(self._listeners):
+            for collection, items in itertools.groupby(writes, key=lambda item: item[0].collection):
+                items = list(items)
+                upserted = [dict(data, id=reference.id) for reference, data in items if data is not None]
+                removed = [reference.id for reference, data in items if data is None]
+                listener(collection, upserted, removed)
+
+
+class LocalReference:
+    def __init__(self, rtdb, path):
+        self.rtdb = rtdb
+        self.path = _normalize_path(path)
+
+    def get(self):
+        rows = list(self.rtdb.database.select('SELECT data FROM realtime WHERE path = ?', (self.path,)))
+        return json.loads(rows[0][0]) if rows else None
+
+    def set(self, value):
+        self.rtdb.database.write([('INSERT OR REPLACE INTO realtime (path, data) VALUES (?, ?)',
+                                   (self.path, _dumps(value)))])
+        self.rtdb.notify(self.path, value)
+
+    def update(self, value):
+        current = self.get()
+        self.set(dict(current if isinstance(current, dict) else {}, **value))
+
+
+class LocalRealtimeDatabase:
+    """Pengganti modul `firebase_admin.db` di atas LocalDatabase."""
+
+    def __init__(self, database):
+        self.database = database
+        self._listeners = []
+
+    def reference(self, path='/'):
+        return LocalReference(self, path)
+
+    def add_listener(self, listener):
+        """Daftarkan fungsi (path, value) yang dipanggil setiap set()."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def notify(self, path, value):
+        for listener in list(self._listeners):
+            listener(path, value)
+
+
+class LocalListenerSource:
+    """
+    Sumber listener untuk LiveFeed di atas backend lokal: nilai awal dikirim
+    saat start(), lalu setiap penulisan ke path RTDB atau koleksi riwayat
+    diteruskan sebagai event.
+    """
+
+    def __init__(self, firestore_client, rtdb, paths=('/DHT', '/SoilMoisture'),
+                 history_collection='watering_analysis', history_limit=20):
+        self.firestore_client = firestore_client
+        self.rtdb = rtdb
+        self.paths = paths
+        self.history_collection = history_collection
+        self.history_limit = history_limit
+        self._registered = None
+
+    def start(self, on_realtime, on_history):
+        def realtime_listener(path, value):
+            if path in self.paths:
+                on_realtime(path, value)
+
+        def history_listener(collection, upserted, removed):
+            if collection == self.history_collection:
+                on_history(upserted, removed)
+
+        def initial():
+            for path in self.paths:
+                on_realtime(path, self.rtdb.reference(path).get())
+            docs = (self.firestore_client.collection(self.history_collection)
+                    .order_by('timestamp', direction=DESCENDING).limit(self.history_limit).stream())
+            on_history([dict(doc.to_dict(), id=doc.id) for doc in docs], [])
+
+        self.rtdb.add_listener(realtime_listener)
+        self.firestore_client.add_listener(history_listener)
+        self._registered = (realtime_listener, history_listener)
+        # Seperti listener Firebase, event pertama dikirim dari thread lain
+        threading.Thread(target=initial, name='local-listener', daemon=True).start()
+
+    def stop(self):
+        if self._registered is not None:
+            realtime_listener, history_listener = self._registered
+            self.rtdb.remove_listener(realtime_listener)
+            self.firestore_client.remove_listener(history_listener)
+            self._registered = None
+
+
+def synthetic_readings(rows, end=None, interval=60.0, seed=0):
+    """
+    Pembacaan sensor sintetis (timestamp, suhu, kelembapan udara, kelembapan
+    tanah) setiap `interval` detik sampai `end`: siklus harian suhu/kelembapan
+    dan kelembapan tanah yang turun perlahan lalu naik saat disiram.
+    """
+    rng = np.random.default_rng(seed)
+    end = time.time() if end is None else end
+    timestamps = end - interval * np.arange(rows - 1, -1, -1, dtype=np.float64)
+    hours = (timestamps % 86400) / 3600
+    daily = np.sin((hours - 9) / 24 * 2 * np.pi)
+    temperature = np.round(28 + 5 * daily + rng.normal(0, 0.8, rows), 1)
+    humidity = np.round(np.clip(75 - 12 * daily + rng.normal(0, 2.5, rows), 20, 100), 1)
+    # Tanah mengering ~1 % per jam dan disiram kembali setiap ~40 jam
+    cycle = (timestamps / 3600) % 40
+    soil_moisture = np.round(np.clip(85 - cycle + rng.normal(0, 1.0, rows), 0, 100), 1)
+    return timestamps, temperature, humidity, soil_moisture
+
+
+def seed_sensor_history(database, rows, collection='sensor_history', end=None, interval=60.0,
+                        seed=0, realtime=True, progress=None):
+    """
+    Isi koleksi dengan `rows` pembacaan sintetis berformat sama dengan data
+    perangkat (timestamp, DateTime, temperature, humidity, soil_moisture),
+    per transaksi `SEED_BATCH_ROWS` dokumen. Dengan `realtime`, /DHT dan
+    /SoilMoisture diisi dengan pembacaan terakhir. Return jumlah dokumen.
+    """
+    timestamps, temperature, humidity, soil_moisture = synthetic_readings(rows, end, interval, seed)
+    written = 0
+    for start in range(0, rows, SEED_BATCH_ROWS):
+        stop = min(start + SEED_BATCH_ROWS, rows)
+        batch = []
+        for index, ts, temp, hum, soil in zip(
+            range(start, stop), timestamps[start:stop].tolist(), temperature[start:stop].tolist(),
+            humidity[start:stop].tolist(), soil_moisture[start:stop].tolist()
+        ):
+            batch.append((collection, f'seed-{index:09d}', ts, _dumps({
+                'timestamp': ts,
+                'DateTime': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts)),
+                'temperature': temp,
+                'humidity': hum,
+                'soil_moisture': soil
+            })))
+        database.write_many(
+            'INSERT OR REPLACE INTO documents (collection, doc_id, timestamp, data) VALUES (?, ?, ?, ?)', batch
+        )
+        written += len(batch)
+        if progress is not None:
+            progress(written)
+
+    if realtime and rows:
+        latest_update = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamps[-1]))
+        database.rtdb.reference('/DHT').set({
+            'temperature': float(temperature[-1]), 'humidity': float(humidity[-1]), 'latestUpdate': latest_update
+        })
+        database.rtdb.reference('/SoilMoisture').set({
+            'percentage': float(soil_moisture[-1]), 'latestUpdate': latest_update
+        })
+    logger.info("Backend lokal: %d pembacaan sintetis ditulis ke %s", written, collection)
+    return written
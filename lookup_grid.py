@@ -0,0 +1,228 @@
+"""
+Mode inferensi tabel lookup: probabilitas Random Forest dihitung di muka
+untuk setiap kombinasi nilai sensor pada resolusi aslinya.
+
+Hutan hanya membandingkan setiap fitur dengan sejumlah kecil ambang batas,
+sehingga sumbu setiap fitur terbagi menjadi beberapa sel yang hasilnya
+sama. Untuk setiap sumbu disimpan tabel indeks (nilai sensor ke-k pada
+resolusi asli -> nomor sel) dan satu tabel probabilitas padat per kombinasi
+sel. Prediksi cukup menghitung k dari nilai sensor dan mengindeks kedua
+tabel, tanpa menelusuri pohon. Hasilnya identik dengan hutan untuk setiap
+nilai tepat pada resolusi sensor; nilai lain (di luar rentang atau lebih
+presisi dari resolusi) dijawab oleh hutan asli.
+
+Tabel disimpan sebagai artefak mmap (format yang sama dengan CompiledForest)
+sehingga dibagi bersama semua worker.
+"""
+import threading
+
+import numpy as np
+
+from compaction import SENSOR_RESOLUTION, _grid_values, _sensor_keys
+from forest_engine import read_artifact, write_artifact
+
+GRID_MAGIC = b'CGRID001'
+
+# Rentang fisik pembacaan sensor yang dicakup tabel (DHT22: -40..80 °C)
+GRID_DOMAIN = {
+    'hour': (0.0, 23.0),
+    'temperature': (-40.0, 80.0),
+    'humidity': (0.0, 100.0),
+    'soil_moisture': (0.0, 100.0),
+}
+
+# Batas jumlah baris yang dicari satu per satu tanpa vektorisasi
+SCALAR_LOOKUP_MAX = 4
+
+
+def _axis_points(key, resolution, domain):
+    low, high = domain[key]
+    step = resolution[key]
+    count = int(round((high - low) / step)) + 1
+    return low, step, _grid_values(np.arange(count) + int(round(low / step)), step).astype(np.float32)
+
+
+class LookupGrid:
+    """
+    Prediktor berbasis tabel dengan antarmuka sama seperti CompiledForest
+    (`build_features`, `predict_proba`, `predict_with_proba`, `predict`).
+    """
+
+    def __init__(self, forest, starts, steps, points, cells, table, metadata=None):
+        self.forest = forest
+        self.starts = [float(start) for start in starts]
+        self.steps = [float(step) for step in steps]
+        self.points = points
+        self.cells = cells
+        self.table = table
+        self.metadata = dict(metadata or {})
+        self.classes = forest.classes
+        self.n_features = forest.n_features
+        self.feature_names = forest.feature_names
+
+        shape = table.shape[:-1]
+        self._strides = [int(np.prod(shape[axis + 1:])) for axis in range(len(shape))]
+        self._flat_table = table.reshape(-1, table.shape[-1])
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def build(cls, forest, resolution=None, domain=None, metadata=None):
+        """Hitung tabel dari hutan: satu prediksi per kombinasi sel yang dapat dicapai."""
+        resolution = dict(SENSOR_RESOLUTION, **(resolution or {}))
+        domain = dict(GRID_DOMAIN, **(domain or {}))
+        starts, steps, points, cells, representatives = [], [], [], [], []
+        finite = np.isfinite(forest.threshold)
+        for axis, key in enumerate(_sensor_keys(forest)):
+            low, step, axis_points = _axis_points(key, resolution, domain)
+            thresholds = np.unique(forest.threshold[finite & (forest.feature == axis)])
+            # Nomor sel = jumlah ambang batas yang lebih kecil dari nilai (x > t ke kanan)
+            raw_cells = np.searchsorted(thresholds, axis_points.astype(np.float64), side='left')
+            _, first, axis_cells = np.unique(raw_cells, return_index=True, return_inverse=True)
+            starts.append(low)
+            steps.append(step)
+            points.append(axis_points)
+            cells.append(axis_cells.astype(np.int32))
+            representatives.append(axis_points[first])
+
+        mesh = np.meshgrid(*representatives, indexing='ij')
+        X = np.stack([axis.ravel() for axis in mesh], axis=1)
+        table = forest.predict_proba(X).reshape(tuple(len(r) for r in representatives) + (len(forest.classes),))
+        return cls(forest, starts, steps, points, cells, table, metadata)
+
+    def save(self, path, metadata=None):
+        arrays = {}
+        for axis in range(len(self.points)):
+            arrays[f'points_{axis}'] = (self.points[axis], '<f4')
+            arrays[f'cells_{axis}'] = (self.cells[axis], '<i4')
+        arrays['table'] = (self.table, '<f8')
+        write_artifact(path, GRID_MAGIC, {
+            'version': 1,
+            'starts': self.starts,
+            'steps': self.steps,
+            'metadata': dict(self.metadata, **(metadata or {})),
+        }, arrays)
+
+    @classmethod
+    def load(cls, path, forest, use_mmap=True):
+        header, arrays = read_artifact(path, GRID_MAGIC, use_mmap)
+        n_axes = len(header['starts'])
+        if n_axes != forest.n_features:
+            raise ValueError(f"Tabel lookup punya {n_axes} sumbu, model membutuhkan {forest.n_features}")
+        return cls(
+            forest, header['starts'], header['steps'],
+            [arrays[f'points_{axis}'] for axis in range(n_axes)],
+            [arrays[f'cells_{axis}'] for axis in range(n_axes)],
+            arrays['table'], header.get('metadata')
+        )
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes + sum(p.nbytes + c.nbytes for p, c in zip(self.points, self.cells))
+
+    def build_features(self, temperature, humidity, soil_moisture, hour=None):
+        return self.forest.build_features(temperature, humidity, soil_moisture, hour=hour)
+
+    def _lookup_scalar(self, row):
+        flat = 0
+        for axis, value in enumerate(row):
+            value = np.float32(value)
+            k = int(round((float(value) - self.starts[axis]) / self.steps[axis]))
+            points = self.points[axis]
+            if k < 0 or k >= len(points) or points[k] != value:
+                return None
+            flat += int(self.cells[axis][k]) * self._strides[axis]
+        return self._flat_table[flat]
+
+    def predict_proba(self, X):
+        """Probabilitas dari tabel; baris di luar grid dihitung oleh hutan asli."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X memiliki {X.shape[1]} fitur, model membutuhkan {self.n_features}")
+
+        if len(X) <= SCALAR_LOOKUP_MAX:
+            rows = [self._lookup_scalar(row) for row in X.tolist()]
+            missing = [i for i, row in enumerate(rows) if row is None]
+            if not missing:
+                self._count(len(X), 0)
+                return np.array(rows)
+            proba = np.empty((len(X), len(self.classes)))
+            fallback = self.forest.predict_proba(X[missing])
+            for i, row in enumerate(rows):
+                proba[i] = fallback[missing.index(i)] if row is None else row
+            self._count(len(X) - len(missing), len(missing))
+            return proba
+
+        X32 = X.astype(np.float32)
+        flat = np.zeros(len(X), dtype=np.int64)
+        hit = np.ones(len(X), dtype=bool)
+        for axis in range(self.n_features):
+            points = self.points[axis]
+            k = np.rint((X32[:, axis] - self.starts[axis]) / self.steps[axis]).astype(np.int64)
+            np.clip(k, 0, len(points) - 1, out=k)
+            # Hanya nilai yang persis sama (dalam float32) dengan titik grid yang dijawab dari tabel
+            hit &= points.take(k) == X32[:, axis]
+            flat += self.cells[axis].take(k).astype(np.int64) * self._strides[axis]
+
+        proba = self._flat_table.take(flat, axis=0)
+        n_fallback = int(len(X) - hit.sum())
+        if n_fallback:
+            proba[~hit] = self.forest.predict_proba(X[~hit])
+        self._count(len(X) - n_fallback, n_fallback)
+        return proba
+
+    def _count(self, lookups, fallbacks):
+        with self._lock:
+            self.lookups += lookups
+            self.fallbacks += fallbacks
+
+    def predict_with_proba(self, X):
+        proba = self.predict_proba(X)
+        return self.classes.take(np.argmax(proba, axis=1)), proba
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': 'grid',
+                'table_shape': list(self.table.shape[:-1]),
+                'bytes': self.nbytes,
+                'lookups': self.lookups,
+                'fallbacks': self.fallbacks
+            }
+
+
+def memory_report(forest, resolutions, domain=None):
+    """
+    Perkiraan memori per resolusi: tabel padat naif (setiap titik grid
+    menyimpan probabilitas float64) vs tabel indeks sumbu + tabel sel.
+    """
+    domain = dict(GRID_DOMAIN, **(domain or {}))
+    finite = np.isfinite(forest.threshold)
+    report = []
+    for value in resolutions:
+        resolution = {key: max(value, SENSOR_RESOLUTION[key]) if key == 'hour' else value
+                      for key in SENSOR_RESOLUTION}
+        dense_points = 1
+        axis_bytes = 0
+        cell_counts = []
+        for axis, key in enumerate(_sensor_keys(forest)):
+            _, _, axis_points = _axis_points(key, resolution, domain)
+            thresholds = np.unique(forest.threshold[finite & (forest.feature == axis)])
+            cell_counts.append(len(np.unique(np.searchsorted(thresholds, axis_points.astype(np.float64)))))
+            dense_points *= len(axis_points)
+            axis_bytes += axis_points.nbytes + len(axis_points) * 4
+        item_bytes = 8 * len(forest.classes)
+        report.append({
+            'resolution': value,
+            'grid_points': dense_points,
+            'dense_bytes': dense_points * item_bytes,
+            'cells': int(np.prod(cell_counts)),
+            'compressed_bytes': int(np.prod(cell_counts)) * item_bytes + axis_bytes
+        })
+    return report
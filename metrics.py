@@ -0,0 +1,170 @@
+"""
+Metrik format teks Prometheus tanpa dependensi dan span waktu per fase request.
+
+`Histogram` menyimpan jumlah observasi per bucket untuk setiap kombinasi
+label; `MetricsRegistry.render()` menghasilkan format teks Prometheus
+(`text/plain; version=0.0.4`). Nilai yang sudah dihitung di tempat lain
+(statistik cache, antrian tulis) dibaca saat scrape lewat collector.
+Seperti /api/cache-stats, metrik dihitung per proses worker.
+
+`PhaseTimer.span(phase)` mengukur satu fase hot path: durasinya dicatat ke
+histogram fase dan, jika request sedang mengumpulkan timing (`collect()`),
+ke daftar timing request tersebut untuk header `Server-Timing`. Daftar timing
+dibawa lewat ContextVar sehingga ikut ke thread ParallelReader.
+"""
+import bisect
+import contextlib
+import contextvars
+import math
+import threading
+import time
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Batas atas bucket (detik): 0,5 ms sampai 30 s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value is None:
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histogram kumulatif Prometheus dengan label tetap, aman dipakai banyak thread."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        # Bucket pertama dengan batas atas >= nilai (le = less or equal)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self):
+        """Salinan {label tuple: (jumlah per bucket, total nilai)}."""
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for key, (counts, total) in sorted(self.snapshot().items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Kumpulan histogram dan collector. Collector adalah fungsi tanpa argumen
+    yang mengembalikan list (nama, tipe, deskripsi, [(dict label, nilai)]).
+    """
+
+    def __init__(self):
+        self._histograms = []
+        self._collectors = []
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for collector in self._collectors:
+            for name, metric_type, documentation, samples in collector():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class PhaseTimer:
+    """Span waktu fase hot path yang dicatat ke histogram berlabel `phase`."""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def observe(self, phase, seconds):
+        self.histogram.observe(seconds, phase=phase)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((phase, seconds))
+
+    @contextlib.contextmanager
+    def span(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    @staticmethod
+    def collect():
+        """Mulai kumpulkan timing untuk request saat ini. Return list (fase, detik)."""
+        timings = []
+        _request_timings.set(timings)
+        return timings
+
+    @staticmethod
+    def stop():
+        """Berhenti mengumpulkan timing (thread dipakai ulang untuk request berikutnya)."""
+        _request_timings.set(None)
+
+
+def server_timing_header(timings, total=None):
+    """
+    Nilai header Server-Timing: durasi fase yang sama dijumlahkan, urut
+    kemunculan pertama, ditambah `total` (detik) jika diberikan.
+    """
+    durations = {}
+    for phase, seconds in timings:
+        durations[phase] = durations.get(phase, 0.0) + seconds
+    if total is not None:
+        durations['total'] = total
+    return ', '.join(f'{phase};dur={seconds * 1000:.2f}' for phase, seconds in durations.items())
@@ -0,0 +1,323 @@
+"""
+Registry model berversi dengan hot-reload tanpa restart.
+
+Direktori registry berisi artefak `CompiledForest` (`<versi>.forest`) dan
+`manifest.json` yang mencatat semua versi beserta SHA-256 artefaknya, dan
+versi mana yang aktif (`current`). Thread watcher memantau manifest; versi
+baru dimuat dan divalidasi di latar belakang, halaman artefaknya dipanaskan,
+lalu ditukar dengan satu assignment referensi. Pembaca (`active()`) tidak
+pernah mengambil lock, dan request yang sedang berjalan tetap memakai versi
+yang sudah dipegangnya sampai selesai.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from datetime import datetime
+
+import numpy as np
+
+from forest_engine import ARTIFACT_ARRAYS, CompiledForest
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+# Baris uji untuk validasi versi baru, per besaran sensor
+PROBE_READINGS = {
+    'hour': np.array([0, 6, 12, 15, 21]),
+    'temperature': np.array([15.0, 22.0, 28.0, 34.0, 40.0]),
+    'humidity': np.array([30.0, 60.0, 77.0, 85.0, 100.0]),
+    'soil_moisture': np.array([0.0, 40.0, 65.0, 80.0, 100.0]),
+}
+
+
+class ModelVersion:
+    """
+    Model yang sedang dilayani beserta versinya (tidak diubah setelah dibuat).
+    `predictor` adalah objek yang dipakai untuk prediksi: hutan itu sendiri
+    atau turunannya (mis. tabel lookup) hasil hook `prepare` registry.
+    """
+
+    __slots__ = ('version', 'forest', 'predictor', 'sha256', 'loaded_at')
+
+    def __init__(self, version, forest, sha256=None, loaded_at=None, predictor=None):
+        self.version = version
+        self.forest = forest
+        self.predictor = predictor if predictor is not None else forest
+        self.sha256 = sha256
+        self.loaded_at = loaded_at if loaded_at is not None else time.time()
+
+
+class ModelValidationError(ValueError):
+    """Artefak versi baru tidak lolos validasi dan tidak diaktifkan."""
+
+
+def file_sha256(path):
+    """Hitung SHA-256 isi file, atau None jika file tidak ada."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def validate_forest(forest, reference=None):
+    """
+    Pastikan model dapat dipakai: probabilitas baris uji valid, dan bentuk
+    fitur serta kelasnya sama dengan model yang sedang dilayani.
+    """
+    if reference is not None:
+        if forest.feature_names != reference.feature_names:
+            raise ModelValidationError(
+                f"Fitur berbeda dari model aktif: {forest.feature_names} != {reference.feature_names}"
+            )
+        if forest.classes.tolist() != reference.classes.tolist():
+            raise ModelValidationError(
+                f"Kelas berbeda dari model aktif: {forest.classes.tolist()} != {reference.classes.tolist()}"
+            )
+    probe = forest.build_features(
+        PROBE_READINGS['temperature'], PROBE_READINGS['humidity'],
+        PROBE_READINGS['soil_moisture'], hour=PROBE_READINGS['hour']
+    )
+    proba = forest.predict_proba(probe)
+    if not np.all(np.isfinite(proba)) or not np.allclose(proba.sum(axis=1), 1.0):
+        raise ModelValidationError("Probabilitas baris uji tidak valid")
+
+
+def _touch_pages(forest):
+    # Baca seluruh array sekali agar halaman mmap sudah ada di memori sebelum
+    # versi ini mulai melayani request (tidak ada page fault di jalur request)
+    for name in ARTIFACT_ARRAYS:
+        np.add.reduce(getattr(forest, name), axis=None)
+
+
+class ModelRegistry:
+    """Direktori artefak berversi dengan manifest dan pertukaran model atomik."""
+
+    _instances = weakref.WeakSet()
+
+    def __init__(self, root, poll_interval=30.0, prepare=None):
+        self.root = root
+        self.poll_interval = float(poll_interval)
+        # prepare(version, forest) -> predictor, dijalankan sebelum versi ditukar
+        self.prepare = prepare
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+
+        self._active = None
+        self._reload_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._manifest_mtime = None
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        ModelRegistry._instances.add(self)
+
+    def active(self):
+        """Model yang sedang dilayani (ModelVersion), atau None. Tanpa lock."""
+        return self._active
+
+    def read_manifest(self):
+        """Isi manifest, atau None jika registry belum punya versi."""
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def versions(self):
+        manifest = self.read_manifest() or {}
+        return manifest.get('versions', [])
+
+    def publish(self, forest, version=None, metadata=None, activate=True):
+        """
+        Tulis artefak versi baru ke registry dan catat di manifest (opsional
+        sekaligus menjadikannya versi aktif). Return nama versi.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        version = version or datetime.now().strftime('%Y%m%d-%H%M%S')
+        artifact = f'{version}.forest'
+        path = os.path.join(self.root, artifact)
+        if os.path.exists(path):
+            raise ValueError(f"Versi model sudah ada: {version}")
+
+        forest.save(path, metadata=dict(metadata or {}, model_version=version))
+        entry = {
+            'version': version,
+            'artifact': artifact,
+            'sha256': file_sha256(path),
+            'created_at': datetime.now().isoformat(),
+            'trees': forest.n_trees,
+            'nodes': forest.n_nodes,
+            'metadata': dict(metadata or {})
+        }
+        with self._reload_lock:
+            manifest = self.read_manifest() or {'current': None, 'versions': []}
+            manifest['versions'].append(entry)
+            if activate:
+                manifest['current'] = version
+            self._write_manifest(manifest)
+        logger.info("Model versi %s dipublikasikan ke %s", version, self.root)
+        return version
+
+    def activate(self, version):
+        """Jadikan versi yang sudah terdaftar sebagai versi aktif (termasuk rollback)."""
+        with self._reload_lock:
+            manifest = self.read_manifest()
+            if manifest is None or not any(entry['version'] == version for entry in manifest['versions']):
+                raise KeyError(f"Versi model tidak ditemukan: {version}")
+            manifest['current'] = version
+            self._write_manifest(manifest)
+
+    def _write_manifest(self, manifest):
+        tmp_path = f"{self.manifest_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def set_active(self, version, forest, sha256=None):
+        """Pasang model yang dimuat di luar registry (mis. model_rf lama) sebagai versi aktif."""
+        _touch_pages(forest)
+        self._active = ModelVersion(version, forest, sha256, predictor=self._prepare(version, forest))
+        return self._active
+
+    def _prepare(self, version, forest):
+        return self.prepare(version, forest) if self.prepare is not None else None
+
+    def load_current(self):
+        """
+        Muat versi `current` dari manifest jika berbeda dari versi aktif.
+        Return ModelVersion yang aktif setelahnya; error validasi dilempar.
+        """
+        manifest = self.read_manifest()
+        if manifest is None or not manifest.get('current'):
+            return self._active
+        entry = next((e for e in manifest['versions'] if e['version'] == manifest['current']), None)
+        if entry is None:
+            raise ModelValidationError(f"Versi aktif {manifest['current']} tidak ada di manifest")
+
+        active = self._active
+        if active is not None and active.version == entry['version'] and active.sha256 == entry['sha256']:
+            return active
+
+        path = os.path.join(self.root, entry['artifact'])
+        sha256 = file_sha256(path)
+        if sha256 != entry['sha256']:
+            raise ModelValidationError(f"SHA-256 artefak {entry['artifact']} tidak sesuai manifest")
+        forest = CompiledForest.load(path)
+        validate_forest(forest, reference=active.forest if active is not None else None)
+        _touch_pages(forest)
+
+        # Satu assignment: pembaca melihat versi lama atau baru, tidak pernah campuran
+        predictor = self._prepare(entry['version'], forest)
+        self._active = ModelVersion(entry['version'], forest, sha256, predictor=predictor)
+        previous = active.version if active is not None else None
+        logger.info("Model versi %s aktif (sebelumnya %s)", entry['version'], previous)
+        return self._active
+
+    def load_initial(self):
+        """
+        Muat versi `current` saat startup. Return ModelVersion, atau None jika
+        registry belum punya versi atau versi current gagal dimuat; kegagalan
+        dicatat di last_error dan watcher mencoba lagi setelah manifest berubah.
+        """
+        with self._reload_lock:
+            try:
+                self._manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+            except FileNotFoundError:
+                pass
+            try:
+                return self.load_current()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.error("Versi model di manifest gagal dimuat saat startup: %s", e)
+                return None
+
+    def check(self):
+        """Muat ulang jika manifest berubah sejak pemeriksaan terakhir. Return True jika versi berganti."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._manifest_mtime:
+            return False
+        # Hanya satu pemuat ulang pada satu waktu; pembaca tidak pernah menunggu lock ini
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            before = self._active
+            self._manifest_mtime = mtime
+            try:
+                after = self.load_current()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.error("Hot-reload model gagal, tetap memakai versi lama: %s", e)
+                return False
+            if after is before:
+                return False
+            self.reloads += 1
+            self.last_error = None
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def start_watching(self):
+        """Jalankan thread watcher manifest (sekali per proses)."""
+        if self.poll_interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stopping.clear()
+        thread = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+        thread.start()
+        # Baru dipasang setelah start(): stop() dari thread lain (atexit) tidak
+        # pernah melihat thread yang belum berjalan
+        self._thread = thread
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _watch(self):
+        while not self._stopping.wait(self.poll_interval):
+            self.check()
+
+    def stats(self):
+        active = self._active
+        manifest = self.read_manifest() or {}
+        return {
+            'root': self.root,
+            'active_version': active.version if active is not None else None,
+            'loaded_at': active.loaded_at if active is not None else None,
+            'current_in_manifest': manifest.get('current'),
+            'versions': [entry['version'] for entry in manifest.get('versions', [])],
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'watching': self._thread is not None and self._thread.is_alive()
+        }
+
+    @classmethod
+    def _reset_after_fork(cls):
+        # Thread watcher tidak ikut ter-fork; jalankan ulang di child
+        for registry in list(cls._instances):
+            registry._reload_lock = threading.Lock()
+            if registry._thread is not None:
+                registry._thread = None
+                registry.start_watching()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=ModelRegistry._reset_after_fork)
@@ -0,0 +1,54 @@
+"""
+Token cursor untuk pagination endpoint daftar (/api/sensor-data,
+/api/watering-history).
+
+Cursor menyimpan posisi record terakhir halaman sebelumnya, yaitu pasangan
+(timestamp, doc_id), ditambah `scope`: parameter query yang menentukan urutan
+halaman (nama endpoint, sumber data, rentang waktu). Isinya JSON ringkas yang
+di-encode base64 URL-safe; bagi client token ini buram dan cukup dikirim
+kembali apa adanya. Cursor dari query lain ditolak dengan InvalidCursor.
+Token tidak ditandatangani karena hanya berisi posisi baca, bukan hak akses.
+"""
+import base64
+import binascii
+import json
+import math
+
+CURSOR_VERSION = 1
+
+
+class InvalidCursor(ValueError):
+    """Token cursor rusak atau dibuat untuk query lain."""
+
+
+def encode_cursor(scope, timestamp, doc_id):
+    """
+    Buat token cursor untuk posisi (timestamp angka, doc_id) dalam query
+    `scope` (list JSON). (None, None) menunjuk ke awal data.
+    """
+    payload = {'v': CURSOR_VERSION, 'q': list(scope), 't': timestamp, 'i': doc_id}
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token, scope):
+    """Return posisi (timestamp, doc_id) dari token; InvalidCursor jika rusak atau beda scope."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, binascii.Error) as e:
+        raise InvalidCursor("Cursor tidak valid") from e
+
+    if (not isinstance(payload, dict) or payload.get('v') != CURSOR_VERSION
+            or payload.get('q') != list(scope)):
+        raise InvalidCursor("Cursor tidak valid untuk query ini")
+    timestamp, doc_id = payload.get('t'), payload.get('i')
+    if doc_id is None:
+        # Cursor ke awal data (tanpa posisi); timestamp tidak dipakai
+        return None, None
+    # ID dokumen Firestore tidak boleh kosong atau memuat '/' (path ke koleksi lain)
+    if not isinstance(doc_id, str) or not doc_id or '/' in doc_id:
+        raise InvalidCursor("Cursor tidak valid")
+    if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)) or not math.isfinite(timestamp):
+        raise InvalidCursor("Cursor tidak valid")
+    return timestamp, doc_id
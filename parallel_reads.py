@@ -0,0 +1,62 @@
+"""
+Eksekusi bersamaan untuk pembacaan backend yang saling independen.
+
+Firebase Admin SDK bersifat blocking, sehingga pembacaan Firestore dan
+Realtime Database yang tidak saling bergantung dijalankan bersamaan di satu
+thread pool bersama. Latensi handler menjadi latensi pembacaan terlama,
+bukan jumlah semuanya, dan thread worker gunicorn (gthread) lebih cepat
+bebas untuk klien berikutnya.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ParallelReader:
+    """
+    Thread pool bersama untuk `gather()`. Dengan `max_workers=0` semua
+    pemanggilan dijalankan berurutan di thread pemanggil.
+    """
+
+    def __init__(self, max_workers=16):
+        self.max_workers = int(max_workers)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='parallel-read')
+            return self._executor
+
+    def gather(self, *calls):
+        """
+        Jalankan semua callable (tanpa argumen) bersamaan dan kembalikan
+        hasilnya sesuai urutan. Callable pertama berjalan di thread pemanggil.
+        Callable yang belum sempat diambil pool saat ditunggu dijalankan
+        langsung oleh pemanggil, sehingga gather() bersarang tidak bisa
+        deadlock walaupun pool penuh. Exception pertama diteruskan.
+        Callable di pool berjalan dengan salinan context pemanggil
+        (contextvars), sehingga timing per request tetap tercatat.
+        """
+        if self.max_workers <= 0 or len(calls) < 2:
+            return [call() for call in calls]
+
+        pool = self._pool()
+        futures = [pool.submit(contextvars.copy_context().run, call) for call in calls[1:]]
+        try:
+            results = [calls[0]()]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        for call, future in zip(calls[1:], futures):
+            results.append(call() if future.cancel() else future.result())
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,162 @@
+"""
+Rollup per jam dan per hari atas data sensor di store lokal.
+
+Setiap kali store menerima record baru, bucket yang tersentuh dihitung ulang
+dari tabel `readings` (idempoten, aman untuk dokumen yang tersinkron ulang).
+Setiap baris rollup berisi count, min/mean/max tiap sensor, serta porsi
+pembacaan yang menurut ambang batas (watering_rules) berarti "siram".
+Bucket disejajarkan ke epoch Unix (UTC), sama seperti bucket_aggregate.
+"""
+import logging
+
+import numpy as np
+
+import watering_rules
+from downsampling import bucket_aggregate
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {'hour': 3600, 'day': 86400}
+
+SENSOR_COLUMNS = ('temperature', 'humidity', 'soil_moisture')
+
+VALUE_COLUMNS = ['count'] + [
+    f'{name}{suffix}' for name in SENSOR_COLUMNS for suffix in ('', '_min', '_max')
+] + ['water_share']
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS rollups (
+    granularity TEXT NOT NULL,
+    bucket_start REAL NOT NULL,
+    {', '.join(f'{column} REAL NOT NULL' for column in VALUE_COLUMNS)},
+    PRIMARY KEY (granularity, bucket_start)
+);
+"""
+
+BACKFILL_CURSOR_KEY = 'rollup_backfill_cursor'
+
+
+class RollupStore:
+    """Rollup yang disimpan di database SQLite yang sama dengan SensorStore."""
+
+    def __init__(self, sensor_store):
+        self.sensor_store = sensor_store
+        conn = sensor_store.connection()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        sensor_store.add_listener(self.on_records)
+
+    def on_records(self, records):
+        """Listener SensorStore: hitung ulang bucket yang disentuh record baru."""
+        if records:
+            timestamps = [record['timestamp'] for record in records]
+            self.refresh(min(timestamps), max(timestamps))
+
+    def refresh(self, start, end):
+        """Hitung ulang semua bucket (jam dan hari) yang mencakup rentang [start, end]."""
+        day = GRANULARITIES['day']
+        # Rentang diperluas ke batas hari agar bucket harian selalu dihitung utuh
+        range_start = np.floor(start / day) * day
+        range_end = (np.floor(end / day) + 1) * day
+
+        conn = self.sensor_store.connection()
+        rows = conn.execute(
+            'SELECT ts, temperature, humidity, soil_moisture FROM readings WHERE ts >= ? AND ts < ? ORDER BY ts',
+            (range_start, range_end)
+        ).fetchall()
+        data = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        timestamps = data[:, 0]
+        columns = dict(zip(SENSOR_COLUMNS, data[:, 1:].T))
+        decisions, _ = watering_rules.evaluate(*(columns[name] for name in SENSOR_COLUMNS))
+
+        with conn:
+            for granularity, seconds in GRANULARITIES.items():
+                aggregate = bucket_aggregate(timestamps, columns, seconds)
+                if len(timestamps):
+                    bucket_ids = np.floor(timestamps / seconds)
+                    starts = np.flatnonzero(np.r_[True, bucket_ids[1:] != bucket_ids[:-1]])
+                    aggregate['water_share'] = np.add.reduceat(decisions.astype(np.float64), starts) / aggregate['count']
+                else:
+                    aggregate['water_share'] = np.empty(0)
+
+                conn.execute(
+                    'DELETE FROM rollups WHERE granularity = ? AND bucket_start >= ? AND bucket_start < ?',
+                    (granularity, range_start, range_end)
+                )
+                conn.executemany(
+                    f'INSERT INTO rollups (granularity, bucket_start, {", ".join(VALUE_COLUMNS)}) '
+                    f'VALUES (?, ?, {", ".join("?" for _ in VALUE_COLUMNS)})',
+                    [
+                        (granularity,) + values
+                        for values in zip(*(aggregate[key].tolist() for key in ['timestamp'] + VALUE_COLUMNS))
+                    ]
+                )
+
+    def backfill(self, chunk_days=7, restart=False, progress=None):
+        """
+        Bangun ulang rollup dari seluruh tabel readings, per potongan
+        `chunk_days` hari. Posisi terakhir disimpan di tabel meta sehingga job
+        yang terhenti dapat dilanjutkan. Return jumlah potongan yang diproses.
+        """
+        conn = self.sensor_store.connection()
+        first_ts, last_ts = conn.execute('SELECT MIN(ts), MAX(ts) FROM readings').fetchone()
+        if first_ts is None:
+            return 0
+
+        day = GRANULARITIES['day']
+        cursor = None if restart else self.sensor_store.get_meta(BACKFILL_CURSOR_KEY)
+        position = float(cursor) if cursor is not None else np.floor(first_ts / day) * day
+
+        chunks = 0
+        while position <= last_ts:
+            chunk_end = position + chunk_days * day
+            # refresh() mencakup hari dari `end`, jadi berhenti tepat sebelum chunk_end
+            self.refresh(position, chunk_end - 1)
+            with conn:
+                self.sensor_store.set_meta(conn, BACKFILL_CURSOR_KEY, chunk_end)
+            position = chunk_end
+            chunks += 1
+            if progress is not None:
+                progress(position, last_ts)
+
+        with conn:
+            conn.execute('DELETE FROM meta WHERE key = ?', (BACKFILL_CURSOR_KEY,))
+        logger.info("Backfill rollup selesai: %d potongan @ %s hari", chunks, chunk_days)
+        return chunks
+
+    def query(self, granularity, start=None, end=None):
+        """Ambil rollup sebagai kolom NumPy urut naik (kunci sama seperti bucket_aggregate)."""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Granularitas tidak dikenal: {granularity}")
+
+        sql = f'SELECT bucket_start, {", ".join(VALUE_COLUMNS)} FROM rollups WHERE granularity = ?'
+        params = [granularity]
+        if start and end:
+            # Sertakan bucket yang beririsan dengan rentang
+            sql += ' AND bucket_start > ? AND bucket_start <= ?'
+            params.extend([start - GRANULARITIES[granularity], end])
+        sql += ' ORDER BY bucket_start'
+
+        rows = np.array(self.sensor_store.connection().execute(sql, params).fetchall(), dtype=np.float64)
+        rows = rows.reshape(-1, len(VALUE_COLUMNS) + 1)
+        result = {'timestamp': rows[:, 0]}
+        for i, column in enumerate(VALUE_COLUMNS, start=1):
+            result[column] = rows[:, i]
+        result['count'] = result['count'].astype(np.int64)
+        return result
+
+    def stats(self):
+        conn = self.sensor_store.connection()
+        counts = dict(conn.execute('SELECT granularity, COUNT(*) FROM rollups GROUP BY granularity').fetchall())
+        return {
+            'rows': {granularity: counts.get(granularity, 0) for granularity in GRANULARITIES},
+            'backfill_cursor': self.sensor_store.get_meta(BACKFILL_CURSOR_KEY)
+        }
+
+
+def granularity_for_bucket(bucket_seconds):
+    """Nama granularitas rollup untuk ukuran bucket tertentu, atau None."""
+    for granularity, seconds in GRANULARITIES.items():
+        if bucket_seconds == seconds:
+            return granularity
+    return None
@@ -0,0 +1,67 @@
+"""
+Ekspor data sensor secara streaming dalam format NDJSON atau CSV.
+
+Record dibaca dari iterator (generator Firestore `stream()` atau cursor
+SQLite store lokal) dan dikirim per potongan `buffer_rows` baris, sehingga
+memori tetap konstan berapa pun panjang rentang waktunya dan byte pertama
+langsung terkirim.
+"""
+import csv
+import io
+import json
+
+EXPORT_FIELDS = ('timestamp', 'humidity', 'temperature', 'soil_moisture', 'source')
+
+# Format ekspor -> mimetype
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def iter_chunks(iterable, size):
+    """Kelompokkan item dari iterator menjadi list berukuran maksimal `size`."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ndjson_stream(records, buffer_rows=500):
+    """Satu objek JSON per baris; setiap potongan dikirim sebagai satu string."""
+    for chunk in iter_chunks(records, buffer_rows):
+        yield ''.join(
+            json.dumps({field: record[field] for field in EXPORT_FIELDS}, separators=(',', ':')) + '\n'
+            for record in chunk
+        )
+
+
+def csv_stream(records, buffer_rows=500):
+    """CSV dengan baris header; header dikirim sebelum record pertama dibaca."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(EXPORT_FIELDS)
+    yield flush()
+    for chunk in iter_chunks(records, buffer_rows):
+        writer.writerows([record[field] for field in EXPORT_FIELDS] for record in chunk)
+        yield flush()
+
+
+def export_stream(records, export_format, buffer_rows=500):
+    """Generator potongan teks untuk format ekspor yang diminta."""
+    if export_format == 'ndjson':
+        return ndjson_stream(records, buffer_rows)
+    if export_format == 'csv':
+        return csv_stream(records, buffer_rows)
+    raise ValueError(f"Format ekspor tidak dikenal: {export_format}")
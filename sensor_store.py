@@ -0,0 +1,325 @@
+"""
+Penyimpanan time-series lokal (SQLite) yang mencerminkan koleksi `sensor_history`.
+
+Firestore disinkronkan secara inkremental berdasarkan high-water mark field
+`timestamp`, sehingga setiap sinkronisasi hanya membaca dokumen baru. Field
+itu bisa berisi detik atau milidetik; setiap satuan dibaca dengan query
+rentangnya sendiri dan mark-nya disimpan dalam detik, sehingga satu dokumen
+milidetik tidak menggeser mark melewati semua dokumen dalam detik. Di dalam
+satu sinkronisasi halaman berikutnya dilanjutkan dengan cursor
+(timestamp, doc_id), sehingga halaman penuh berisi timestamp yang sama tidak
+membuat sinkronisasi berhenti.
+Query rentang waktu dilayani dari index `ts` (B-tree, pencarian biner atas
+timestamp yang sudah dinormalisasi) tanpa round trip ke Firestore.
+"""
+import logging
+import math
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    doc_id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    temperature REAL NOT NULL,
+    humidity REAL NOT NULL,
+    soil_moisture REAL NOT NULL,
+    original_timestamp REAL,
+    original_datetime TEXT
+);
+CREATE INDEX IF NOT EXISTS readings_ts ON readings (ts);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Field `timestamp` >= nilai ini dianggap milidetik (lihat normalize_timestamp di app.py)
+MILLISECONDS_FROM = 1e11
+
+# (nama mark, pengali dari detik ke satuan field timestamp)
+TIMESTAMP_UNITS = (('high_water_s', 1), ('high_water_ms', 1000))
+
+READING_COLUMNS = 'doc_id, ts, temperature, humidity, soil_moisture, original_timestamp, original_datetime'
+
+
+class SensorStore:
+    """
+    Mirror lokal `sensor_history`. Satu koneksi SQLite per thread; penulisan
+    hanya terjadi saat sinkronisasi, yang dijaga agar tidak berjalan ganda.
+    """
+
+    def __init__(self, path, sync_interval=30.0, page_size=1000):
+        self.path = path
+        self.sync_interval = float(sync_interval)
+        self.page_size = int(page_size)
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        self._listeners = []
+        self.synced_documents = 0
+
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def add_listener(self, listener):
+        """Daftarkan fungsi yang dipanggil dengan list record setiap kali upsert selesai."""
+        self._listeners.append(listener)
+
+    def get_meta(self, key, default=None):
+        row = self.connection().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, conn, key, value):
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    @property
+    def high_water(self):
+        """Timestamp (detik) terbesar yang sudah disinkronkan, dari semua satuan."""
+        marks = [self._mark(name) for name, _ in TIMESTAMP_UNITS]
+        marks = [mark for mark in marks if mark is not None]
+        return max(marks) if marks else None
+
+    @property
+    def initialized(self):
+        """True setelah satu sinkronisasi penuh pernah selesai (backfill awal)."""
+        return self.get_meta('initial_sync') is not None or self.get_meta('high_water') is not None
+
+    def _mark(self, name):
+        value = self.get_meta(name)
+        if value is None and name == TIMESTAMP_UNITS[0][0]:
+            # Mark lama ('high_water') berisi nilai mentah field timestamp; hanya
+            # dipakai jika masih dalam detik
+            value = self.get_meta('high_water')
+            if value is not None and float(value) >= MILLISECONDS_FROM:
+                value = None
+        return float(value) if value is not None else None
+
+    def upsert(self, records, marks=None):
+        """
+        Simpan record hasil normalisasi (dict seperti keluaran
+        normalize_sensor_document) dan mark sinkronisasi {nama meta: nilai}.
+        """
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                f'INSERT OR REPLACE INTO readings ({READING_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        record['doc_id'], record['timestamp'], record['temperature'],
+                        record['humidity'], record['soil_moisture'],
+                        _as_float(record.get('original_timestamp')),
+                        None if record.get('original_datetime') is None else str(record['original_datetime'])
+                    )
+                    for record in records
+                ]
+            )
+            for name, value in (marks or {}).items():
+                self.set_meta(conn, name, value)
+
+        for listener in self._listeners:
+            listener(records)
+
+    def sync(self, collection_ref, normalize, force=False):
+        """
+        Tarik dokumen baru dari Firestore sejak high-water mark terakhir.
+        `normalize` menerima list (doc_id, data) dan mengembalikan list record.
+        Dilewati jika sinkronisasi terakhir belum lewat `sync_interval` detik
+        atau sinkronisasi lain sedang berjalan. Return jumlah dokumen yang dibaca.
+        Sinkronisasi pertama membaca seluruh koleksi; jalankan dari CLI atau
+        thread latar belakang, bukan dari thread request.
+        """
+        if not force and time.monotonic() - self._last_sync < self.sync_interval:
+            return 0
+        if not self._sync_lock.acquire(blocking=force):
+            return 0
+
+        try:
+            total = 0
+            for name, scale in TIMESTAMP_UNITS:
+                total += self._sync_unit(collection_ref, normalize, name, scale)
+            if self.get_meta('initial_sync') is None:
+                conn = self.connection()
+                with conn:
+                    self.set_meta(conn, 'initial_sync', time.time())
+
+            self._last_sync = time.monotonic()
+            self.synced_documents += total
+            if total:
+                logger.info("Sensor store: %d dokumen disinkronkan (high water %s)", total, self.high_water)
+            return total
+        finally:
+            self._sync_lock.release()
+
+    def _sync_unit(self, collection_ref, normalize, name, scale):
+        """
+        Tarik dokumen dengan field timestamp dalam satu satuan sejak mark
+        `name`. Posisi (timestamp, doc_id) dokumen terakhir disimpan; sinkronisasi
+        berikutnya dilanjutkan setelah snapshot dokumen itu.
+        """
+        mark = self._mark(name)
+        last_doc = None
+        mark_doc_id = self.get_meta(f'{name}_doc')
+        if mark is not None and mark_doc_id is not None:
+            snapshot = collection_ref.document(mark_doc_id).get()
+            if snapshot.exists:
+                last_doc = snapshot
+
+        query = collection_ref
+        if scale == 1:
+            query = query.where('timestamp', '<', MILLISECONDS_FROM)
+        lower = MILLISECONDS_FROM if scale != 1 else None
+        if mark is not None and last_doc is None:
+            # Dokumen posisi terakhir tidak ada (dihapus, atau mark lama):
+            # '>=' (dibulatkan ke bawah) agar dokumen dengan timestamp sama
+            # tidak terlewat; upsert ulang bersifat idempoten
+            lower = max(lower or 0, math.floor(mark * scale))
+        if lower is not None:
+            query = query.where('timestamp', '>=', lower)
+        query = query.order_by('timestamp').limit(self.page_size)
+
+        total = 0
+        while True:
+            page = query if last_doc is None else query.start_after(last_doc)
+            docs = list(page.stream())
+            if not docs:
+                break
+
+            items = [(doc.id, doc.to_dict()) for doc in docs]
+            # Urut naik, jadi dokumen terakhir memegang timestamp terbesar halaman ini
+            page_high_water = _as_float(items[-1][1].get('timestamp'))
+            marks = None
+            if page_high_water is not None:
+                marks = {name: page_high_water / scale, f'{name}_doc': docs[-1].id}
+            self.upsert(normalize(items), marks=marks)
+            total += len(docs)
+            last_doc = docs[-1]
+            if len(docs) < self.page_size:
+                break
+        return total
+
+    def query(self, start=None, end=None, limit=100, before=None):
+        """
+        Ambil record dalam rentang [start, end] (urut naik), dibatasi `limit`
+        record terakhir. Tanpa rentang, kembalikan `limit` record terbaru.
+        `before` (ts, doc_id) membatasi ke record yang lebih lama dari posisi
+        itu (halaman berikutnya), dicari lewat index `ts` tanpa OFFSET.
+        """
+        clauses = []
+        params = []
+        if start and end:
+            clauses.append('ts >= ? AND ts <= ?')
+            params.extend([start, end])
+        if before is not None:
+            ts, doc_id = before
+            # 'ts <= ?' agar index tetap dipakai; doc_id memisahkan timestamp yang sama
+            clauses.append('ts <= ? AND (ts < ? OR doc_id < ?)')
+            params.extend([ts, ts, doc_id])
+        sql = f'SELECT {READING_COLUMNS} FROM readings'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY ts DESC, doc_id DESC LIMIT ?'
+        params.append(limit)
+
+        rows = self.connection().execute(sql, params).fetchall()
+        rows.reverse()
+        return [_row_to_record(row) for row in rows]
+
+    def iter_records(self, start=None, end=None, limit=None, batch_size=1000):
+        """
+        Iterasi record dalam rentang [start, end] urut naik, dibaca per
+        `batch_size` baris dari cursor sehingga tidak dimuat sekaligus (ekspor).
+        """
+        sql = f'SELECT {READING_COLUMNS} FROM readings'
+        params = []
+        if start and end:
+            sql += ' WHERE ts >= ? AND ts <= ?'
+            params.extend([start, end])
+        sql += ' ORDER BY ts'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        cursor = self.connection().execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _row_to_record(row)
+        finally:
+            cursor.close()
+
+    def query_arrays(self, start=None, end=None, limit=None):
+        """
+        Sama seperti query() tetapi mengembalikan kolom NumPy (timestamp,
+        temperature, humidity, soil_moisture) urut naik, tanpa dict per baris.
+        """
+        sql = 'SELECT ts, temperature, humidity, soil_moisture FROM readings'
+        params = []
+        if start and end:
+            sql += ' WHERE ts >= ? AND ts <= ?'
+            params.extend([start, end])
+        sql += ' ORDER BY ts DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        rows = np.array(self.connection().execute(sql, params).fetchall(), dtype=np.float64).reshape(-1, 4)[::-1]
+        return {
+            'timestamp': rows[:, 0],
+            'temperature': rows[:, 1],
+            'humidity': rows[:, 2],
+            'soil_moisture': rows[:, 3]
+        }
+
+    def stats(self):
+        conn = self.connection()
+        count, first_ts, last_ts = conn.execute('SELECT COUNT(*), MIN(ts), MAX(ts) FROM readings').fetchone()
+        return {
+            'path': self.path,
+            'rows': count,
+            'first_timestamp': first_ts,
+            'last_timestamp': last_ts,
+            'high_water': self.high_water,
+            'initialized': self.initialized,
+            'synced_documents': self.synced_documents,
+            'seconds_since_sync': time.monotonic() - self._last_sync if self._last_sync else None
+        }
+
+
+def _as_float(value):
+    try:
+        return float(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _row_to_record(row):
+    doc_id, ts, temperature, humidity, soil_moisture, original_timestamp, original_datetime = row
+    return {
+        'timestamp': ts,
+        'humidity': humidity,
+        'temperature': temperature,
+        'soil_moisture': soil_moisture,
+        'source': 'firestore',
+        'original_datetime': original_datetime,
+        'original_timestamp': original_timestamp,
+        'doc_id': doc_id
+    }
@@ -0,0 +1,162 @@
+"""
+Startup bertahap untuk worker aplikasi.
+
+Dependensi berat (Firebase, model Random Forest, scheduler) dibungkus
+`LazyResource`: dimuat sekali saat pertama dipakai, atau lebih awal oleh
+thread warm-up di latar belakang, sehingga worker bisa langsung melayani
+halaman `/`. Waktu setiap fase dicatat di `StartupReport` untuk endpoint
+readiness.
+"""
+import logging
+import os
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class StartupReport:
+    """Catatan waktu per fase startup (detik, relatif terhadap `started`)."""
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self._lock = threading.Lock()
+        self._phases = {}
+        self.first_request_seconds = None
+
+    def record(self, name, status, seconds=None, error=None):
+        with self._lock:
+            self._phases[name] = {
+                'status': status,
+                'seconds': seconds,
+                'finished_at': time.perf_counter() - self.started if status in (READY, FAILED) else None,
+                'error': error
+            }
+
+    def mark_first_request(self):
+        if self.first_request_seconds is not None:
+            return
+        with self._lock:
+            if self.first_request_seconds is None:
+                self.first_request_seconds = time.perf_counter() - self.started
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'uptime_seconds': time.perf_counter() - self.started,
+                'first_request_seconds': self.first_request_seconds,
+                'phases': {name: dict(phase) for name, phase in self._phases.items()}
+            }
+
+
+class LazyResource:
+    """
+    Nilai yang dibuat sekali oleh `loader` saat pertama diminta (thread-safe).
+    Jika loader gagal, error disimpan dan dilempar ulang pada setiap get().
+    Resource `required` harus siap sebelum worker dianggap ready.
+    """
+
+    _instances = weakref.WeakSet()
+
+    def __init__(self, name, loader, report, required=True):
+        self.name = name
+        self.loader = loader
+        self.report = report
+        self.required = required
+        self._lock = threading.Lock()
+        self._state = PENDING
+        self._value = None
+        self._error = None
+        report.record(name, PENDING)
+        LazyResource._instances.add(self)
+
+    @property
+    def state(self):
+        return self._state
+
+    def get(self):
+        if self._state == READY:
+            return self._value
+        with self._lock:
+            if self._state == PENDING:
+                self._load()
+        if self._state == FAILED:
+            raise self._error
+        return self._value
+
+    def _load(self):
+        self._state = LOADING
+        self.report.record(self.name, LOADING)
+        started = time.perf_counter()
+        try:
+            self._value = self.loader()
+        except Exception as e:
+            self._error = e
+            self._state = FAILED
+            self.report.record(self.name, FAILED, time.perf_counter() - started, str(e))
+            logger.error("Startup phase '%s' gagal: %s", self.name, e)
+            return
+        self._state = READY
+        seconds = time.perf_counter() - started
+        self.report.record(self.name, READY, seconds)
+        logger.info("Startup phase '%s' siap dalam %.0f ms", self.name, seconds * 1000)
+
+    @classmethod
+    def _reset_after_fork(cls):
+        # Thread loader tidak ikut ter-fork; fase yang sedang dimuat diulang di child
+        for resource in list(cls._instances):
+            resource._lock = threading.Lock()
+            if resource._state == LOADING:
+                resource._state = PENDING
+                resource.report.record(resource.name, PENDING)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=LazyResource._reset_after_fork)
+
+
+class LazyProxy:
+    """Objek pengganti yang meneruskan akses atribut ke nilai LazyResource."""
+
+    def __init__(self, resource):
+        object.__setattr__(self, '_resource', resource)
+
+    def __getattr__(self, name):
+        return getattr(self._resource.get(), name)
+
+    def __repr__(self):
+        return f"<LazyProxy {self._resource.name} ({self._resource.state})>"
+
+
+def is_ready(resources):
+    """Ready jika tidak ada fase yang masih dimuat dan semua fase wajib siap."""
+    for resource in resources:
+        if resource.state in (PENDING, LOADING):
+            return False
+        if resource.required and resource.state != READY:
+            return False
+    return True
+
+
+def warm_up(resources, background=True):
+    """Muat semua resource berurutan, di thread latar belakang atau langsung."""
+    def run():
+        for resource in resources:
+            try:
+                resource.get()
+            except Exception:
+                # Error sudah dicatat oleh LazyResource
+                pass
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name='startup-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,142 @@
+"""
+Konfigurasi logging aplikasi: format teks atau JSON terstruktur, sampling
+per template pesan, dan channel debug yang diaktifkan per nama.
+
+Pesan di hot path memakai format lazy (`logger.debug('... %s', nilai)`),
+sehingga string baru dibentuk jika record benar-benar ditulis, dan log per
+dokumen/payload ditulis ke channel debug (`<logger aplikasi>.<channel>`)
+yang hanya aktif jika namanya ada di `debug_channels` atau level DEBUG.
+
+`SamplingFilter` membatasi setiap template pesan (logger, level, format
+string sebelum diisi argumen) ke `rate` record per `per` detik. Record yang
+dilewati dihitung dan jumlahnya dilaporkan pada record berikutnya yang lolos
+(`sampled_dropped`). ERROR ke atas tidak pernah dilewati.
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+
+TEXT_FORMAT = '%(levelname)s:%(name)s:%(message)s'
+LOG_FORMATS = ('text', 'json')
+
+# Batas jumlah template yang dilacak sampler sebelum jendela lama dibuang
+SAMPLER_MAX_KEYS = 10000
+
+# Atribut bawaan LogRecord; atribut lain (dari `extra=`) ikut ditulis di format JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def parse_sample(value):
+    """
+    Ubah konfigurasi sampling '<rate>/<detik>' (mis. '20/60') menjadi
+    (rate, per). '0', 'off' atau kosong berarti tanpa sampling (None).
+    """
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'off', 'none'):
+        return None
+    rate, _, per = value.partition('/')
+    rate, per = int(rate), float(per or 1)
+    if rate <= 0 or per <= 0:
+        raise ValueError(f"Konfigurasi sampling log tidak valid: {value}")
+    return rate, per
+
+
+class SamplingFilter(logging.Filter):
+    """Batasi record per template pesan ke `rate` record per `per` detik."""
+
+    def __init__(self, rate, per):
+        super().__init__()
+        self.rate = int(rate)
+        self.per = float(per)
+        self._windows = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.levelno, record.msg if isinstance(record.msg, str) else type(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.per:
+                if window is None and len(self._windows) >= SAMPLER_MAX_KEYS:
+                    self._purge(now)
+                dropped = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.rate:
+                window[1] += 1
+                dropped = 0
+            else:
+                window[2] += 1
+                self.dropped += 1
+                return False
+        if dropped:
+            record.sampled_dropped = dropped
+        return True
+
+    def _purge(self, now):
+        self._windows = {key: window for key, window in self._windows.items() if now - window[0] < self.per}
+        if len(self._windows) >= SAMPLER_MAX_KEYS:
+            self._windows.clear()
+
+
+class TextFormatter(logging.Formatter):
+    """Format teks biasa; record hasil sampling diberi jumlah pesan serupa yang dilewati."""
+
+    def format(self, record):
+        text = super().format(record)
+        dropped = getattr(record, 'sampled_dropped', 0)
+        return f"{text} [+{dropped} pesan serupa dilewati]" if dropped else text
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu objek JSON per baris: time, level, logger, message, field `extra`, dan exception."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(level='INFO', log_format='text', sample=None, debug_channels=(),
+                      channel_prefix=None, stream=None, force=False):
+    """
+    Pasang handler root dengan format dan sampling yang diminta, lalu aktifkan
+    level DEBUG untuk setiap channel di `debug_channels` (nama relatif
+    terhadap `channel_prefix`). Seperti basicConfig, handler yang sudah ada
+    tidak diganti kecuali `force`. Return handler yang dipasang (atau None).
+    """
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"LOG_FORMAT tidak dikenal: {log_format} (pilih {', '.join(LOG_FORMATS)})")
+    root = logging.getLogger()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    for channel in debug_channels:
+        name = f'{channel_prefix}.{channel}' if channel_prefix else channel
+        logging.getLogger(name).setLevel(logging.DEBUG)
+
+    if root.handlers and not force:
+        return None
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if log_format == 'json' else TextFormatter(TEXT_FORMAT))
+    sampling = parse_sample(sample) if isinstance(sample, str) or sample is None else sample
+    if sampling is not None:
+        handler.addFilter(SamplingFilter(*sampling))
+    root.addHandler(handler)
+    return handler
@@ -0,0 +1,122 @@
+"""
+Parsing body prediksi batch (batch_io.py) untuk setiap Content-Type yang
+didukung, serta penolakan body tidak valid dengan BatchFormatError.
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from batch_io import BatchFormatError, UnsupportedBatchFormat, parse_batch  # noqa: E402
+
+ROWS = [
+    {'temperature': 30.5, 'humidity': 70.0, 'soil_moisture': 40.0, 'hour': 6},
+    {'temperature': 25.0, 'humidity': 85.0, 'soil_moisture': 75.5},
+]
+
+
+def _assert_rows(columns, hours=(6, None)):
+    np.testing.assert_array_equal(columns['temperature'], [30.5, 25.0])
+    np.testing.assert_array_equal(columns['humidity'], [70.0, 85.0])
+    np.testing.assert_array_equal(columns['soil_moisture'], [40.0, 75.5])
+    np.testing.assert_array_equal(columns['hour'], [np.nan if h is None else h for h in hours])
+    assert all(columns[key].dtype == np.float64 for key in columns)
+
+
+@pytest.mark.parametrize('body', [
+    json.dumps(ROWS),
+    json.dumps({'rows': ROWS}),
+    json.dumps([[30.5, 70.0, 40.0, 6], [25.0, 85.0, 75.5]]),
+    json.dumps({'temperature': [30.5, 25.0], 'humidity': [70.0, 85.0],
+                'soil_moisture': [40.0, 75.5], 'hour': [6, None]}),
+])
+def test_json_shapes(body):
+    _assert_rows(parse_batch(body, 'application/json; charset=utf-8'))
+
+
+def test_default_content_type_is_json():
+    _assert_rows(parse_batch(json.dumps(ROWS), None))
+
+
+def test_ndjson_skips_blank_lines():
+    body = '\n'.join(json.dumps(row) for row in ROWS) + '\n\n'
+    _assert_rows(parse_batch(body, 'application/x-ndjson'))
+
+
+def test_float32_rows():
+    body = np.array([[30.5, 70.0, 40.0], [25.0, 85.0, 75.5]], dtype='<f4').tobytes()
+    _assert_rows(parse_batch(body, 'application/octet-stream'), hours=(None, None))
+
+    body = np.array([[30.5, 70.0, 40.0, 6], [25.0, 85.0, 75.5, 12]], dtype='<f4').tobytes()
+    _assert_rows(parse_batch(body, 'application/octet-stream', columns=4), hours=(6, 12))
+
+
+def test_hour_from_timestamp():
+    timestamp = time.mktime((2024, 5, 1, 17, 30, 0, 0, 0, -1))
+    columns = parse_batch(json.dumps([dict(ROWS[1], timestamp=timestamp), ROWS[0]]), 'application/json')
+    np.testing.assert_array_equal(columns['hour'], [17, 6])
+
+
+def test_arrow_stream():
+    pa = pytest.importorskip('pyarrow')
+    table = pa.table({'temperature': [30.5, 25.0], 'humidity': [70.0, 85.0],
+                      'soil_moisture': [40.0, 75.5], 'hour': [6, None]})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    _assert_rows(parse_batch(sink.getvalue().to_pybytes(), 'application/vnd.apache.arrow.stream'))
+
+
+def test_arrow_without_pyarrow(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(UnsupportedBatchFormat):
+        parse_batch(b'', 'application/vnd.apache.arrow.stream')
+
+
+def test_unsupported_content_type():
+    with pytest.raises(UnsupportedBatchFormat):
+        parse_batch('a,b,c', 'text/csv')
+
+
+@pytest.mark.parametrize('body', [
+    '[{"temperature": 30',
+    '{"temperature": 30}',
+    '[]',
+    '"baris"',
+    '[[30.5, 70.0]]',
+    json.dumps([dict(ROWS[0], temperature='panas')]),
+    '[{"temperature": NaN, "humidity": 70, "soil_moisture": 40}]',
+    '[{"temperature": Infinity, "humidity": 70, "soil_moisture": 40}]',
+    '[{"temperature": null, "humidity": 70, "soil_moisture": 40}]',
+    json.dumps([dict(ROWS[0], hour=24)]),
+    json.dumps([dict(ROWS[0], hour=-1)]),
+    json.dumps({'temperature': [[30.5]], 'humidity': [[70.0]], 'soil_moisture': [[40.0]]}),
+    json.dumps({'temperature': [30.5, 25.0], 'humidity': [70.0], 'soil_moisture': [40.0, 75.5]}),
+    json.dumps({'temperature': [30.5], 'humidity': [70.0], 'soil_moisture': [40.0], 'hour': [6, 7]}),
+    json.dumps([dict(ROWS[1], timestamp=1e20)]),
+])
+def test_invalid_json_body(body):
+    with pytest.raises(BatchFormatError):
+        parse_batch(body, 'application/json')
+
+
+def test_invalid_ndjson_line():
+    with pytest.raises(BatchFormatError, match='baris 2'):
+        parse_batch(json.dumps(ROWS[0]) + '\n{rusak\n', 'application/x-ndjson')
+
+
+@pytest.mark.parametrize('body, columns', [
+    (b'', 3),
+    (b'\x00' * 10, 3),
+    (np.array([[30.5, np.nan, 40.0]], dtype='<f4').tobytes(), 3),
+    (np.array([[30.5, 70.0, 40.0, 24]], dtype='<f4').tobytes(), 4),
+    (np.zeros(12, dtype='<f4').tobytes(), 6),
+])
+def test_invalid_float32_body(body, columns):
+    with pytest.raises(BatchFormatError):
+        parse_batch(body, 'application/octet-stream', columns=columns)
@@ -0,0 +1,105 @@
+"""
+Kesetaraan CompiledForest dengan RandomForestClassifier sklearn.
+
+Artefak mmap (model_registry), tabel lookup (lookup_grid) dan kompaksi
+(compaction) semuanya bergantung pada hasil hutan terkompilasi yang identik
+dengan sklearn, jadi setiap jalur penelusuran diuji di sini: vektorisasi,
+penelusuran skalar untuk input kecil, dan artefak yang disimpan lalu dibuka
+kembali.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import forest_engine  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+
+
+def _training_data(n_rows, seed):
+    # Rentang yang sama dengan data sensor: jam, suhu, kelembapan udara, kelembapan tanah
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(0, 24, n_rows),
+        rng.uniform(20, 38, n_rows),
+        rng.uniform(50, 95, n_rows),
+        rng.uniform(20, 90, n_rows),
+    ])
+    y = ((X[:, 3] < 45) & (X[:, 1] > 26) | (X[:, 3] < 30)).astype(int)
+    # Sedikit label acak agar daun punya probabilitas campuran
+    flip = rng.random(n_rows) < 0.1
+    y[flip] = 1 - y[flip]
+    return X, y
+
+
+@pytest.fixture(scope='module')
+def model():
+    X, y = _training_data(2000, seed=0)
+    return RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+
+
+@pytest.fixture(scope='module')
+def X_test():
+    # Lebih dari CHUNK_ROWS agar pemotongan per chunk ikut teruji
+    return _training_data(forest_engine.CHUNK_ROWS * 3 + 17, seed=1)[0]
+
+
+def assert_same_as_sklearn(model, forest, X):
+    assert np.allclose(forest.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+    assert np.array_equal(forest.predict(X), model.predict(X))
+
+
+def test_vectorized_matches_sklearn(model, X_test):
+    forest = CompiledForest.from_sklearn(model)
+    assert forest.n_trees == len(model.estimators_)
+    assert_same_as_sklearn(model, forest, X_test)
+
+
+def test_scalar_walk_matches_sklearn(model, X_test, monkeypatch):
+    forest = CompiledForest.from_sklearn(model)
+    # Paksa penelusuran skalar (biasanya hanya untuk baris x pohon <= SCALAR_WALK_MAX)
+    monkeypatch.setattr(forest_engine, 'SCALAR_WALK_MAX', forest.n_trees * 4)
+    for start in range(0, 40, 4):
+        assert_same_as_sklearn(model, forest, X_test[start:start + 4])
+    assert np.allclose(forest.predict_proba(X_test[0]), model.predict_proba(X_test[:1]), rtol=0, atol=1e-12)
+
+
+def test_scalar_walk_small_forest(X_test):
+    # Hutan kecil (seperti hasil distilasi) memakai jalur skalar tanpa monkeypatch
+    X, y = _training_data(500, seed=2)
+    small = RandomForestClassifier(n_estimators=2, max_depth=5, random_state=0).fit(X, y)
+    forest = CompiledForest.from_sklearn(small)
+    assert forest.n_trees * 2 <= forest_engine.SCALAR_WALK_MAX
+    for i in range(20):
+        assert_same_as_sklearn(small, forest, X_test[i:i + 1])
+        assert_same_as_sklearn(small, forest, X_test[i:i + 2])
+
+
+@pytest.mark.parametrize('scalar', [False, True], ids=['vectorized', 'scalar'])
+def test_threshold_boundaries_match_sklearn(model, scalar, monkeypatch):
+    # Nilai tepat di ambang batas: sklearn membandingkan fitur float32 dengan `<=`
+    forest = CompiledForest.from_sklearn(model)
+    if scalar:
+        monkeypatch.setattr(forest_engine, 'SCALAR_WALK_MAX', np.inf)
+    split = np.isfinite(forest.threshold)  # daun memakai ambang batas tak hingga
+    thresholds = forest.threshold[split]
+    X = np.tile(np.median(_training_data(50, seed=3)[0], axis=0), (len(thresholds), 1))
+    X[np.arange(len(thresholds)), forest.feature[split]] = thresholds
+    assert_same_as_sklearn(model, forest, X)
+
+
+def test_artifact_round_trip(model, X_test, tmp_path):
+    forest = CompiledForest.from_sklearn(model)
+    path = str(tmp_path / 'model.forest')
+    forest.save(path, metadata={'source': 'test'})
+
+    for use_mmap in (True, False):
+        loaded = CompiledForest.load(path, use_mmap=use_mmap)
+        assert loaded.metadata['source'] == 'test'
+        assert loaded.n_nodes == forest.n_nodes
+        assert np.array_equal(loaded.classes, forest.classes)
+        assert_same_as_sklearn(model, loaded, X_test)
@@ -0,0 +1,126 @@
+"""
+Live stream (/api/stream) tanpa jaringan: LiveFeed dan BroadcastHub
+digerakkan lewat ManualListenerSource.
+
+Diuji penyebaran event ke semua subscriber, pembuangan pesan tertua untuk
+klien lambat, batas jumlah klien, dan event latest-data yang baru dikirim
+setelah /DHT dan /SoilMoisture sama-sama diterima.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from live_stream import BroadcastHub, LiveFeed, ManualListenerSource, Subscription, format_sse  # noqa: E402
+
+DHT = {'temperature': 29.5, 'humidity': 71.0}
+SOIL = {'percentage': 48.0}
+
+
+def _build_latest(dht_data, soil_data):
+    # Seperti build_latest_data di app.py: node yang belum ada menjadi nilai 0
+    dht_data, soil_data = dht_data or {}, soil_data or {}
+    return {
+        'temperature': dht_data.get('temperature', 0),
+        'humidity': dht_data.get('humidity', 0),
+        'soil_moisture': soil_data.get('percentage', 0),
+    }
+
+
+def _messages(subscription):
+    """Semua pesan yang sudah ada di antrian subscriber, sebagai (event, data)."""
+    messages = []
+    while True:
+        message = subscription.get(timeout=0)
+        if message is None:
+            return messages
+        event_line, data_line = message.strip().split('\n')
+        messages.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+
+
+@pytest.fixture
+def feed():
+    source = ManualListenerSource()
+    hub = BroadcastHub()
+    live_feed = LiveFeed(source, hub, _build_latest)
+    live_feed.ensure_started()
+    return source, hub, live_feed
+
+
+def test_fan_out_to_all_subscribers(feed):
+    source, hub, _ = feed
+    subscriptions = [hub.subscribe() for _ in range(3)]
+
+    source.emit_realtime('/DHT', DHT)
+    source.emit_realtime('/SoilMoisture', SOIL)
+    source.emit_history(upserted=[{'id': 'a1', 'keputusan_text': 'siram'}])
+
+    expected = [
+        ('latest-data', {'temperature': 29.5, 'humidity': 71.0, 'soil_moisture': 48.0}),
+        ('watering-analysis', {'upserted': [{'id': 'a1', 'keputusan_text': 'siram'}], 'removed': []}),
+    ]
+    for subscription in subscriptions:
+        assert _messages(subscription) == expected
+
+
+def test_latest_waits_for_both_paths(feed):
+    source, hub, _ = feed
+    subscription = hub.subscribe()
+
+    source.emit_realtime('/DHT', DHT)
+    assert _messages(subscription) == []
+    assert hub.published == 0
+
+    source.emit_realtime('/SoilMoisture', SOIL)
+    assert [event for event, _ in _messages(subscription)] == ['latest-data']
+
+
+def test_unchanged_payload_is_not_republished(feed):
+    source, hub, _ = feed
+    source.emit_realtime('/DHT', DHT)
+    source.emit_realtime('/SoilMoisture', SOIL)
+    source.emit_realtime('/SoilMoisture', dict(SOIL))
+    assert hub.published == 1
+
+
+def test_new_subscriber_receives_retained_latest(feed):
+    source, hub, _ = feed
+    source.emit_realtime('/DHT', DHT)
+    source.emit_realtime('/SoilMoisture', SOIL)
+
+    late = hub.subscribe()
+    assert _messages(late) == [('latest-data', {'temperature': 29.5, 'humidity': 71.0, 'soil_moisture': 48.0})]
+
+
+def test_slow_subscriber_drops_oldest():
+    subscription = Subscription(max_queue=3)
+    for i in range(5):
+        subscription.put(format_sse('tick', i))
+
+    assert subscription.dropped == 2
+    assert [data for _, data in _messages(subscription)] == [2, 3, 4]
+
+
+def test_slow_subscriber_does_not_block_others():
+    hub = BroadcastHub(max_queue=2)
+    slow, fast = hub.subscribe(), hub.subscribe()
+    for i in range(4):
+        hub.publish('tick', i)
+        assert [data for _, data in _messages(fast)] == [i]
+
+    assert slow.dropped == 2
+    assert [data for _, data in _messages(slow)] == [2, 3]
+
+
+def test_subscriber_cap():
+    hub = BroadcastHub(max_subscribers=2)
+    first, second = hub.subscribe(), hub.subscribe()
+    assert first is not None and second is not None
+    assert hub.subscribe() is None
+    assert hub.subscriber_count == 2
+
+    hub.unsubscribe(first)
+    assert hub.subscribe() is not None
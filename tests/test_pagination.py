@@ -0,0 +1,149 @@
+"""
+Token cursor (pagination.py) dan penelusuran halaman /api/sensor-data serta
+/api/watering-history di atas backend lokal.
+
+Dokumen diisi dengan timestamp kembar yang terbelah di batas halaman, sehingga
+urutan (timestamp, doc_id) di cursor menentukan tidak ada record yang
+terlewat atau terbaca dua kali.
+"""
+import base64
+import json
+import logging
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from pagination import InvalidCursor, decode_cursor, encode_cursor  # noqa: E402
+
+SCOPE = ['sensor-data', 'firestore', None, None]
+
+# Rentang waktu dokumen uji: sesudah 2020 (batas validasi app) dan jauh
+# sebelum pembacaan sintetis yang berakhir pada waktu sekarang
+BASE = 1700000000
+TIES = 3
+DOCUMENTS = 10
+
+
+def _token(payload):
+    # Payload sembarang, termasuk nilai yang tidak pernah dibuat encode_cursor
+    raw = json.dumps(payload).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def test_round_trip():
+    token = encode_cursor(SCOPE, 1700000002.5, 'seed-000000042')
+    assert decode_cursor(token, SCOPE) == (1700000002.5, 'seed-000000042')
+    assert '=' not in token
+
+
+def test_start_position_ignores_timestamp():
+    assert decode_cursor(encode_cursor(SCOPE, None, None), SCOPE) == (None, None)
+
+
+@pytest.mark.parametrize('token', [
+    encode_cursor(['watering-history'], 1700000000, 'a'),
+    encode_cursor(['sensor-data', 'store', None, None], 1700000000, 'a'),
+    'bukan-cursor!',
+    'e30',
+    _token(['sensor-data']),
+    _token({'v': 2, 'q': SCOPE, 't': 1700000000, 'i': 'a'}),
+    encode_cursor(SCOPE, True, 'a'),
+    encode_cursor(SCOPE, '1700000000', 'a'),
+    _token({'v': 1, 'q': SCOPE, 't': float('inf'), 'i': 'a'}),
+    _token({'v': 1, 'q': SCOPE, 't': float('nan'), 'i': 'a'}),
+    encode_cursor(SCOPE, 1700000000, 'sensor_history/a'),
+    encode_cursor(SCOPE, 1700000000, ''),
+    encode_cursor(SCOPE, 1700000000, 42),
+])
+def test_invalid_cursor(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, SCOPE)
+
+
+@pytest.fixture(scope='module')
+def local_app(tmp_path_factory):
+    from bench_endpoints import import_local_app
+    app = import_local_app(50, tmp_dir=str(tmp_path_factory.mktemp('app')))
+
+    firestore = app.local_database.firestore
+    batch = firestore.batch()
+    for i in range(DOCUMENTS):
+        timestamp = BASE + i // TIES
+        batch.set(firestore.collection('sensor_history').document(f'tie-{i:02d}'), {
+            'timestamp': timestamp,
+            'DateTime': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp)),
+            'temperature': 25.0,
+            'humidity': 60.0,
+            'soil_moisture': float(i)
+        })
+        batch.set(firestore.collection('watering_analysis').document(f'tie-{i:02d}'), {
+            'timestamp': timestamp,
+            'keputusan_text': 'siram'
+        })
+    batch.commit()
+
+    yield app
+    app.shutdown_background_jobs()
+    logging.disable(logging.NOTSET)
+
+
+@pytest.mark.parametrize('limit', [1, 2, 4, DOCUMENTS])
+def test_sensor_data_walk_with_ties(local_app, limit):
+    client = local_app.app.test_client()
+    url = f'/api/sensor-data?start={BASE}&end={BASE + DOCUMENTS}&limit={limit}'
+
+    seen, cursor = [], None
+    for _ in range(DOCUMENTS + 2):
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= limit
+        # Halaman berikutnya lebih lama dari halaman sebelumnya
+        seen = [record['soil_moisture'] for record in page] + seen
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+
+    assert sorted(seen) == [float(i) for i in range(DOCUMENTS)]
+
+
+def test_sensor_data_rejects_cursor_of_other_range(local_app):
+    client = local_app.app.test_client()
+    response = client.get(f'/api/sensor-data?start={BASE}&end={BASE + DOCUMENTS}&limit=2')
+    cursor = response.headers['X-Next-Cursor']
+
+    response = client.get(f'/api/sensor-data?start={BASE}&end={BASE + 1}&limit=2&cursor={cursor}')
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('limit', [1, 3, 4])
+def test_watering_history_walk_with_ties(local_app, limit):
+    client = local_app.app.test_client()
+    expected = sorted(
+        ((doc.get('timestamp'), doc.id) for doc in local_app.local_database.firestore.collection('watering_analysis').stream()),
+        reverse=True
+    )
+
+    seen, cursor = [], None
+    for _ in range(len(expected) + 2):
+        response = client.get(f'/api/watering-history?limit={limit}' + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['count'] <= limit
+        seen.extend((item['timestamp'], item['id']) for item in body['data'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+
+def test_watering_history_rejects_start_cursor(local_app):
+    client = local_app.app.test_client()
+    cursor = encode_cursor(['watering-history'], None, None)
+    assert client.get(f'/api/watering-history?cursor={cursor}').status_code == 400
@@ -0,0 +1,146 @@
+"""
+Antrian write-behind (write_behind.py) di atas Firestore lokal.
+
+Diuji spill ke file saat commit gagal, replay setelah Firestore pulih, baris
+spill rusak yang dipindahkan ke `<spill>.corrupt`, penggabungan file klaim
+milik proses yang sudah mati, error I/O spill yang tidak menghentikan thread
+penulis, dan enqueue dengan doc_id yang menimpa dokumen yang sama.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from local_backend import LocalDatabase  # noqa: E402
+from write_behind import WriteBehindQueue  # noqa: E402
+
+COLLECTION = 'watering_analysis'
+
+
+class FlakyFirestore:
+    """Firestore lokal yang batch()-nya gagal selama `failing` bernilai True."""
+
+    def __init__(self, firestore):
+        self.firestore = firestore
+        self.failing = False
+
+    def collection(self, name):
+        return self.firestore.collection(name)
+
+    def batch(self):
+        if self.failing:
+            raise ConnectionError('firestore tidak tersedia')
+        return self.firestore.batch()
+
+
+@pytest.fixture
+def client():
+    return FlakyFirestore(LocalDatabase().firestore)
+
+
+@pytest.fixture
+def spill_path(tmp_path):
+    return str(tmp_path / 'spill.jsonl')
+
+
+@pytest.fixture
+def make_queue(client):
+    queues = []
+
+    def make(spill_path):
+        writer = WriteBehindQueue(client, flush_interval=0.01, max_retries=0, spill_path=spill_path)
+        queues.append(writer)
+        return writer
+
+    yield make
+    for writer in queues:
+        writer.close(timeout=5)
+
+
+def _documents(client):
+    return {doc.id: doc.to_dict() for doc in client.collection(COLLECTION).stream()}
+
+
+def _spill_line(doc_id, value):
+    return json.dumps({'collection': COLLECTION, 'id': doc_id, 'data': {'value': value}}) + '\n'
+
+
+def test_failed_commit_spills_then_replays_after_recovery(client, spill_path, make_queue):
+    writer = make_queue(spill_path)
+    client.failing = True
+    first = writer.enqueue(COLLECTION, {'value': 1})
+    second = writer.enqueue(COLLECTION, {'value': 2})
+    assert writer.flush(timeout=5)
+
+    with open(spill_path, encoding='utf-8') as f:
+        assert [json.loads(line)['id'] for line in f] == [first, second]
+    assert writer.stats()['spill_pending'] == 2
+    assert _documents(client) == {}
+
+    client.failing = False
+    third = writer.enqueue(COLLECTION, {'value': 3})
+    assert writer.flush(timeout=5)
+
+    assert _documents(client) == {first: {'value': 1}, second: {'value': 2}, third: {'value': 3}}
+    assert not os.path.exists(spill_path)
+    stats = writer.stats()
+    assert (stats['spilled'], stats['replayed'], stats['spill_pending']) == (2, 2, 0)
+
+
+def test_corrupt_spill_line_is_quarantined(client, spill_path, make_queue):
+    truncated = _spill_line('b', 2)[:25]
+    with open(spill_path, 'w', encoding='utf-8') as f:
+        f.write(_spill_line('a', 1) + truncated + '\n' + _spill_line('c', 3))
+
+    writer = make_queue(spill_path)
+    writer.enqueue(COLLECTION, {'value': 4}, doc_id='d')
+    assert writer.flush(timeout=5)
+
+    assert _documents(client) == {'a': {'value': 1}, 'c': {'value': 3}, 'd': {'value': 4}}
+    with open(f'{spill_path}.corrupt', encoding='utf-8') as f:
+        assert f.read() == truncated + '\n'
+    assert writer.stats()['spill_pending'] == 0
+
+
+def test_claim_of_dead_process_is_merged(client, spill_path, make_queue):
+    exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+    exited.wait()
+    orphan = f'{spill_path}.replay-{exited.pid}'
+    with open(orphan, 'w', encoding='utf-8') as f:
+        f.write(_spill_line('orphan', 1))
+
+    writer = make_queue(spill_path)
+    writer.enqueue(COLLECTION, {'value': 2}, doc_id='fresh')
+    assert writer.flush(timeout=5)
+
+    assert _documents(client) == {'orphan': {'value': 1}, 'fresh': {'value': 2}}
+    assert not os.path.exists(orphan)
+
+
+def test_spill_io_error_keeps_writer_alive(client, tmp_path, make_queue):
+    writer = make_queue(str(tmp_path / 'tidak-ada' / 'spill.jsonl'))
+    client.failing = True
+    writer.enqueue(COLLECTION, {'value': 1})
+    assert writer.flush(timeout=5)
+    assert writer.stats()['last_error']
+    assert writer._thread.is_alive()
+
+    client.failing = False
+    doc_id = writer.enqueue(COLLECTION, {'value': 2})
+    assert writer.flush(timeout=5)
+    assert _documents(client) == {doc_id: {'value': 2}}
+
+
+def test_enqueue_with_doc_id_overwrites(client, spill_path, make_queue):
+    writer = make_queue(spill_path)
+    assert writer.enqueue(COLLECTION, {'value': 1}, doc_id='manual-x-rules') == 'manual-x-rules'
+    assert writer.flush(timeout=5)
+    writer.enqueue(COLLECTION, {'value': 2}, doc_id='manual-x-rules')
+    assert writer.flush(timeout=5)
+
+    assert _documents(client) == {'manual-x-rules': {'value': 2}}
+    assert writer.stats()['written'] == 2
@@ -0,0 +1,144 @@
+"""
+Parsing string DateTime menjadi timestamp Unix.
+
+`TimestampParser` mengingat format yang terakhir berhasil dan mencobanya
+lebih dulu, karena dokumen dari satu perangkat hampir selalu memakai format
+yang sama. Untuk banyak nilai sekaligus, `parse_column` mem-parse seluruh
+kolom per format dengan pandas, lalu hanya sisa yang gagal diproses satu per
+satu. String tanpa zona waktu ditafsirkan sebagai waktu lokal, sama seperti
+`datetime.strptime(...).timestamp()`. pandas baru diimport saat parse_column
+pertama kali dipanggil agar startup aplikasi tetap ringan.
+"""
+import logging
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Format yang mungkin ada di Firestore
+DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",      # 2025-06-04 21:15:15
+    "%Y-%m-%dT%H:%M:%S",      # 2025-06-04T21:15:15
+    "%Y-%m-%d %H:%M:%S.%f",   # 2025-06-04 21:15:15.123456
+    "%Y-%m-%dT%H:%M:%S.%f",   # 2025-06-04T21:15:15.123456
+    "%Y-%m-%dT%H:%M:%S.%fZ",  # 2025-06-04T21:15:15.123456Z
+    "%Y-%m-%dT%H:%M:%SZ",     # 2025-06-04T21:15:15Z
+    "%d/%m/%Y %H:%M:%S",      # 04/06/2025 21:15:15
+    "%d-%m-%Y %H:%M:%S",      # 04-06-2025 21:15:15
+]
+
+
+def _local_timezone():
+    try:
+        import tzlocal
+        return tzlocal.get_localzone()
+    except Exception:
+        return None
+
+
+class TimestampParser:
+    """Parser DateTime dengan memoisasi format terakhir yang berhasil."""
+
+    def __init__(self, formats=DATETIME_FORMATS):
+        self.formats = list(formats)
+        self._last_format = self.formats[0]
+        self._timezone = None
+        self._timezone_loaded = False
+
+    def _ordered_formats(self):
+        last_format = self._last_format
+        return [last_format] + [fmt for fmt in self.formats if fmt != last_format]
+
+    def parse(self, datetime_str):
+        """Parse satu string DateTime menjadi timestamp Unix, atau None jika gagal."""
+        try:
+            if not datetime_str:
+                logger.warning("Empty datetime string provided")
+                return None
+
+            # Bersihkan string dari whitespace
+            datetime_str = str(datetime_str).strip()
+
+            for fmt in self._ordered_formats():
+                try:
+                    timestamp = datetime.strptime(datetime_str, fmt).timestamp()
+                except ValueError:
+                    continue
+                self._last_format = fmt
+                return timestamp
+
+            return self._parse_iso(datetime_str)
+
+        except Exception as e:
+            logger.error("Error parsing datetime string '%s': %s", datetime_str, e)
+            return None
+
+    def _parse_iso(self, datetime_str):
+        # Jika semua format gagal, coba parsing ISO format
+        try:
+            # Handle Z timezone
+            if datetime_str.endswith('Z'):
+                datetime_str = datetime_str[:-1] + '+00:00'
+            return datetime.fromisoformat(datetime_str).timestamp()
+        except ValueError:
+            logger.error("Could not parse datetime string: '%s'", datetime_str)
+            return None
+
+    def parse_column(self, values):
+        """
+        Parse banyak string DateTime sekaligus. Return array float64 timestamp
+        Unix; NaN untuk nilai yang kosong atau tidak dapat di-parse.
+        """
+        import pandas as pd
+
+        if not self._timezone_loaded:
+            self._timezone = _local_timezone()
+            self._timezone_loaded = True
+
+        strings = pd.Series(values, dtype=object)
+        result = np.full(len(strings), np.nan)
+        present = strings.notna() & (strings.astype(str).str.len() > 0)
+        pending = strings[present].astype(str).str.strip()
+
+        if self._timezone is not None:
+            for fmt in self._ordered_formats():
+                if pending.empty:
+                    break
+                parsed = pd.to_datetime(pending, format=fmt, errors='coerce')
+                matched = parsed.notna()
+                if not matched.any():
+                    continue
+                localized = pd.DatetimeIndex(parsed[matched]).tz_localize(
+                    self._timezone, ambiguous='NaT', nonexistent='NaT'
+                )
+                valid = ~localized.isna()
+                positions = matched[matched].index[valid]
+                # Detik utuh + mikrodetik / 1e6, sama seperti datetime.timestamp()
+                micros = localized[valid].as_unit('us').asi8
+                result[positions] = micros // 1_000_000 + (micros % 1_000_000) / 1e6
+                pending = pending.drop(positions)
+                self._last_format = fmt
+
+        # Sisa (ISO dengan offset, waktu DST ambigu, dll.) diproses satu per satu
+        for position, value in pending.items():
+            timestamp = self.parse(value)
+            if timestamp is not None:
+                result[position] = timestamp
+        return result
+
+
+default_parser = TimestampParser()
+
+
+def parse_datetime_string(datetime_str):
+    """
+    Fungsi untuk mengparse string DateTime menjadi timestamp Unix.
+    Mendukung berbagai format DateTime; format yang terakhir berhasil dicoba lebih dulu.
+    """
+    return default_parser.parse(datetime_str)
+
+
+def parse_datetime_column(values):
+    """Fungsi untuk mengparse banyak string DateTime sekaligus (lihat TimestampParser.parse_column)."""
+    return default_parser.parse_column(values)
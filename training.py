@@ -0,0 +1,216 @@
+"""
+Pipeline pelatihan ulang Random Forest secara offline.
+
+Record dibaca dari iterator (generator Firestore `stream()`, cursor store
+SQLite lokal, atau file ekspor NDJSON/CSV) per potongan `chunk_rows` baris
+dan langsung diubah menjadi matriks float32 ringkas (jam, suhu, kelembapan
+udara, kelembapan tanah) plus label int8, sehingga dict per record tidak
+pernah ditahan sekaligus. Label diambil dari field keputusan (mis.
+`keputusan_penyiraman` di watering_analysis) atau, untuk data sensor mentah,
+dari aturan ambang batas `watering_rules`.
+
+Model di-fit dengan `RandomForestClassifier(n_jobs=...)` lalu dikompilasi
+menjadi `CompiledForest` yang dapat langsung dipublikasikan ke registry model.
+sklearn dan pandas hanya diimport saat fit.
+"""
+import csv
+import json
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import watering_rules
+from forest_engine import CompiledForest
+from sensor_export import iter_chunks
+
+logger = logging.getLogger(__name__)
+
+# Nama fitur sama dengan model_rf agar model baru lolos validasi registry
+FEATURE_NAMES = ['Waktu', 'Suhu Udara', 'Kelembapan Udara', 'Kelembapan Tanah']
+
+# Hyperparameter default mengikuti model_rf yang sedang dipakai
+DEFAULT_TREES = 472
+DEFAULT_MAX_DEPTH = 5
+
+
+class TrainingSet:
+    """Matriks fitur float32 (n, 4), label int8 dan timestamp float64, urut seperti sumbernya."""
+
+    def __init__(self, X, y, timestamps):
+        self.X = X
+        self.y = y
+        self.timestamps = timestamps
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def nbytes(self):
+        return self.X.nbytes + self.y.nbytes + self.timestamps.nbytes
+
+    def split_by_time(self, holdout):
+        """Pisahkan `holdout` (fraksi) data terbaru sebagai data uji. Return (latih, uji)."""
+        order = np.argsort(self.timestamps, kind='stable')
+        cut = int(len(order) * (1.0 - holdout))
+        train, test = order[:cut], order[cut:]
+        return (TrainingSet(self.X[train], self.y[train], self.timestamps[train]),
+                TrainingSet(self.X[test], self.y[test], self.timestamps[test]))
+
+
+def _as_float(record, field):
+    value = record.get(field)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def records_to_arrays(records, label_field=None):
+    """
+    Ubah satu potongan record menjadi (timestamp, X float32, y int8). Record
+    tanpa timestamp atau nilai sensor valid dibuang. Tanpa `label_field`
+    label dihitung dari aturan ambang batas.
+    """
+    timestamps = np.array([_as_float(record, 'timestamp') for record in records])
+    temperature = np.array([_as_float(record, 'temperature') for record in records])
+    humidity = np.array([_as_float(record, 'humidity') for record in records])
+    soil_moisture = np.array([_as_float(record, 'soil_moisture') for record in records])
+    if label_field is not None:
+        labels = np.array([_as_float(record, label_field) for record in records])
+    else:
+        labels = watering_rules.evaluate(temperature, humidity, soil_moisture)[0].astype(np.float64)
+
+    valid = ~(np.isnan(timestamps) | np.isnan(temperature) | np.isnan(humidity)
+              | np.isnan(soil_moisture) | np.isnan(labels))
+    timestamps = timestamps[valid]
+    hours = np.array([time.localtime(ts).tm_hour for ts in timestamps.tolist()], dtype=np.float32)
+
+    X = np.empty((len(timestamps), len(FEATURE_NAMES)), dtype=np.float32)
+    X[:, 0] = hours
+    X[:, 1] = temperature[valid]
+    X[:, 2] = humidity[valid]
+    X[:, 3] = soil_moisture[valid]
+    return timestamps, X, labels[valid].astype(np.int8)
+
+
+def load_training_set(records, label_field=None, chunk_rows=10000, max_rows=None, progress=None):
+    """
+    Kumpulkan record dari iterator menjadi TrainingSet per potongan
+    `chunk_rows`. Berhenti setelah `max_rows` baris valid (jika diisi).
+    """
+    parts = []
+    total = 0
+    for chunk in iter_chunks(records, chunk_rows):
+        timestamps, X, y = records_to_arrays(chunk, label_field)
+        if max_rows is not None and total + len(y) > max_rows:
+            keep = max_rows - total
+            timestamps, X, y = timestamps[:keep], X[:keep], y[:keep]
+        parts.append((timestamps, X, y))
+        total += len(y)
+        if progress is not None:
+            progress(total)
+        if max_rows is not None and total >= max_rows:
+            break
+
+    if not parts:
+        return TrainingSet(np.empty((0, len(FEATURE_NAMES)), dtype=np.float32),
+                           np.empty(0, dtype=np.int8), np.empty(0))
+    return TrainingSet(
+        np.ascontiguousarray(np.concatenate([X for _, X, _ in parts])),
+        np.concatenate([y for _, _, y in parts]),
+        np.concatenate([timestamps for timestamps, _, _ in parts])
+    )
+
+
+def iter_export_file(path):
+    """Record dari file ekspor /api/sensor-data (NDJSON atau CSV), dibaca baris per baris."""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def fit_forest(training_set, n_estimators=DEFAULT_TREES, max_depth=DEFAULT_MAX_DEPTH,
+               n_jobs=-1, max_samples=None, random_state=42):
+    """Fit RandomForestClassifier pada matriks float32 (tanpa salinan ke float64)."""
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+
+    model = RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        n_jobs=n_jobs,
+        max_samples=max_samples,
+        random_state=random_state
+    )
+    # DataFrame agar feature_names_in_ sama dengan model_rf
+    model.fit(pd.DataFrame(training_set.X, columns=FEATURE_NAMES, copy=False), training_set.y)
+    return model
+
+
+def measure_inference(forest, X, repeat=200):
+    """Latensi prediksi satu baris (median, detik) dan throughput batch (baris/detik)."""
+    single = X[:1]
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        forest.predict_proba(single)
+        timings.append(time.perf_counter() - started)
+
+    batch = X[:10000]
+    started = time.perf_counter()
+    forest.predict_proba(batch)
+    batch_seconds = time.perf_counter() - started
+    return float(np.median(timings)), len(batch) / batch_seconds if batch_seconds > 0 else None
+
+
+def artifact_size(forest):
+    """Ukuran artefak mmap (byte) jika model disimpan."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.forest')
+        forest.save(path)
+        return os.path.getsize(path)
+
+
+def train(training_set, holdout=0.2, **fit_options):
+    """
+    Latih model dari TrainingSet dengan data terbaru sebagai data uji.
+    Return (CompiledForest, laporan dict).
+    """
+    if len(training_set) == 0:
+        raise ValueError("Tidak ada baris data latih yang valid")
+    if len(np.unique(training_set.y)) < 2:
+        raise ValueError("Data latih hanya berisi satu kelas keputusan")
+
+    train_set, test_set = training_set.split_by_time(holdout) if holdout else (training_set, None)
+    started = time.perf_counter()
+    model = fit_forest(train_set, **fit_options)
+    fit_seconds = time.perf_counter() - started
+
+    forest = CompiledForest.from_sklearn(model)
+    report = {
+        'rows': len(training_set),
+        'train_rows': len(train_set),
+        'test_rows': len(test_set) if test_set is not None else 0,
+        'matrix_bytes': training_set.nbytes,
+        'water_fraction': float(training_set.y.mean()),
+        'fit_seconds': fit_seconds,
+        'n_jobs': model.n_jobs,
+        'trees': forest.n_trees,
+        'nodes': forest.n_nodes,
+        'artifact_bytes': artifact_size(forest),
+        'from': float(training_set.timestamps.min()),
+        'to': float(training_set.timestamps.max())
+    }
+    if test_set is not None and len(test_set):
+        report['holdout_accuracy'] = float((forest.predict(test_set.X) == test_set.y).mean())
+    report['latency_seconds'], report['batch_rows_per_second'] = measure_inference(forest, training_set.X)
+    forest.metadata.update({key: report[key] for key in ('rows', 'from', 'to', 'fit_seconds')})
+    forest.metadata['holdout_accuracy'] = report.get('holdout_accuracy')
+    return forest, report
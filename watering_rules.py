@@ -0,0 +1,104 @@
+"""
+Mesin ambang batas penyiraman yang tervektorisasi.
+
+Keputusan dan kode alasan dihitung untuk N baris sekaligus dengan operasi
+NumPy. Teks alasan hanya dirender saat dibutuhkan (misalnya untuk disimpan
+ke Firestore atau ditampilkan), bukan untuk setiap baris.
+
+Konfigurasi `WATERING_THRESHOLDS` adalah sumber yang sama dengan yang
+disajikan oleh endpoint /api/threshold-info.
+"""
+import numpy as np
+
+# Urutan parameter menentukan posisi bit pada kode alasan
+WATERING_THRESHOLDS = {
+    'temperature': {
+        'min': 20,
+        'max': 31,
+        'unit': '°C',
+        'description': 'Rentang suhu udara optimal',
+        'label': 'Suhu',
+    },
+    'humidity': {
+        'min': 75,
+        'max': 80,
+        'unit': '%',
+        'description': 'Rentang kelembapan udara optimal',
+        'label': 'Kelembapan udara',
+    },
+    'soil_moisture': {
+        'min': 60,
+        'max': 75,
+        'unit': '%',
+        'description': 'Rentang kelembapan tanah optimal',
+        'label': 'Kelembapan tanah',
+    },
+}
+
+WATERING_LOGIC = 'Jika salah satu parameter di luar rentang optimal, maka keputusan = siram (1), jika tidak = jangan siram (0)'
+
+OPTIMAL_REASON = "Semua parameter dalam rentang optimal"
+
+# Kode alasan: dua bit per parameter (terlalu rendah, terlalu tinggi)
+REASON_NAMES = [f'{parameter}_{side}' for parameter in WATERING_THRESHOLDS for side in ('low', 'high')]
+
+
+def threshold_info():
+    """Konfigurasi ambang batas dalam bentuk yang disajikan ke klien."""
+    return {
+        parameter: {key: config[key] for key in ('min', 'max', 'unit', 'description')}
+        for parameter, config in WATERING_THRESHOLDS.items()
+    }
+
+
+def threshold_ranges():
+    """Ringkasan rentang optimal, contoh: {'temperature_range': '20-31°C'}."""
+    return {
+        f'{parameter}_range': f"{config['min']}-{config['max']}{config['unit']}"
+        for parameter, config in WATERING_THRESHOLDS.items()
+    }
+
+
+def evaluate(temperature, humidity, soil_moisture):
+    """
+    Evaluasi ambang batas untuk skalar atau array.
+
+    Return (keputusan, kode_alasan): keputusan 1 = siram, 0 = jangan siram;
+    kode_alasan adalah bitmask uint8 dengan urutan bit sesuai REASON_NAMES.
+    """
+    values = (temperature, humidity, soil_moisture)
+    codes = None
+    for bit, (value, config) in enumerate(zip(values, WATERING_THRESHOLDS.values())):
+        value = np.asarray(value, dtype=np.float64)
+        low = value < config['min']
+        high = value > config['max']
+        # Sama seperti if/elif pada logika lama: "terlalu rendah" didahulukan
+        code = (low.astype(np.uint8) << (2 * bit)) | ((high & ~low).astype(np.uint8) << (2 * bit + 1))
+        codes = code if codes is None else codes | code
+
+    decisions = (codes != 0).astype(np.int8)
+    return decisions, codes
+
+
+def reason_text(code, temperature, humidity, soil_moisture):
+    """Render teks alasan untuk satu baris."""
+    code = int(code)
+    if not code:
+        return OPTIMAL_REASON
+
+    values = (temperature, humidity, soil_moisture)
+    reasons = []
+    for bit, (value, config) in enumerate(zip(values, WATERING_THRESHOLDS.values())):
+        value = float(value)
+        unit = config['unit']
+        if code & (1 << (2 * bit)):
+            reasons.append(f"{config['label']} terlalu rendah ({value}{unit} < {config['min']}{unit})")
+        elif code & (1 << (2 * bit + 1)):
+            reasons.append(f"{config['label']} terlalu tinggi ({value}{unit} > {config['max']}{unit})")
+    return "; ".join(reasons)
+
+
+def reason_texts(codes, temperature, humidity, soil_moisture):
+    """Generator teks alasan per baris; dirender hanya saat diiterasi."""
+    for code, t, h, s in zip(np.ravel(codes), np.ravel(temperature), np.ravel(humidity), np.ravel(soil_moisture)):
+        yield reason_text(code, t, h, s)
@@ -0,0 +1,374 @@
+"""
+Antrian write-behind untuk penulisan dokumen Firestore.
+
+Dokumen dimasukkan ke antrian in-memory dan ditulis oleh satu thread latar
+belakang dalam bentuk `WriteBatch`, di-flush ketika jumlahnya mencapai
+`batch_size` atau sudah menunggu `flush_interval` detik. ID dokumen dibuat di
+sisi klien saat enqueue, sehingga pemanggil langsung mendapat ID tanpa
+menunggu commit, dan penulisan ulang bersifat idempoten.
+
+Commit yang gagal diulang dengan backoff eksponensial; jika tetap gagal,
+dokumen ditulis ke file spill (JSON per baris) dan dikirim ulang setelah
+commit berikutnya berhasil, atau saat thread penulis dimulai, yaitu pada
+enqueue pertama proses berikutnya. Baris spill yang rusak (misalnya terpotong
+karena worker mati saat menulis) dipindahkan ke `<spill>.corrupt` dan dicatat
+di log agar tidak menghentikan replay.
+
+File spill dipakai bersama oleh semua worker gunicorn. Penambahan baris dan
+pengambilan file untuk replay dijaga `fcntl.flock` pada `<spill>.lock`; replay
+lebih dulu me-rename file spill ke nama milik prosesnya sendiri, sehingga
+baris yang ditambahkan worker lain selama replay masuk ke file spill baru dan
+tidak ikut terhapus. Lock tidak ditahan selama commit ke Firestore.
+"""
+import contextlib
+import glob
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: hanya dijaga lock antar-thread
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Batas jumlah operasi dalam satu WriteBatch Firestore
+MAX_BATCH_SIZE = 500
+
+_FLUSH = object()
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Antrian tulis asinkron ke Firestore dengan batching, retry, dan spill file."""
+
+    def __init__(self, client, batch_size=20, flush_interval=2.0, max_retries=4,
+                 backoff_base=0.5, backoff_max=30.0, spill_path=None, on_commit=None):
+        self.client = client
+        self.batch_size = max(1, min(int(batch_size), MAX_BATCH_SIZE))
+        self.flush_interval = float(flush_interval)
+        self.max_retries = int(max_retries)
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.spill_path = spill_path
+        # on_commit(jumlah dokumen, detik) dipanggil setelah setiap commit batch berhasil
+        self.on_commit = on_commit
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.last_error = None
+        # Perkiraan dokumen di spill file (ditambah saat spill, dikurangi saat replay)
+        self._spill_pending = self._count_spill_lines()
+
+    def enqueue(self, collection, data, doc_id=None):
+        """
+        Masukkan dokumen ke antrian. Return ID dokumen: `doc_id` jika diberikan
+        (penulisan berikutnya menimpa dokumen yang sama), selain itu dibuat di sisi klien.
+        """
+        if doc_id is None:
+            doc_id = self.client.collection(collection).document().id
+        self._ensure_started()
+        self._queue.put((collection, doc_id, dict(data)))
+        with self._lock:
+            self.enqueued += 1
+        return doc_id
+
+    def flush(self, timeout=None):
+        """Tulis semua dokumen yang masih di antrian. Return False jika timeout."""
+        if self._thread is None:
+            return True
+        self._queue.put(_FLUSH)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=10.0):
+        """
+        Flush lalu hentikan thread penulis (untuk atexit). Dokumen yang belum
+        sempat ditulis sebelum `timeout` dipindahkan ke file spill.
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _FLUSH and item is not _STOP:
+                leftovers.append(item)
+            self._queue.task_done()
+        if leftovers:
+            self._spill(leftovers)
+        self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': self._queue.qsize(),
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'batches': self.batches,
+                'retries': self.retries,
+                'spilled': self.spilled,
+                'replayed': self.replayed,
+                'spill_pending': self._spill_pending,
+                'last_error': self.last_error
+            }
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        # Kirim ulang sisa spill dari proses sebelumnya
+        self._safe_replay_spill()
+
+        while True:
+            items, stop = self._collect()
+            if items:
+                if self._commit_with_retry(items):
+                    self._safe_replay_spill()
+                else:
+                    self._safe_spill(items)
+            for _ in range(len(items)):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _collect(self):
+        """
+        Ambil satu batch dari antrian: tunggu item pertama, lalu kumpulkan
+        sampai `batch_size` atau `flush_interval` sejak item pertama.
+        Return (items, stop). Penanda _FLUSH/_STOP langsung di-task_done.
+        """
+        items = []
+        deadline = None
+        while len(items) < self.batch_size:
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _FLUSH or item is _STOP:
+                self._queue.task_done()
+                if item is _STOP:
+                    # Sisa antrian tetap ditulis sebelum berhenti
+                    items.extend(self._drain())
+                    return items, True
+                if items:
+                    break
+                continue
+            items.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return items, False
+
+    def _drain(self):
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is _FLUSH or item is _STOP:
+                self._queue.task_done()
+            else:
+                items.append(item)
+
+    def _commit_with_retry(self, items):
+        for attempt in range(self.max_retries + 1):
+            try:
+                for start in range(0, len(items), MAX_BATCH_SIZE):
+                    self._commit(items[start:start + MAX_BATCH_SIZE])
+                with self._lock:
+                    self.written += len(items)
+                    self.last_error = None
+                return True
+            except Exception as e:
+                with self._lock:
+                    self.last_error = str(e)
+                if attempt == self.max_retries or self._stopping.is_set():
+                    logger.error("Commit batch gagal setelah %d percobaan: %s", attempt + 1, e)
+                    return False
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+                with self._lock:
+                    self.retries += 1
+                logger.warning("Commit batch gagal (%s), coba lagi dalam %.1fs", e, delay)
+                if self._stopping.wait(delay):
+                    return False
+        return False
+
+    def _commit(self, items):
+        started = time.perf_counter()
+        batch = self.client.batch()
+        for collection, doc_id, data in items:
+            batch.set(self.client.collection(collection).document(doc_id), data)
+        batch.commit()
+        with self._lock:
+            self.batches += 1
+        if self.on_commit is not None:
+            self.on_commit(len(items), time.perf_counter() - started)
+
+    @contextlib.contextmanager
+    def _locked_spill(self):
+        """Lock file spill antar-thread dan antar-proses (worker lain memakai file yang sama)."""
+        with self._spill_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f'{self.spill_path}.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append_spill(self, lines):
+        with self._locked_spill(), open(self.spill_path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+
+    def _spill(self, items):
+        if not self.spill_path:
+            logger.error("%d dokumen hilang: commit gagal dan spill file tidak dikonfigurasi", len(items))
+            return
+        self._append_spill(
+            json.dumps({'collection': collection, 'id': doc_id, 'data': data}, default=str) + '\n'
+            for collection, doc_id, data in items
+        )
+        with self._lock:
+            self.spilled += len(items)
+            self._spill_pending += len(items)
+        logger.warning("%d dokumen disimpan ke spill file %s", len(items), self.spill_path)
+
+    def _safe_spill(self, items):
+        # Error I/O spill (disk penuh, izin) tidak boleh menghentikan thread penulis
+        try:
+            self._spill(items)
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+            logger.error("%d dokumen hilang: gagal menulis spill file %s: %s", len(items), self.spill_path, e)
+
+    def _safe_replay_spill(self):
+        try:
+            self._replay_spill()
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+            logger.error("Replay spill file %s gagal: %s", self.spill_path, e)
+
+    def _count_spill_lines(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return 0
+        with open(self.spill_path, encoding='utf-8') as f:
+            return sum(1 for line in f if line.strip())
+
+    def _claim_spill(self):
+        """
+        Rename file spill ke nama milik proses ini. File klaim proses yang mati
+        di tengah replay digabung kembali ke file spill terlebih dahulu.
+        Return path file yang diklaim, atau None jika tidak ada spill.
+        """
+        claimed = f'{self.spill_path}.replay-{os.getpid()}'
+        # Tanpa spill maupun klaim lama tidak perlu lock (dan file .lock tidak dibuat)
+        if not os.path.exists(self.spill_path) and not glob.glob(f'{glob.escape(self.spill_path)}.replay-*'):
+            return None
+        with self._locked_spill():
+            for path in glob.glob(f'{glob.escape(self.spill_path)}.replay-*'):
+                pid = path.rsplit('-', 1)[-1]
+                if path != claimed and pid.isdigit() and not _process_alive(int(pid)):
+                    with open(path, encoding='utf-8') as src, open(self.spill_path, 'a', encoding='utf-8') as dst:
+                        dst.writelines(src)
+                    os.remove(path)
+            if os.path.exists(claimed):
+                # Sisa klaim proses lama dengan PID yang sama
+                if os.path.exists(self.spill_path):
+                    with open(self.spill_path, encoding='utf-8') as src, open(claimed, 'a', encoding='utf-8') as dst:
+                        dst.writelines(src)
+                    os.remove(self.spill_path)
+                return claimed
+            if not os.path.exists(self.spill_path):
+                return None
+            os.rename(self.spill_path, claimed)
+            return claimed
+
+    def _replay_spill(self):
+        if not self.spill_path:
+            return
+        claimed = self._claim_spill()
+        if claimed is None:
+            return
+
+        with open(claimed, encoding='utf-8') as f:
+            lines, items, corrupt = [], [], []
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    items.append((entry['collection'], entry['id'], entry['data']))
+                except (ValueError, KeyError, TypeError):
+                    corrupt.append(line if line.endswith('\n') else line + '\n')
+                    continue
+                lines.append(line if line.endswith('\n') else line + '\n')
+        if corrupt:
+            with self._locked_spill(), open(f'{self.spill_path}.corrupt', 'a', encoding='utf-8') as f:
+                f.writelines(corrupt)
+            with self._lock:
+                self._spill_pending = max(0, self._spill_pending - len(corrupt))
+            logger.error("%d baris spill rusak dipindahkan ke %s.corrupt", len(corrupt), self.spill_path)
+        try:
+            for start in range(0, len(items), MAX_BATCH_SIZE):
+                self._commit(items[start:start + MAX_BATCH_SIZE])
+        except Exception as e:
+            # Kembalikan ke file spill bersama; dokumen yang sudah ter-commit
+            # akan ditulis ulang dengan ID yang sama (idempoten)
+            self._append_spill(lines)
+            logger.warning("Replay spill file gagal, dicoba lagi nanti: %s", e)
+        else:
+            with self._lock:
+                self.replayed += len(items)
+                self._spill_pending = max(0, self._spill_pending - len(items))
+            logger.info("%d dokumen dari spill file berhasil ditulis ulang", len(items))
+        os.remove(claimed)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
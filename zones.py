@@ -0,0 +1,74 @@
+"""
+Konfigurasi zona (petak kebun) dan pengambilan pembacaan sensor terbaru per zona.
+
+Setiap zona punya aliran sensor sendiri di koleksi Firestore terpisah.
+`WATERING_ZONES` berisi daftar `zona=koleksi` dipisah koma, misalnya
+`blok-a=sensor_history_blok_a,blok-b=sensor_history_blok_b`; zona tanpa
+`=koleksi` membaca `sensor_history_<zona>`. Tanpa konfigurasi hanya ada zona
+'default' yang membaca `sensor_history`.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ZONES = 'default=sensor_history'
+
+# Sama dengan firestore.Query.DESCENDING; pemanggil memberikan konstanta backend-nya
+DESCENDING = 'DESCENDING'
+
+
+def parse_zones(value):
+    """Ubah string konfigurasi zona menjadi list dict {'zone', 'collection'}."""
+    zones = []
+    seen = set()
+    for entry in (value or DEFAULT_ZONES).split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        zone, _, collection = entry.partition('=')
+        zone = zone.strip()
+        if not zone:
+            raise ValueError(f"Nama zona kosong di konfigurasi: {entry}")
+        collection = collection.strip() or f'sensor_history_{zone}'
+        if zone in seen:
+            raise ValueError(f"Zona ganda di konfigurasi: {zone}")
+        seen.add(zone)
+        zones.append({'zone': zone, 'collection': collection})
+    if not zones:
+        raise ValueError("Konfigurasi zona kosong")
+    return zones
+
+
+def _fetch_latest(client, zone, direction):
+    started = time.perf_counter()
+    result = {'zone': zone['zone'], 'collection': zone['collection'], 'doc_id': None, 'data': None, 'error': None}
+    try:
+        docs = (client.collection(zone['collection'])
+                .order_by('timestamp', direction=direction)
+                .limit(1).stream())
+        for doc in docs:
+            result['doc_id'] = doc.id
+            result['data'] = doc.to_dict()
+            break
+    except Exception as e:
+        logger.error("Error fetching latest reading for zone %s: %s", zone['zone'], e)
+        result['error'] = str(e)
+    result['fetch_seconds'] = time.perf_counter() - started
+    return result
+
+
+def fetch_latest_readings(client, zones, max_workers=8, direction=DESCENDING):
+    """
+    Ambil dokumen sensor terbaru setiap zona secara paralel. `direction`
+    adalah konstanta urutan menurun milik client (Firestore atau backend
+    lokal). Return list
+    (urutan sama dengan `zones`) berisi zone, collection, doc_id, data (None
+    jika kosong atau gagal), error, dan fetch_seconds.
+    """
+    if len(zones) == 1:
+        return [_fetch_latest(client, zones[0], direction)]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(zones))),
+                            thread_name_prefix='zone-fetch') as executor:
+        return list(executor.map(lambda zone: _fetch_latest(client, zone, direction), zones))